@@ -1,7 +1,11 @@
-import requests as req
 from bs4 import BeautifulSoup as bs
 from datetime import datetime
 import csv
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rev'))
+import http_pool
+from dates import parse_date
 
 def scrape_cnbc(headers, keyword, start_date=None, end_date=None):
     # Generating a unique filename with the current date and time
@@ -24,7 +28,7 @@ def scrape_cnbc(headers, keyword, start_date=None, end_date=None):
         while more_pages:
             url_cnbc = f"https://www.cnbcindonesia.com/search?query={keyword}&p={page}&kanal=&tipe=artikel&date="
             try:
-                response = req.get(url_cnbc, headers=headers)
+                response = http_pool.get(url_cnbc, headers=headers)
                 response.raise_for_status()
                 sop = bs(response.text, 'lxml')
                 ul = sop.find('ul', class_='list media_rows middle thumb terbaru gtm_indeks_feed')
@@ -43,7 +47,7 @@ def scrape_cnbc(headers, keyword, start_date=None, end_date=None):
                     if a_tag is None or (keyword.lower() not in title.lower()):
                         continue
                     link_art = a_tag['href']
-                    response = req.get(link_art, headers=headers)
+                    response = http_pool.get(link_art, headers=headers)
                     sop_ = bs(response.text, 'lxml')
                     art_div = sop_.find('div', class_='lm_content mt10')
                     if art_div is None:
@@ -59,7 +63,9 @@ def scrape_cnbc(headers, keyword, start_date=None, end_date=None):
                     if date_div is None:
                         continue
                     date = date_div.text
-                    article_date = datetime.strptime(date, '%d %B %Y %H:%M')
+                    article_date = parse_date(date, 'cnbc')
+                    if article_date is None:
+                        continue
                     if start_date and article_date < start_date:
                         continue
                     if article_date > end_date:
@@ -2,6 +2,10 @@ import requests
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime, timedelta
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rev'))
+import http_pool
 
 # Generate a filename with the current datetime
 current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -32,7 +36,7 @@ with open(file_name, "w", encoding="utf-8") as f:
         print(f"Fetching page {page}: {url}")
         
         try:
-            response = requests.get(url)
+            response = http_pool.get(url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, "html.parser")
             articles = soup.find_all("div", {"class": "media__text"})
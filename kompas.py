@@ -1,23 +1,20 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import pandas as pd
-import time
 from tqdm import tqdm
 import re
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rev'))
+from driver_pool import DriverPool, open_page, render_pages, wait_for_results
+import google_cse
+from sinks import write_parquet
+from dates import parse_date
+from metrics import get_metrics, timed
 
-def setup_driver():
-    options = Options()
-    options.headless = True
-    options.add_argument("window-size=1200x600")
-    options.add_argument("disable-gpu")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+SEARCH_PAGE = 'https://search.kompas.com/search/'
+
+# Number of headless browsers rendering result pages in parallel
+POOL_SIZE = 3
 
 def extract_date_from_url(url):
     if url:  # Memastikan bahwa URL tidak None
@@ -27,56 +24,93 @@ def extract_date_from_url(url):
             return f"{match.group(3)}-{match.group(2)}-{match.group(1)}"
     return None  # Mengembalikan None jika URL None atau tidak ada tanggal yang ditemukan
 
-def fetch_news(keyword, max_pages):
-    driver = setup_driver()
-    news_data = []
-    page = 1
+@timed('filter', 'kompas')
+def page_news(items):
+    # Articles among one page's (link, title) pairs, without tag pages
+    metrics = get_metrics()
+    news = []
+    seen_links = set()
+    for link, title in items:
+        article_date = extract_date_from_url(link)
+        if not (link and title):
+            metrics.drop('kompas', 'no_title', link)
+        elif link in seen_links:
+            metrics.drop('kompas', 'duplicate', link)
+        elif link.startswith('https://www.kompas.com/tag/'):
+            metrics.drop('kompas', 'tag_page', link)
+        else:
+            seen_links.add(link)
+            news.append({
+                'title': title,
+                'link': link,
+                'article_date': article_date
+            })
+    return news
 
-    while True:
-        url = f'https://search.kompas.com/search/?q={keyword}#gsc.tab=0&gsc.q={keyword}&gsc.page={page}'
-        driver.get(url)
-        driver.implicitly_wait(10)
-        time.sleep(3)
+def render_page(driver, keyword, page):
+    url = f'https://search.kompas.com/search/?q={keyword}#gsc.tab=0&gsc.q={keyword}&gsc.page={page}'
+    open_page(driver, url)
+    # Wait for the results (or the empty-result notice) instead of sleeping
+    news_items = wait_for_results(driver, '.gs-title .gs-title', ['.gs-no-results-result'], empty_text='tidak ada hasil')
+    if not news_items:
+        return None
+    items = []
+    for item in news_items:
+        try:
+            items.append((item.get_attribute('href'), item.get_attribute('textContent').strip()))
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+    return items
 
-        news_items = driver.find_elements(By.CSS_SELECTOR, '.gs-title .gs-title')
-        seen_links = set()
-        progress_bar = tqdm(news_items, desc=f'Processing Page {page}')
+def browser_pages(keyword, max_pages, pool_size, first_page=1):
+    with DriverPool(pool_size) as pool:
+        yield from render_pages(pool, lambda driver, page: render_page(driver, keyword, page), max_pages, first_page)
 
-        for item in progress_bar:
-            try:
-                link = item.get_attribute('href')
-                title = item.get_attribute('textContent').strip()
-                article_date = extract_date_from_url(link)
-                if link and title and link not in seen_links and not link.startswith('https://www.kompas.com/tag/'):
-                    seen_links.add(link)
-                    news_data.append({
-                        'title': title,
-                        'link': link,
-                        'article_date': article_date
-                    })
-            except Exception as e:
-                print(f"Error processing an item: {e}")
+def fetch_news(keyword, max_pages, pool_size=POOL_SIZE, on_article=None):
+    # Reads the search widget's JSON results directly; Chrome only renders
+    # pages if the search API cannot be reached
+    news_data = []
 
-        page += 1
-        if max_pages and page >= max_pages:
-            break
-        if "tidak ada hasil" in driver.page_source:
-            break
+    try:
+        cx = google_cse.discover_cx(SEARCH_PAGE)
+    except Exception as e:
+        print(f"Search engine id not found ({e}), using the browser.")
+        pages = browser_pages(keyword, max_pages, pool_size)
+    else:
+        fallback = lambda first_page: browser_pages(keyword, max_pages, pool_size, first_page)
+        pages = google_cse.iter_pages(cx, keyword, max_pages, referer=SEARCH_PAGE, fallback=fallback)
+
+    for page, items in pages:
+        news = page_news(tqdm(items, desc=f'Processing Page {page}'))
+        news_data.extend(news)
+        if on_article is not None:
+            for item in news:
+                on_article(item)
 
-    driver.quit()
     return news_data
 
-keyword = input("Masukkan kata kunci berita: ")
-max_pages = input("Masukkan jumlah maksimal halaman yang akan discrap (kosongkan untuk unlimited): ")
-max_pages = int(max_pages) if max_pages else None
+def main():
+    keyword = input("Masukkan kata kunci berita: ")
+    max_pages = input("Masukkan jumlah maksimal halaman yang akan discrap (kosongkan untuk unlimited): ")
+    max_pages = int(max_pages) if max_pages else None
+
+    news_data = fetch_news(keyword, max_pages)
+    df_news = pd.DataFrame(news_data)
+    df_news = df_news.drop_duplicates(subset=['link'])  # Menghapus duplikasi berdasarkan link
+    df_news['article_date'] = pd.to_datetime(df_news['article_date'], format='%d-%m-%Y', errors='coerce')  # Konversi ke datetime
+    df_news.sort_values('article_date', ascending=False, inplace=True)  # Urutkan berdasarkan tanggal terbaru
+    now = datetime.now().strftime("%Y%m%d%H%M%S")
+    output_path = f'./kompascom_{now}.csv'
+    df_news.to_csv(output_path, index=False)
+    write_parquet('kompas', (
+        {'title': item['title'], 'link': item['link'],
+         'published': parse_date(item['article_date'], 'kompas')}
+        for item in news_data
+    ))
+    print(f'Scraping is finished. Total news processed: {len(news_data)}')
+    print(f'Data saved to {output_path}')
+    get_metrics().report()
+    get_metrics().close()
 
-news_data = fetch_news(keyword, max_pages)
-df_news = pd.DataFrame(news_data)
-df_news = df_news.drop_duplicates(subset=['link'])  # Menghapus duplikasi berdasarkan link
-df_news['article_date'] = pd.to_datetime(df_news['article_date'], format='%d-%m-%Y', errors='coerce')  # Konversi ke datetime
-df_news.sort_values('article_date', ascending=False, inplace=True)  # Urutkan berdasarkan tanggal terbaru
-now = datetime.now().strftime("%Y%m%d%H%M%S")
-output_path = f'./kompascom_{now}.csv'
-df_news.to_csv(output_path, index=False)
-print(f'Scraping is finished. Total news processed: {len(news_data)}')
-print(f'Data saved to {output_path}')
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Offline benchmarks of the shared plumbing and the parser switch (the
+# per-site extractor gate against a saved baseline is bench_parsers.py):
+#   python bench.py pool [n_articles]       pooled session vs requests.get per URL
+#   python bench.py sinks [n_records]       load time of the CSV/JSON/Parquet outputs
+#   python bench.py sentiment [n] [workers] VADER articles/sec per process count
+#   python bench.py dedup [n_stories]       near-duplicate index throughput
+#   python bench.py dates [n]               parse_date vs dateparser
+#   python bench.py extract [seconds]       html.parser soup vs the lxml fast path
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = b'<html><body><div class="read__content"><p>' + b'lorem ipsum ' * 400 + b'</p></div></body></html>'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _self_signed_cert(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-keyout', key, '-out', cert, '-subj', '/CN=localhost',
+        '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+    ], check=True, capture_output=True)
+    return cert, key
+
+def pool(n_articles=1000):
+    # Every requests.get opens a new TCP + TLS connection; http_pool keeps one
+    # alive per host, so the difference is the handshakes saved
+    import requests
+    import http_pool
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = _self_signed_cert(tmp)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _ArticleHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'https://localhost:{server.server_address[1]}/read/'
+
+        try:
+            start = time.perf_counter()
+            for i in range(n_articles):
+                requests.get(f'{base}{i}', verify=cert).raise_for_status()
+            unpooled = time.perf_counter() - start
+
+            http_pool.close()
+            start = time.perf_counter()
+            for i in range(n_articles):
+                http_pool.get(f'{base}{i}', verify=cert).raise_for_status()
+            pooled = time.perf_counter() - start
+        finally:
+            http_pool.close()
+            server.shutdown()
+            server.server_close()
+
+    saved = (unpooled - pooled) * 1000 / n_articles
+    print(f'requests.get per URL : {unpooled:.2f}s for {n_articles} articles')
+    print(f'shared pooled session: {pooled:.2f}s for {n_articles} articles')
+    print(f'Handshake time saved : {saved:.2f}s per 1,000 articles ({unpooled / pooled:.1f}x)')
+
+def _synthetic_records(n):
+    rng = random.Random(21)
+    vocab = [''.join(rng.choice('abcdefghijklmnoprstuwy') for _ in range(rng.randint(3, 9))) for _ in range(3000)]
+    sources = ['cnbc', 'detik', 'sindo', 'tempo']
+    categories = ['Nasional', 'Ekonomi', 'Internasional', 'Olahraga', 'Metro']
+    labels = ['Provokatif', 'Hiperbola', 'Sensasional', 'Glorifikasi', 'Emosional', 'Informatif']
+    # Word frequencies follow Zipf's law, as in real text
+    weights = [1 / rank for rank in range(1, len(vocab) + 1)]
+    start = datetime(2024, 1, 1)
+    for i in range(n):
+        yield {
+            'source': rng.choice(sources),
+            'title': ' '.join(rng.choices(vocab, weights, k=10)),
+            'link': f'https://news.example/{i}',
+            'published': start + timedelta(minutes=rng.randrange(180 * 24 * 60)),
+            'category': rng.choice(categories),
+            'label': rng.choice(labels),
+            'content': ' '.join(rng.choices(vocab, weights, k=300))
+        }
+
+def _size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+def sinks(n=20000):
+    # Load time and size of the same records as CSV, JSON and Parquet
+    import pandas as pd
+    import pyarrow.dataset as ds
+    from sinks import read_parquet, write_parquet
+    records = list(_synthetic_records(n))
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'news.csv')
+        json_path = os.path.join(tmp, 'news.json')
+        root = os.path.join(tmp, 'news_parquet')
+        rows = [dict(r, published=r['published'].strftime('%d %B %Y %H:%M')) for r in records]
+        pd.DataFrame(rows).to_csv(csv_path, index=False)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=4)
+        for source in sorted({r['source'] for r in records}):
+            write_parquet(source, (r for r in records if r['source'] == source), root)
+
+        def timed(load, repeat=3):
+            # Best of a few runs; a single cold run is mostly noise
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                frame = load()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return frame, best
+
+        def load_csv():
+            frame = pd.read_csv(csv_path)
+            frame['published'] = pd.to_datetime(frame['published'], format='%d %B %Y %H:%M')
+            return frame
+
+        def load_json():
+            with open(json_path, encoding='utf-8') as f:
+                frame = pd.DataFrame(json.load(f))
+            frame['published'] = pd.to_datetime(frame['published'], format='%d %B %Y %H:%M')
+            return frame
+
+        results = [
+            ('CSV', csv_path, timed(load_csv)),
+            ('JSON', json_path, timed(load_json)),
+            ('Parquet', root, timed(lambda: read_parquet(root))),
+            ('Parquet, no content', root, timed(lambda: read_parquet(root, columns=['title', 'published', 'category', 'label', 'source']))),
+            ('Parquet, 1 partition', root, timed(lambda: read_parquet(root, filter=(ds.field('source') == 'cnbc') & (ds.field('month') == '2024-03')))),
+        ]
+        assert len(results[2][2][0]) == n
+        base_size, base_time = _size(csv_path), results[0][2][1]
+        for name, path, (frame, elapsed) in results:
+            print(f"{name:20} {_size(path) / 1e6:8.1f} MB {elapsed:7.3f}s load "
+                  f"({base_size / _size(path):4.1f}x smaller, {base_time / elapsed:5.1f}x faster than CSV)")
+
+def _synthetic_articles(n, words=400):
+    vocab = ("good bad great terrible happy sad growth loss strong weak win fail "
+             "the a of and to in on for with market price people government said").split()
+    rng = random.Random(0)
+    return [' '.join(rng.choice(vocab) for _ in range(words)) + '.' for _ in range(n)]
+
+def sentiment(n_articles=2000, max_workers=None):
+    # VADER throughput as the process pool doubles up to max_workers
+    from sentiment_pool import compound_scores, default_workers
+    max_workers = max_workers or default_workers()
+    articles = _synthetic_articles(n_articles)
+    baseline = None
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        list(compound_scores(articles, workers))
+        rate = n_articles / (time.perf_counter() - start)
+        if baseline is None:
+            baseline = rate
+        print(f"{workers:3d} workers: {rate:8.1f} articles/sec ({rate / baseline:.1f}x)")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+def _syndicated(n_stories, seed=20):
+    # Each story is published once and re-published by two other "outlets"
+    # (one in four stories) with a site suffix on the title and ten words
+    # dropped from the body plus a "read more" line. Returns shuffled
+    # (key, title, body, key of the original or None).
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choice('abcdefghijklmnoprstuwy') for _ in range(rng.randint(3, 9))) for _ in range(5000)]
+    outlets = ['CNBC Indonesia', 'detikNews', 'SINDOnews', 'Tempo.co']
+    articles = []
+    for i in range(n_stories):
+        title = ' '.join(rng.choice(vocab) for _ in range(9)).capitalize()
+        words = [rng.choice(vocab) for _ in range(300)]
+        articles.append((f'orig/{i}', title, ' '.join(words), None))
+        if i % 4 == 0:
+            for outlet in rng.sample(outlets, 2):
+                cut = rng.randrange(len(words) - 20)
+                variant = words[:cut] + words[cut + 10:] + ['Baca', 'juga', 'berita', 'lainnya', 'di', outlet]
+                articles.append((f'{outlet}/{i}', f"{title} - {outlet}", ' '.join(variant), f'orig/{i}'))
+    rng.shuffle(articles)
+    return articles
+
+def dedup(n_stories=2000):
+    # Articles/sec through the near-duplicate index, title first as the scrapers do
+    from dedup import NearDuplicateIndex
+    articles = _syndicated(n_stories)
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    caught = sum(bool(index.seen_title(key, title) or index.seen_content(key, body))
+                 for key, title, body, _ in articles)
+    elapsed = time.perf_counter() - start
+    print(f"{len(articles)} articles ({len(articles) - n_stories} syndicated copies) in {elapsed:.2f}s "
+          f"({len(articles) / elapsed:.0f} articles/sec), {caught} flagged")
+    index.report()
+
+_ID_MONTHS = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+              'Agustus', 'September', 'Oktober', 'November', 'Desember']
+_ID_SHORT = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+_ID_DAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+def _layouts(d):
+    return [
+        ('cnbc', f'{d.day:02d} {_ID_MONTHS[d.month - 1]} {d.year} {d:%H:%M}'),
+        ('detik', f'{d.day} {_ID_SHORT[d.month - 1]} {d.year} {d:%H:%M}'),
+        ('jawapos', f'{_ID_DAYS[d.weekday()]}, {d.day:02d} {_ID_MONTHS[d.month - 1]} {d.year} | {d:%H:%M} WIB'),
+        ('sindo', f'{_ID_DAYS[d.weekday()]}, {d.day} {_ID_MONTHS[d.month - 1]} {d.year} - {d:%H:%M} WIB'),
+        ('tempo', f'{d:%Y-%m-%dT%H:%M:%S}+07:00'),
+        ('kompas', f'{d:%d-%m-%Y}'),
+    ]
+
+def _date_corpus(n, distinct=300, seed=22):
+    # n strings in every site's layout, a few hundred distinct values as on
+    # real listing pages; (site, text, expected datetime)
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    moments = [start + timedelta(minutes=rng.randrange(60 * 24 * 540)) for _ in range(distinct)]
+    corpus = []
+    while len(corpus) < n:
+        moment = rng.choice(moments)
+        site, text = rng.choice(_layouts(moment))
+        expected = moment.replace(hour=0, minute=0) if site == 'kompas' else moment
+        corpus.append((site, text, expected))
+    return corpus
+
+def _dateparser(text):
+    import dateparser
+    return dateparser.parse(text.replace('WIB', '').replace('|', ''), languages=['id', 'en'],
+                            settings={'DATE_ORDER': 'DMY', 'RETURN_AS_TIMEZONE_AWARE': False})
+
+def dates(n=5000):
+    # parse_date against dateparser on the same strings
+    from dates import cache_clear, parse_date
+    corpus = _date_corpus(n)
+
+    def timed(parse, items):
+        start = time.perf_counter()
+        for site, text, _ in items:
+            parse(text, site)
+        return time.perf_counter() - start
+
+    cache_clear()
+    cold = timed(parse_date, corpus)
+    warm = timed(parse_date, corpus)
+    # Every string unique, so nothing is served from the cache
+    unique = [(site, text + ' ' * (i % 7), expected) for i, (site, text, expected) in enumerate(_date_corpus(n, distinct=n))]
+    cache_clear()
+    uncached = timed(parse_date, unique)
+    print(f"{n} dates, {len({text for _, text, _ in corpus})} distinct strings")
+    print(f"dates.parse_date  first pass  {n / cold:12,.0f}/s")
+    print(f"dates.parse_date  warm cache  {n / warm:12,.0f}/s")
+    print(f"dates.parse_date  no repeats  {n / uncached:12,.0f}/s")
+
+    try:
+        import dateparser  # noqa: F401
+    except ImportError:
+        print("dateparser not installed; skipping the comparison")
+        return
+    sample = corpus[:min(n, 1000)]
+    mismatched = sum(_dateparser(text) != expected for _, text, expected in sample)
+    slow = timed(lambda text, site: _dateparser(text), sample) * n / len(sample)
+    print(f"dateparser.parse              {n / slow:12,.0f}/s  ({mismatched}/{len(sample)} differ from the expected value)")
+    print(f"speed-up: {slow / cold:.0f}x on the corpus, {slow / uncached:.0f}x with no repeated strings")
+
+def _throughput(func, pages, seconds):
+    # Silenced: the messy pages make the extractors print skipped items
+    done = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() - start < seconds:
+            for page in pages:
+                func(page)
+            done += len(pages)
+    return done / (time.perf_counter() - start)
+
+def extract(seconds=2.0):
+    # BeautifulSoup with html.parser against the lxml path that replaced it,
+    # on every fixture of the case (tests/test_fast_extract.py checks they agree)
+    import sindo
+    import tempo
+    cases = [
+        ('tempo article', 'tempo_article', True,
+         lambda page: tempo.extract_article_soup(page, 'fixture'), lambda page: tempo.extract_article(page, 'fixture')),
+        ('sindo listing', 'sindo_listing', False, sindo.parse_listing_soup, sindo.parse_listing),
+        ('sindo article', 'sindo_article', False, sindo.extract_content_soup, sindo.extract_content),
+    ]
+    for name, prefix, as_text, slow, fast in cases:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(FIXTURES, prefix + '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append(f.read().decode('utf-8') if as_text else f.read())
+        slow_rate = _throughput(slow, pages, seconds)
+        fast_rate = _throughput(fast, pages, seconds)
+        print(f'{name:14} {len(pages)} pages | html.parser {slow_rate:8.1f} pages/s | lxml {fast_rate:8.1f} pages/s | {fast_rate / slow_rate:5.1f}x')
+
+BENCHMARKS = {
+    'pool': (pool, int),
+    'sinks': (sinks, int),
+    'sentiment': (sentiment, int, int),
+    'dedup': (dedup, int),
+    'dates': (dates, int),
+    'extract': (extract, float),
+}
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print(f"Usage: python bench.py {{{'|'.join(BENCHMARKS)}}} [args]")
+        sys.exit(1)
+    func, *types = BENCHMARKS[sys.argv[1]]
+    func(*[convert(value) for convert, value in zip(types, sys.argv[2:])])
+
+if __name__ == "__main__":
+    main()
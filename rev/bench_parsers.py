@@ -0,0 +1,188 @@
+import gc
+import importlib
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Offline benchmark of every site's extraction code over the pages in
+# fixtures/ (generated by make_fixtures.py, see there):
+#   python bench_parsers.py [save|check] [seconds]
+# Reports pages/sec, the memory blocks a parsed page keeps alive and the peak
+# heap while parsing it, and compares them with fixtures/bench_baseline.json
+# (written by `save`). `check` exits with 1 on a regression; without it the
+# comparison is only printed. tracemalloc only sees the Python heap: libxml2
+# builds lxml trees with its own malloc, so lxml extractors look lighter than
+# they are.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASELINE = os.path.join(FIXTURES, 'bench_baseline.json')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYWORD = 'banjir'
+# Slower than this share of the baseline rate, or a peak this many times
+# larger, counts as a regression
+MIN_SPEED = 0.7
+MAX_PEAK = 1.25
+# Rounds per extractor; the fastest counts, since noise only slows a round down
+REPEATS = 5
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+def cse_pages(name):
+    # Element API responses as the site receives them, wrapped around the
+    # synthetic payload files (see tests/test_google_cse.py)
+    payload_file = json.loads(load(name))
+    return [f"/*O_o*/\ngoogle.search.cse.api0({json.dumps(payload, ensure_ascii=False)});"
+            for payload in payload_file['payloads']]
+
+def extractors():
+    # (name, pages, extract(page), count(result) of records found)
+    import cnbc
+    import detik
+    import google_cse
+    import jawapos_http
+    import jp
+    import sindo
+    import tempo
+    import tribun
+    # kompas.py lives next to rev/; appended so the root cnbc.py/detik.py
+    # never shadow the ones in rev/
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+    kompas = importlib.import_module('kompas')
+
+    def detik_listing(html):
+        return [(link, detik.parse_listing_date(date), headline) for link, date, headline in detik.parse_listing(html)]
+
+    def jawapos_listing(html):
+        return [dict(item, date=jp.parse_date(item['text_content']))
+                for item in jawapos_http.parse_items(html, 'https://www.jawapos.com/search')]
+
+    def sindo_listing(html):
+        return [dict(item, published=sindo.parse_news_date(item['news_date'])) for item in sindo.parse_listing(html)]
+
+    def search_results(text):
+        return google_cse.result_items(google_cse.parse_payload(text))
+
+    return [
+        ('cnbc listing', [load('cnbc_listing.html').decode('utf-8')],
+         lambda html: cnbc.listing_links(html, KEYWORD), lambda links: sum(link is not None for link in links)),
+        ('cnbc article', [load('cnbc_article.html').decode('utf-8')],
+         lambda html: cnbc.parse_article(html, True), lambda parsed: bool(parsed and parsed['content'])),
+        ('detik listing', [load('detik_listing.html').decode('utf-8')],
+         detik_listing, lambda rows: sum(date is not None for _, date, _ in rows)),
+        ('detik article', [load('detik_article.html').decode('utf-8')],
+         detik.parse_article_content, lambda content: bool(content) and 'ADVERTISEMENT' not in content),
+        ('jawapos listing', [load('jawapos_listing.html')],
+         jawapos_listing, lambda items: sum(item['date'] is not None for item in items)),
+        ('kompas search', cse_pages('cse_kompas.json'),
+         lambda text: kompas.page_news(search_results(text)), len),
+        ('sindo listing', [load('sindo_listing.html')],
+         sindo_listing, lambda items: sum(item['published'] is not None for item in items)),
+        ('sindo article', [load('sindo_article.html')], sindo.extract_content, bool),
+        ('tempo listing', [load('tempo_listing.html').decode('utf-8')], tempo.search_links, len),
+        ('tempo article', [load('tempo_article.html').decode('utf-8')],
+         lambda html: tempo.extract_article(html, 'fixture'), lambda article: article['Content'] != "No content found"),
+        ('tribun search', cse_pages('cse_tribun.json'),
+         lambda text: tribun.page_news(search_results(text), set()), len),
+    ]
+
+def throughput(func, pages, seconds, repeats=REPEATS):
+    best = 0.0
+    for _ in range(repeats):
+        done = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds / repeats:
+            for page in pages:
+                func(page)
+            done += len(pages)
+        best = max(best, done / (time.perf_counter() - start))
+    return best
+
+def memory(func, pages):
+    # (blocks kept alive by one page's result, peak KiB while parsing one page)
+    gc.collect()
+    tracemalloc.start()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    results = []
+    for page in pages:
+        results.append(func(page))
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    # BeautifulSoup trees are reference cycles; count only what the results hold
+    gc.collect()
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del results
+    return blocks / len(pages), peak / 1024
+
+def run(seconds=2.0):
+    results = {}
+    for name, pages, func, count in extractors():
+        found = [count(func(page)) for page in pages]
+        if not all(found):
+            raise AssertionError(f'{name}: nothing extracted from the fixture ({found})')
+        rate = throughput(func, pages, seconds)
+        blocks, peak = memory(func, pages)
+        results[name] = {'pages_per_sec': round(rate, 1), 'blocks': round(blocks), 'peak_kib': round(peak, 1)}
+    return results
+
+def compare(results, baseline):
+    regressions = []
+    print(f"{'extractor':16} {'pages/s':>9} {'blocks':>7} {'peak KiB':>9}   vs baseline")
+    for name, r in results.items():
+        old = baseline.get(name)
+        note = ''
+        if old:
+            speed = r['pages_per_sec'] / old['pages_per_sec']
+            growth = r['peak_kib'] / old['peak_kib'] if old['peak_kib'] else 1.0
+            note = f"speed x{speed:.2f}, peak x{growth:.2f}"
+            if speed < MIN_SPEED or growth > MAX_PEAK:
+                regressions.append(name)
+                note += '  REGRESSION'
+        elif baseline:
+            note = 'new'
+        print(f"{name:16} {r['pages_per_sec']:9.1f} {r['blocks']:7d} {r['peak_kib']:9.1f}   {note}")
+    # ru_maxrss is in KiB on Linux
+    print(f"process peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    return regressions
+
+def main():
+    args = sys.argv[1:]
+    mode = args.pop(0) if args and args[0] in ('save', 'check') else None
+    save = mode == 'save'
+    seconds = float(args[0]) if args else 2.0
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding='utf-8') as f:
+            baseline = json.load(f)
+    results = run(seconds)
+    regressions = compare(results, baseline.get('results', {}))
+    if save:
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'saved': datetime.now().strftime('%Y-%m-%d %H:%M'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=1)
+            f.write('\n')
+        print(f"Baseline saved to {BASELINE}")
+    elif regressions:
+        print(f"Slower or larger than the baseline: {', '.join(regressions)}")
+        if mode == 'check':
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
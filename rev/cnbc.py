@@ -1,185 +1,320 @@
-
-import requests as req
+import asyncio
+import aiohttp
+import http_cache
+import rate_limit
+import retry
+from sinks import JsonLinesWriter, ParquetSink, iter_jsonl, jsonl_to_json
 from bs4 import BeautifulSoup as bs
 from datetime import datetime, timedelta
 import csv
-import json
 from collections import defaultdict, Counter
-import time
 import random
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import time
+import sentiment_pool
+from dedup import NearDuplicateIndex
+from dates import parse_date
+from metrics import get_metrics, timed
 from tqdm import tqdm
 
-def scrape_cnbc(headers_list, keyword, start_date, duration_days, scrape_full):
+LISTING_CLASS = 'list media_rows middle thumb terbaru gtm_indeks_feed'
+SEARCH_URL = 'https://www.cnbcindonesia.com/search?query={}&p={}&kanal=&tipe=artikel&date='
+
+HEADERS_LIST = [
+    {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+        'Accept-Language': 'en-US,en;q=0.9'
+    },
+    {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+        'Accept-Language': 'en-US,en;q=0.9'
+    },
+    {
+        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
+        'Accept-Language': 'en-US,en;q=0.9'
+    }
+]
+
+async def fetch_html(session, semaphore, url, headers):
+    # 429/5xx and network errors are retried with backoff; the limiter holds
+    # each attempt back for as long as a Retry-After asked. The semaphore is
+    # only held while a request is in flight, not during the backoff.
+    async def attempt():
+        async with semaphore:
+            async with rate_limit.limited_get(session, url, headers=headers) as response:
+                response.raise_for_status()
+                return await response.text()
+    return await retry.get_policy().run(url, attempt)
+
+async def fetch_article_html(session, semaphore, url, headers):
+    async def attempt():
+        async with semaphore:
+            return await http_cache.fetch_text_async(session, url, headers, limiter=rate_limit.get_limiter())
+    return await retry.get_policy().run(url, attempt)
+
+@timed('parse', 'cnbc')
+def parse_article(html, scrape_full, link=None):
+    metrics = get_metrics()
+    sop_ = bs(html, 'lxml')
+    art_div = sop_.find('div', class_='lm_content mt10')
+    if art_div is None:
+        metrics.drop('cnbc', 'no_art_div', link)
+        return None
+    art = art_div.find('article')
+    if art is None:
+        metrics.drop('cnbc', 'no_article', link)
+        return None
+    headline = art.find('h1')
+    if headline is None:
+        metrics.drop('cnbc', 'no_headline', link)
+        return None
+    headline = headline.text
+    date_div = art.find('div', class_='date')
+    if date_div is None:
+        metrics.drop('cnbc', 'no_date_div', link)
+        return None
+    date = date_div.text
+    article_date = parse_date(date, 'cnbc')
+    if article_date is None:
+        print(f"Date parsing failed for date: {date}")
+        metrics.drop('cnbc', 'bad_date', link)
+        return None
+    content = None
     if scrape_full:
-        filename = f'cnbcindonesia_full_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-    else:
-        filename = f'cnbcindonesia_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-    
-    end_date = start_date
-    start_date = end_date - timedelta(days=duration_days)
-
+        content_div = art.find('div', class_='detail_text')
+        if content_div is None:
+            # Still report the date so the window check sees it
+            return {"headline": headline, "date": article_date, "content": None}
+        paragraphs = content_div.find_all('p')
+        content = '\n'.join([p.text.strip() for p in paragraphs if p.text.strip()])
+    return {"headline": headline, "date": article_date, "content": content}
+
+@timed('parse', 'cnbc')
+def listing_links(html, keyword):
+    # (link, headline) per listing item, None where the item is skipped
+    sop = bs(html, 'lxml')
+    ul = sop.find('ul', class_=LISTING_CLASS)
+    if ul is None:
+        return None
+    li = ul.find_all('li')
+    if not li:
+        return None
+    links = []
+    for x in li:
+        article = x.find('article')
+        if article is None:
+            links.append(None)
+            continue
+        a_tag = article.find('a')
+        title = a_tag.text.strip() if a_tag and a_tag.text else None
+        if a_tag is None or (keyword.lower() not in title.lower()):
+            links.append(None)
+            continue
+        headline = a_tag.find('h2')
+        links.append((a_tag['href'], headline.get_text(strip=True) if headline else title))
+    return links
+
+def listing_url(keyword, page):
+    return SEARCH_URL.format(keyword, page)
+
+def sample_links(html):
+    # Links from the bottom of the page up; the last item is the oldest one
+    sop = bs(html, 'lxml')
+    ul = sop.find('ul', class_=LISTING_CLASS)
+    if ul is None:
+        return []
+    links = []
+    for x in reversed(ul.find_all('li')):
+        a_tag = x.find('article').find('a') if x.find('article') else None
+        if a_tag is not None and a_tag.get('href'):
+            links.append(a_tag['href'])
+    return links
+
+async def oldest_date_on_page(session, semaphore, headers_list, keyword, page, max_samples=3):
+    # Returns (has_results, date); date is None when no sampled article parsed.
+    # Listings mix in video and photo pages that have no article date, so a
+    # failed parse moves on to the next oldest item, up to max_samples
+    headers = random.choice(headers_list)
+    links = sample_links(await fetch_html(session, semaphore, listing_url(keyword, page), headers))
+    if not links:
+        return False, None
+    for link in links[:max_samples]:
+        parsed = parse_article(await fetch_article_html(session, semaphore, link, headers), False)
+        if parsed is not None:
+            return True, parsed["date"]
+    return True, None
+
+async def locate_start_page(session, semaphore, headers_list, keyword, end_date):
+    # Results are newest first, so "oldest article on page p is not newer than
+    # end_date" is monotone in p. Gallop to bracket the first such page, then
+    # binary search inside the bracket, sampling one date per probed page.
+    probes = {}
+
+    async def reaches_window(page):
+        if page not in probes:
+            probes[page] = await oldest_date_on_page(session, semaphore, headers_list, keyword, page)
+            has_results, date = probes[page]
+            print(f"Probe page {page}: {date.strftime('%d %B %Y') if date else 'no results' if not has_results else 'no date'}")
+        has_results, date = probes[page]
+        # Empty pages are past the end; undated pages are treated as reached
+        # so the crawl starts early rather than skipping part of the window
+        return not has_results or date is None or date <= end_date
+
+    lo, hi = 0, 1
+    while not await reaches_window(hi):
+        lo, hi = hi, hi * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if await reaches_window(mid):
+            hi = mid
+        else:
+            lo = mid
+    if not probes[hi][0]:
+        # Every page holding results is newer than the window
+        return None
+    return hi
+
+async def scrape_cnbc_async(headers_list, keyword, start_date, end_date, scrape_full, on_article, concurrency=10, locate=False, dedup=None):
+    # Article pages of one listing page are fetched in parallel, then handled
+    # in listing order so the date-window stop and the output stay deterministic
+    semaphore = asyncio.Semaphore(concurrency)
+    metrics = get_metrics()
     total_attempts = 0
     page = 1
-    more_pages = True
-
-    monthly_counts = defaultdict(int)
-    yearly_counts = defaultdict(int)
-    total_count = 0
-
-    articles = []
-
-    if not scrape_full:
-        with open(filename, 'w', newline='', encoding='utf-8') as file:
-            wr = csv.writer(file, delimiter=',')
-            wr.writerow(["Title", "Date", "Link"])
-            while more_pages:
-                headers = random.choice(headers_list)
-                url_cnbc = f"https://www.cnbcindonesia.com/search?query={keyword}&p={page}&kanal=&tipe=artikel&date="
-                try:
-                    response = req.get(url_cnbc, headers=headers)
-                    response.raise_for_status()
-                    sop = bs(response.text, 'lxml')
-                    ul = sop.find('ul', class_='list media_rows middle thumb terbaru gtm_indeks_feed')
-                    if ul is None:
-                        break
-                    li = ul.find_all('li')
-                    if not li:
-                        break
-                    for x in li:
-                        total_attempts += 1
-                        article = x.find('article')
-                        if article is None:
-                            continue
-                        a_tag = article.find('a')
-                        title = a_tag.text.strip() if a_tag and a_tag.text else None
-                        if a_tag is None or (keyword.lower() not in title.lower()):
-                            continue
-                        link_art = a_tag['href']
-                        response = req.get(link_art, headers=headers)
-                        response.raise_for_status()
-                        sop_ = bs(response.text, 'lxml')
-                        art_div = sop_.find('div', class_='lm_content mt10')
-                        if art_div is None:
-                            continue
-                        art = art_div.find('article')
-                        if art is None:
-                            continue
-                        headline = art.find('h1')
-                        if headline is None:
-                            continue
-                        headline = headline.text
-                        date_div = art.find('div', class_='date')
-                        if date_div is None:
-                            continue
-                        date = date_div.text
-                        try:
-                            article_date = datetime.strptime(date, '%d %B %Y %H:%M')
-                        except ValueError:
-                            print(f"Date parsing failed for date: {date}")
-                            continue
-                        if article_date < start_date:
-                            more_pages = False
-                            break
-                        if article_date > end_date:
-                            continue
-
-                        print(f'No: {total_count + 1} | Date: {article_date.strftime("%d %B %Y")} | Title: {headline}')
-                        wr.writerow([headline, article_date.strftime('%d %B %Y %H:%M'), link_art])
-                        total_count += 1
-
-                        monthly_counts[article_date.strftime('%Y-%m')] += 1
-                        yearly_counts[article_date.year] += 1
-
-                    page += 1
-                    time.sleep(random.uniform(0.5, 2))
-
-                except Exception as e:
-                    print(f"Failed to process page {page}: {str(e)}")
-                    break
-
-    else:
-        while more_pages:
+    timeout = aiohttp.ClientTimeout(total=30)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        if locate:
+            try:
+                page = await locate_start_page(session, semaphore, headers_list, keyword, end_date)
+            except Exception as e:
+                print(f"Failed to locate the first page, starting from page 1: {str(e)}")
+                page = 1
+            if page is None:
+                print("No search results reach the requested date window.")
+                return total_attempts
+            print(f"Starting from page {page}")
+        while True:
             headers = random.choice(headers_list)
-            url_cnbc = f"https://www.cnbcindonesia.com/search?query={keyword}&p={page}&kanal=&tipe=artikel&date="
+            url_cnbc = listing_url(keyword, page)
             try:
-                response = req.get(url_cnbc, headers=headers)
-                response.raise_for_status()
-                sop = bs(response.text, 'lxml')
-                ul = sop.find('ul', class_='list media_rows middle thumb terbaru gtm_indeks_feed')
-                if ul is None:
-                    break
-                li = ul.find_all('li')
-                if not li:
+                links = listing_links(await fetch_html(session, semaphore, url_cnbc, headers), keyword)
+                if links is None:
                     break
-                for x in li:
-                    total_attempts += 1
-                    article = x.find('article')
-                    if article is None:
-                        continue
-                    a_tag = article.find('a')
-                    title = a_tag.text.strip() if a_tag and a_tag.text else None
-                    if a_tag is None or (keyword.lower() not in title.lower()):
+                total_attempts += len(links)
+                listed = [link for link in links if link is not None]
+                if len(listed) < len(links):
+                    metrics.count('dropped_total', len(links) - len(listed), site='cnbc', reason='keyword_mismatch')
+                wanted = []
+                for link_art, title in listed:
+                    # A near-identical headline is already known; skip the fetch
+                    if dedup is not None and dedup.seen_title(link_art, title):
+                        metrics.drop('cnbc', 'duplicate', link_art)
                         continue
-                    link_art = a_tag['href']
-                    response = req.get(link_art, headers=headers)
-                    response.raise_for_status()
-                    sop_ = bs(response.text, 'lxml')
-                    art_div = sop_.find('div', class_='lm_content mt10')
-                    if art_div is None:
+                    wanted.append(link_art)
+                pages = await asyncio.gather(
+                    *[fetch_article_html(session, semaphore, link, headers) for link in wanted],
+                    return_exceptions=True
+                )
+                more_pages = True
+                for link_art, html in zip(wanted, pages):
+                    if isinstance(html, Exception):
+                        # Retries are spent; the rest of the page still counts
+                        print(f"Failed to fetch {link_art}: {html}")
+                        metrics.drop('cnbc', 'fetch_failed', link_art)
                         continue
-                    art = art_div.find('article')
-                    if art is None:
+                    parsed = parse_article(html, scrape_full, link_art)
+                    if parsed is None:
                         continue
-                    headline = art.find('h1')
-                    if headline is None:
-                        continue
-                    headline = headline.text
-                    date_div = art.find('div', class_='date')
-                    if date_div is None:
-                        continue
-                    date = date_div.text
-                    try:
-                        article_date = datetime.strptime(date, '%d %B %Y %H:%M')
-                    except ValueError:
-                        print(f"Date parsing failed for date: {date}")
-                        continue
-                    if article_date < start_date:
+                    if parsed["date"] < start_date:
+                        metrics.drop('cnbc', 'older_than_window', link_art)
                         more_pages = False
                         break
-                    if article_date > end_date:
+                    if parsed["date"] > end_date:
+                        metrics.drop('cnbc', 'newer_than_window', link_art)
                         continue
-
-                    content_div = art.find('div', class_='detail_text')
-                    if content_div is None:
+                    if scrape_full and parsed["content"] is None:
+                        metrics.drop('cnbc', 'no_content', link_art)
                         continue
-                    paragraphs = content_div.find_all('p')
-                    content = '\n'.join([p.text.strip() for p in paragraphs if p.text.strip()])
-
-                    print(f'No: {total_count + 1} | Date: {article_date.strftime("%d %B %Y")} | Title: {headline}')
-                    articles.append({
-                        "Title": headline,
-                        "Date": article_date.strftime('%d %B %Y %H:%M'),
-                        "Link": link_art,
-                        "Content": content
-                    })
-                    total_count += 1
-
-                    monthly_counts[article_date.strftime('%Y-%m')] += 1
-                    yearly_counts[article_date.year] += 1
+                    if dedup is not None and scrape_full and dedup.seen_content(link_art, parsed["content"]):
+                        metrics.drop('cnbc', 'duplicate', link_art)
+                        continue
+                    on_article(parsed, link_art)
+                if not more_pages:
+                    break
 
                 page += 1
-                time.sleep(random.uniform(0.5, 2))
 
             except Exception as e:
                 print(f"Failed to process page {page}: {str(e)}")
                 break
+    return total_attempts
 
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(articles, file, ensure_ascii=False, indent=4)
+def scrape_cnbc(headers_list, keyword, start_date, duration_days, scrape_full, concurrency=10, locate=None, pretty_json=True, dedup=None):
+    if scrape_full:
+        filename = f'cnbcindonesia_full_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'
+    else:
+        filename = f'cnbcindonesia_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    
+    end_date = start_date
+    start_date = end_date - timedelta(days=duration_days)
+    if locate is None:
+        # Only windows ending before today have newer pages worth skipping
+        locate = end_date.date() < datetime.now().date()
+
+    monthly_counts = defaultdict(int)
+    yearly_counts = defaultdict(int)
+    total_count = 0
+
+    def on_article(parsed, link_art):
+        nonlocal total_count
+        article_date = parsed["date"]
+        headline = parsed["headline"]
+        print(f'No: {total_count + 1} | Date: {article_date.strftime("%d %B %Y")} | Title: {headline}')
+        if scrape_full:
+            sink.write({
+                "Title": headline,
+                "Date": article_date.strftime('%d %B %Y %H:%M'),
+                "Link": link_art,
+                "Content": parsed["content"]
+            })
+        else:
+            wr.writerow([headline, article_date.strftime('%d %B %Y %H:%M'), link_art])
+        columns.write({"title": headline, "link": link_art, "published": article_date, "content": parsed["content"]})
+        total_count += 1
+
+        monthly_counts[article_date.strftime('%Y-%m')] += 1
+        yearly_counts[article_date.year] += 1
+
+    # Every article is also appended to the shared Parquet dataset
+    with ParquetSink('cnbc') as columns:
+        if not scrape_full:
+            with open(filename, 'w', newline='', encoding='utf-8') as file:
+                wr = csv.writer(file, delimiter=',')
+                wr.writerow(["Title", "Date", "Link"])
+                total_attempts = asyncio.run(scrape_cnbc_async(headers_list, keyword, start_date, end_date, scrape_full, on_article, concurrency, locate, dedup))
+        else:
+            # Records are streamed to JSON Lines as they arrive instead of being
+            # held in memory until the end of the crawl
+            with JsonLinesWriter(filename) as sink:
+                total_attempts = asyncio.run(scrape_cnbc_async(headers_list, keyword, start_date, end_date, scrape_full, on_article, concurrency, locate, dedup))
+            print(f"Saved {sink.count} articles to {filename}")
+    print(f"Saved {columns.count} articles to the Parquet dataset")
+
+    if scrape_full and pretty_json:
+        json_filename = filename[:-len('.jsonl')] + '.json'
+        jsonl_to_json(filename, json_filename)
+        print(f"Saved pretty JSON copy to {json_filename}")
 
     print(f"\nTotal news articles attempted: {total_attempts}")
     print(f"Total news articles successfully processed: {total_count}")
+    http_cache.get_cache().report()
+    rate_limit.get_limiter().report()
+    retry.get_policy().report()
+    if dedup is not None:
+        dedup.report()
 
     print("\nYearly counts:")
     for year, count in sorted(yearly_counts.items(), reverse=True):
@@ -197,20 +332,21 @@ def scrape_cnbc(headers_list, keyword, start_date, duration_days, scrape_full):
         if analyze_sentiment == 'yes':
             vader_sentiment_counts = Counter()
             vader_sentiment_articles = {"Positive": [], "Negative": [], "Neutral": []}
-            analyzer = SentimentIntensityAnalyzer()
 
             print("Performing sentiment analysis...")
-            for article in tqdm(articles, desc="Sentiment Analysis"):
-                content = article["Content"]
-                vader_sentiment = analyzer.polarity_scores(content)["compound"]
-                if vader_sentiment >= 0.05:
-                    vader_sentiment_category = "Positive"
-                elif vader_sentiment <= -0.05:
-                    vader_sentiment_category = "Negative"
-                else:
-                    vader_sentiment_category = "Neutral"
+            # Contents are scored across processes; titles are read in a second
+            # pass so neither list has to hold every article body
+            start = time.perf_counter()
+            scores = sentiment_pool.compound_scores(article["Content"] for article in iter_jsonl(filename))
+            titles = (article["Title"] for article in iter_jsonl(filename))
+            for title, vader_sentiment in tqdm(zip(titles, scores), total=total_count, desc="Sentiment Analysis"):
+                vader_sentiment_category = sentiment_pool.category(vader_sentiment)
                 vader_sentiment_counts[vader_sentiment_category] += 1
-                vader_sentiment_articles[vader_sentiment_category].append(article["Title"])
+                vader_sentiment_articles[vader_sentiment_category].append(title)
+            elapsed = time.perf_counter() - start
+            get_metrics().observe('stage_seconds', elapsed, stage='enrich', site='cnbc')
+            if total_count and elapsed > 0:
+                print(f"Scored {total_count} articles in {elapsed:.2f}s ({total_count / elapsed:.1f} articles/sec)")
 
             print("\nVADER Sentiment Analysis Report:")
             for sentiment, count in vader_sentiment_counts.items():
@@ -219,6 +355,7 @@ def scrape_cnbc(headers_list, keyword, start_date, duration_days, scrape_full):
                 print(f"\n{sentiment} Articles:")
                 for i, title in enumerate(titles, 1):
                     print(f"{i}. {title}")
+    get_metrics().report()
 
 def main():
     print("Scraping cnbcindonesia.com\n")
@@ -248,6 +385,9 @@ def main():
         else:
             print("Invalid input. Please enter 'yes' or 'no'.")
 
+    concurrency = input("Enter the number of concurrent article requests (default 10): ").strip()
+    concurrency = int(concurrency) if concurrency.isdigit() and int(concurrency) > 0 else 10
+
     if duration_type == 'day':
         duration_days = duration_value
     elif duration_type == 'week':
@@ -257,31 +397,23 @@ def main():
     elif duration_type == 'year':
         duration_days = duration_value * 365
 
-    headers_list = [
-        {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'en-US,en;q=0.9'
-        },
-        {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'en-US,en;q=0.9'
-        },
-        {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }
-    ]
-
-    today_date = datetime.now()
-    start_date = today_date
+    while True:
+        end_date_input = input("Enter the end date (DD/MM/YYYY) or press enter to use today's date: ").strip()
+        if not end_date_input:
+            start_date = datetime.now()
+            break
+        try:
+            # Include the whole end day
+            start_date = datetime.strptime(end_date_input, '%d/%m/%Y') + timedelta(days=1) - timedelta(seconds=1)
+            break
+        except ValueError:
+            print("Invalid date. Please use DD/MM/YYYY.")
 
     end_date = start_date - timedelta(days=duration_days)
     print(f"\nScraping articles from {end_date.strftime('%d %B %Y')} to {start_date.strftime('%d %B %Y')}\n")
 
-    scrape_cnbc(headers_list, keyword_input, start_date, duration_days, scrape_full)
+    scrape_cnbc(HEADERS_LIST, keyword_input, start_date, duration_days, scrape_full, concurrency, dedup=NearDuplicateIndex())
+    get_metrics().close()
 
 if __name__ == "__main__":
     main()
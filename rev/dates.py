@@ -0,0 +1,103 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Dates as the scraped sites print them, parsed without dateparser or the
+# process locale. Month names come from fixed Indonesian/English tables, so
+# "5 Mei 2024" and "5 May 2024" parse the same under any LC_TIME. Results are
+# memoised: a listing page repeats the same few dates many times.
+#
+#   cnbc     10 Juni 2024 14:30
+#   detik    10 Jun 2024 14:30            (after the weekday is cut off)
+#   jawapos  Senin, 10 Juni 2024 | 14:30 WIB
+#   sindo    Senin, 10 Juni 2024 - 14:30 WIB
+#   tempo    2024-06-10T14:30:00+07:00, 2024-06-10 14:30 WIB
+#   kompas   10-06-2024                   (tribun too)
+MONTHS = {
+    'januari': 1, 'january': 1, 'jan': 1,
+    'februari': 2, 'pebruari': 2, 'february': 2, 'feb': 2, 'peb': 2,
+    'maret': 3, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'mei': 5, 'may': 5,
+    'juni': 6, 'june': 6, 'jun': 6,
+    'juli': 7, 'july': 7, 'jul': 7,
+    'agustus': 8, 'august': 8, 'agu': 8, 'agt': 8, 'ags': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9,
+    'oktober': 10, 'october': 10, 'okt': 10, 'oct': 10,
+    'november': 11, 'nopember': 11, 'nov': 11, 'nop': 11,
+    'desember': 12, 'december': 12, 'des': 12, 'dec': 12,
+}
+DAYS = {
+    'senin': 0, 'monday': 0, 'selasa': 1, 'tuesday': 1, 'rabu': 2, 'wednesday': 2,
+    'kamis': 3, 'thursday': 3, 'jumat': 4, "jum'at": 4, 'friday': 4,
+    'sabtu': 5, 'saturday': 5, 'minggu': 6, 'ahad': 6, 'sunday': 6,
+}
+RELATIVE = {
+    'detik': 'seconds', 'second': 'seconds', 'seconds': 'seconds',
+    'menit': 'minutes', 'minute': 'minutes', 'minutes': 'minutes',
+    'jam': 'hours', 'hour': 'hours', 'hours': 'hours',
+    'hari': 'days', 'day': 'days', 'days': 'days',
+    'minggu': 'weeks', 'week': 'weeks', 'weeks': 'weeks',
+}
+
+_TIME = r'(?:(?P<hour>\d{1,2})[:.](?P<minute>\d{2})(?::(?P<second>\d{2}))?)'
+_TEXT_DATE = r'(?P<day>\d{1,2})\s+(?P<month>[A-Za-z]+)\.?,?\s+(?P<year>\d{4})'
+_GENERIC = [
+    re.compile(_TEXT_DATE + r'(?:\s*[,|\-]?\s*' + _TIME + r')?'),
+    re.compile(r'(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?:[T ]' + _TIME + r')?'),
+    re.compile(r'(?P<day>\d{1,2})[-/.](?P<month>\d{1,2})[-/.](?P<year>\d{4})(?:\s+' + _TIME + r')?'),
+]
+SITE_PATTERNS = {
+    'cnbc': [re.compile(_TEXT_DATE + r'\s+' + _TIME)],
+    'detik': [re.compile(_TEXT_DATE + r'\s+' + _TIME)],
+    'jawapos': [re.compile(r'\w+, ' + _TEXT_DATE + r' \| ' + _TIME + r' WIB')],
+    'sindo': [re.compile(_TEXT_DATE + r'\s+-\s+' + _TIME)],
+    'tempo': [_GENERIC[1]],
+    'kompas': [_GENERIC[2]],
+    'tribun': [_GENERIC[2]],
+}
+_AGO = re.compile(r'(\d+)\s+([a-z]+)\s+(?:yang\s+)?(?:lalu|ago)')
+
+def _build(match):
+    parts = match.groupdict()
+    month = parts['month']
+    month = int(month) if month.isdigit() else MONTHS.get(month.lower())
+    if month is None:
+        return None
+    try:
+        return datetime(int(parts['year']), month, int(parts['day']),
+                        int(parts['hour'] or 0), int(parts['minute'] or 0), int(parts['second'] or 0))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=8192)
+def _parse(text, site):
+    for pattern in SITE_PATTERNS.get(site) or _GENERIC:
+        match = pattern.search(text)
+        if match:
+            parsed = _build(match)
+            if parsed is not None:
+                return parsed
+    return None
+
+def parse_date(text, site=None):
+    # Naive datetime (site-local time, as printed), or None when nothing in
+    # `text` looks like a date. `site` restricts matching to that site's
+    # layout; without it every known layout is tried.
+    if text is None:
+        return None
+    if isinstance(text, datetime):
+        return text
+    parsed = _parse(text, site)
+    if parsed is None and site in (None, 'detik'):
+        # "5 menit yang lalu" depends on the clock, so it is never cached
+        match = _AGO.search(text.lower())
+        if match and match.group(2) in RELATIVE:
+            parsed = datetime.now().replace(microsecond=0) - timedelta(**{RELATIVE[match.group(2)]: int(match.group(1))})
+    return parsed
+
+def cache_info():
+    return _parse.cache_info()
+
+def cache_clear():
+    _parse.cache_clear()
@@ -0,0 +1,108 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Streaming near-duplicate detection with MinHash LSH. Titles are compared on
+# character 5-grams (rewrites of one headline share most of them), bodies on
+# word 3-grams. A signature is split into bands; two texts become candidates
+# when any band matches exactly, and a candidate counts as a duplicate when
+# the estimated Jaccard similarity reaches the threshold.
+NUM_PERM = 128
+BANDS = 16
+MERSENNE = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD = re.compile(r'\w+')
+
+def normalise(text):
+    return ' '.join(WORD.findall(text.lower()))
+
+def char_shingles(text, k=5):
+    text = normalise(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+def word_shingles(text, k=3):
+    words = normalise(text).split()
+    if len(words) <= k:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 61) - 1, num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, (1 << 61) - 1, num_perm, dtype=np.uint64)
+
+    def signature(self, shingles):
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # Overflow wraps mod 2**64 before the mod-prime step, as in datasketch
+        return ((np.outer(hashes, self.a) + self.b) % MERSENNE & MAX_HASH).min(axis=0)
+
+class LshIndex:
+    def __init__(self, threshold, num_perm=NUM_PERM, bands=BANDS):
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def _bands(self, signature):
+        for i, bucket in enumerate(self.buckets):
+            yield bucket, signature[i * self.rows:(i + 1) * self.rows].tobytes()
+
+    def query(self, signature):
+        # Key of the most similar indexed text at or above the threshold
+        best, best_score = None, self.threshold
+        seen = set()
+        for bucket, band in self._bands(signature):
+            for key in bucket.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = float(np.mean(self.signatures[key] == signature))
+                if score >= best_score:
+                    best, best_score = key, score
+        return best
+
+    def insert(self, key, signature):
+        self.signatures[key] = signature
+        for bucket, band in self._bands(signature):
+            bucket.setdefault(band, []).append(key)
+
+class NearDuplicateIndex:
+    # seen_title/seen_content return the key of an earlier near-duplicate, or
+    # index the text under `key` and return None. Safe to share between the
+    # threads of a multi-source crawl.
+    def __init__(self, threshold=0.8, title_threshold=0.9, num_perm=NUM_PERM, bands=BANDS):
+        self.hasher = MinHasher(num_perm)
+        self.titles = LshIndex(title_threshold, num_perm, bands)
+        self.bodies = LshIndex(threshold, num_perm, bands)
+        self.lock = threading.Lock()
+        self.title_duplicates = 0
+        self.content_duplicates = 0
+
+    def _seen(self, index, key, signature, counter):
+        # counter: the attribute counting this index's duplicates
+        if signature is None:
+            return None
+        with self.lock:
+            duplicate = index.query(signature)
+            if duplicate is None:
+                index.insert(key, signature)
+            else:
+                setattr(self, counter, getattr(self, counter) + 1)
+            return duplicate
+
+    def seen_title(self, key, title):
+        return self._seen(self.titles, key, self.hasher.signature(char_shingles(title or '')), 'title_duplicates')
+
+    def seen_content(self, key, content):
+        return self._seen(self.bodies, key, self.hasher.signature(word_shingles(content or '')), 'content_duplicates')
+
+    def report(self):
+        print(f"Near-duplicates: {self.title_duplicates} skipped by title before fetching, "
+              f"{self.content_duplicates} dropped by content")
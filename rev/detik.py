@@ -4,9 +4,19 @@ import json
 import csv
 from datetime import datetime, timedelta
 import random
-import dateparser
+import time
+import http_pool
+import http_cache
+import retry
+from seen_store import SeenStore
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import sentiment_pool
+from sinks import write_parquet
+from dedup import NearDuplicateIndex
+from dates import parse_date
+from metrics import get_metrics, timed
+
+SEARCH_URL = 'https://www.detik.com/search/searchnews?query={}&sortby=time&page={}'
 
 def get_random_headers():
     user_agents = [
@@ -44,25 +54,46 @@ def get_date_range(period, num_periods, end_date=None):
     
     return start_date, end_date
 
+@timed('parse', 'detik')
+def parse_article_content(html):
+    article_soup = bs(html, 'lxml')
+    content_div = article_soup.find_all('div', class_='detail__body-text itp_bodycontent')
+    content_text = ''
+    for div in content_div:
+        paragraphs = div.find_all('p')
+        content_text += ''.join(p.text for p in paragraphs).replace('\n', '')
+    
+    content_text = content_text.replace('ADVERTISEMENT', '').replace('\r\r\rSCROLL TO CONTINUE WITH CONTENT\r', '')
+    return content_text
+
 def fetch_article_content(link, headers):
     try:
-        article_response = req.get(link, headers=headers)
-        article_response.raise_for_status()
-        article_soup = bs(article_response.text, 'lxml')
-        content_div = article_soup.find_all('div', class_='detail__body-text itp_bodycontent')
-        content_text = ''
-        for div in content_div:
-            paragraphs = div.find_all('p')
-            content_text += ''.join(p.text for p in paragraphs).replace('\n', '')
-        
-        content_text = content_text.replace('ADVERTISEMENT', '').replace('\r\r\rSCROLL TO CONTINUE WITH CONTENT\r', '')
-        return content_text
-    except req.exceptions.HTTPError as e:
+        html = retry.get_policy().call(link, lambda: http_cache.fetch_text(link, headers))
+        return parse_article_content(html)
+    except (req.exceptions.RequestException, retry.CircuitOpenError) as e:
         print(f"Failed to fetch article content: {e}")
         return None
 
-def scrape_detik(keyword, period, num_periods, end_date=None):
+def parse_listing_date(date_str):
+    return parse_date(date_str, 'detik')
+
+@timed('parse', 'detik')
+def parse_listing(html):
+    # [(link, date_str, headline)] in page order; None when the page has no results
+    soup = bs(html, 'lxml')
+    li = soup.find('div', class_='list media_rows list-berita')
+    if not li:
+        return None
+    rows = []
+    for article in li.find_all('article'):
+        a_tag = article.find('a')
+        date_str = a_tag.find('span', class_='date').text.replace('WIB', '').replace('detikNews', '').split(',')[1].strip()
+        rows.append((a_tag['href'], date_str, a_tag.find('h2').text))
+    return rows or None
+
+def scrape_detik(keyword, period, num_periods, end_date=None, seen=None, dedup=None, on_article=None):
     data = []
+    metrics = get_metrics()
     keyword_lower = keyword.lower()
     start_date, end_date = get_date_range(period, num_periods, end_date)
     page = 1
@@ -71,28 +102,41 @@ def scrape_detik(keyword, period, num_periods, end_date=None):
 
     while True:
         headers = get_random_headers()
-        url = f'https://www.detik.com/search/searchnews?query={keyword}&sortby=time&page={page}'
-        response = req.get(url, headers=headers)
+        url = SEARCH_URL.format(keyword, page)
+        response = http_pool.get(url, headers=headers)
         response.raise_for_status()
-        soup = bs(response.text, 'lxml')
-        li = soup.find('div', class_='list media_rows list-berita')
-        if not li:
-            break
-        articles = li.find_all('article')
-        if not articles:
+        rows = parse_listing(response.text)
+        if not rows:
             break
 
-        for article in articles:
-            link = article.find('a')['href']
-            date_str = article.find('a').find('span', class_='date').text.replace('WIB', '').replace('detikNews', '').split(',')[1].strip()
-            date = dateparser.parse(date_str, settings={'DATE_ORDER': 'DMY'})
+        for link, date_str, headline in rows:
+            date = parse_listing_date(date_str)
+            if date is None:
+                print(f'Tanggal tidak dikenali: {date_str}')
+                metrics.drop('detik', 'bad_date', link)
+                continue
             if date < start_date:
+                metrics.drop('detik', 'older_than_window', link)
                 return data
             if date > end_date:
+                metrics.drop('detik', 'newer_than_window', link)
+                continue
+            if seen is not None and link in seen:
+                metrics.drop('detik', 'seen_before', link)
+                if seen.covers(start_date, date):
+                    # Hasil diurutkan berdasarkan waktu; sisa periode sampai
+                    # start_date sudah di-scrape lengkap oleh run sebelumnya
+                    print(f'Artikel sudah pernah di-scrape ({link}), berhenti.')
+                    return data
+                # Bagian periode yang lebih lama belum pernah di-scrape
                 continue
-            headline = article.find('a').find('h2').text
 
             if keyword_lower in headline.lower():
+                if dedup is not None and dedup.seen_title(link, headline):
+                    # Judul hampir sama dengan berita lain, isinya tidak perlu diambil
+                    print(f'Duplikat dilewati: {headline}')
+                    metrics.drop('detik', 'duplicate', link)
+                    continue
                 data.append({
                     'headline': headline,
                     'date': date_str,
@@ -100,22 +144,39 @@ def scrape_detik(keyword, period, num_periods, end_date=None):
                     'content': None  # Placeholder for content to be fetched later
                 })
                 print(f'No. {len(data)} | Date: {date_str} | Title: {headline}')
+                if on_article is not None:
+                    on_article(data[-1])
+            else:
+                metrics.drop('detik', 'keyword_mismatch', link)
         
         page += 1
 
     return data
 
-def fetch_content_for_analysis(data):
+def fetch_content_for_analysis(data, dedup=None, workers=10, failed=None, on_article=None):
+    # Entries whose article could not be fetched are appended to `failed`;
+    # on_article(entry) sees each kept entry as soon as its content is in
     headers = get_random_headers()
     valid_data = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    # Satu koneksi per worker untuk setiap host artikel
+    http_pool.size_pools((entry['link'] for entry in data), workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
         futures = {executor.submit(fetch_article_content, entry['link'], headers): entry for entry in data}
         for future in as_completed(futures):
             entry = futures[future]
             content = future.result()
-            if content:
-                entry['content'] = content
-                valid_data.append(entry)
+            if not content:
+                get_metrics().drop('detik', 'no_content', entry['link'])
+                if failed is not None:
+                    failed.append(entry)
+                continue
+            if dedup is not None and dedup.seen_content(entry['link'], content):
+                get_metrics().drop('detik', 'duplicate', entry['link'])
+                continue
+            entry['content'] = content
+            valid_data.append(entry)
+            if on_article is not None:
+                on_article(entry)
     return valid_data
 
 def save_data(data):
@@ -131,58 +192,82 @@ def save_data(data):
         for entry in data:
             writer.writerow({'headline': entry['headline'], 'date': entry['date'], 'link': entry['link']})
 
+    written = write_parquet('detik', (
+        {'title': entry['headline'], 'link': entry['link'], 'published': parse_listing_date(entry['date']), 'content': entry['content']}
+        for entry in data
+    ))
+    print(f'Saved {written} articles to the Parquet dataset')
+
     return filename_json, filename_csv
 
-def analyze_sentiment(data):
-    analyzer = SentimentIntensityAnalyzer()
+def analyze_sentiment(data, workers=None):
+    # Skor VADER dihitung paralel di beberapa proses, urutan tetap sama
     sentiment_counts = {'positive': 0, 'neutral': 0, 'negative': 0}
     sentiment_articles = {'positive': [], 'neutral': [], 'negative': []}
 
-    for article in data:
-        content = article['content']
-        headline = article['headline']
-        sentiment_score = analyzer.polarity_scores(content)
+    start = time.perf_counter()
+    scores = sentiment_pool.compound_scores((article['content'] for article in data), workers)
+    for article, compound in zip(data, scores):
+        sentiment = sentiment_pool.category(compound, ('positive', 'negative', 'neutral'))
+        sentiment_counts[sentiment] += 1
+        sentiment_articles[sentiment].append(article['headline'])
+
+    elapsed = time.perf_counter() - start
+    get_metrics().observe('stage_seconds', elapsed, stage='enrich', site='detik')
+    if data and elapsed > 0:
+        print(f'Analisis sentimen: {len(data)} berita dalam {elapsed:.2f} detik ({len(data) / elapsed:.1f} berita/detik)')
+    return sentiment_counts, sentiment_articles
+
+def main():
+    # Contoh penggunaan:
+    keyword = input("Masukkan kata kunci pencarian: ")
+    period = input("Masukkan periode waktu (day/week/month/year): ")
+    num_periods = int(input("Masukkan jumlah periode: "))
+    end_date = input("Masukkan tanggal akhir pencarian (format: YYYY-MM-DD, default tanggal hari ini): ") or None
+    incremental = input("Mode inkremental, berhenti di artikel yang sudah pernah di-scrape? (yes/no): ").strip().lower() == 'yes'
 
-        if sentiment_score['compound'] >= 0.05:
-            sentiment = 'positive'
-        elif sentiment_score['compound'] <= -0.05:
-            sentiment = 'negative'
+    seen = SeenStore('detik', keyword.lower()) if incremental else None
+    # Dihitung sebelum scraping, jadi periode yang dicatat tidak melebihi yang di-scrape
+    start_date, last_date = get_date_range(period, num_periods, end_date)
+    dedup = NearDuplicateIndex()
+    data = scrape_detik(keyword, period, num_periods, end_date, seen, dedup)
+    failed = []
+    valid_data = fetch_content_for_analysis(data, dedup, failed=failed)
+    filename_json, filename_csv = save_data(valid_data)
+    if seen is not None:
+        seen.add_many((entry['link'], parse_listing_date(entry['date'])) for entry in valid_data)
+        if failed:
+            # Artikel yang gagal diambil harus dicoba lagi di run berikutnya
+            print(f'{len(failed)} artikel gagal diambil, periode tidak dicatat sebagai lengkap.')
         else:
-            sentiment = 'neutral'
+            seen.add_range(start_date, last_date)
+        seen.close()
+    http_cache.get_cache().report()
+    dedup.report()
 
-        sentiment_counts[sentiment] += 1
-        sentiment_articles[sentiment].append(headline)
+    while True:
+        analyze_sentiment_option = input("Apakah Anda ingin melakukan analisis sentimen? (yes/no): ").strip().lower()
+        if analyze_sentiment_option in ['yes', 'no']:
+            break
 
-    return sentiment_counts, sentiment_articles
+    if analyze_sentiment_option == 'yes':
+        sentiment_counts, sentiment_articles = analyze_sentiment(valid_data)
+
+        print(f'Total berita yang berhasil diproses: {len(valid_data)}')
+        print(f'Saved data to {filename_json}')
+        print(f'Saved data to {filename_csv}')
+
+        print("\nLaporan Sentimen:")
+        for sentiment, count in sentiment_counts.items():
+            print(f"{sentiment.capitalize()}: {count} berita")
+            for headline in sentiment_articles[sentiment]:
+                print(f"- {headline}")
+    else:
+        print(f'Total berita yang berhasil diproses: {len(valid_data)}')
+        print(f'Saved data to {filename_json}')
+        print(f'Saved data to {filename_csv}')
+    get_metrics().report()
+    get_metrics().close()
 
-# Contoh penggunaan:
-keyword = input("Masukkan kata kunci pencarian: ")
-period = input("Masukkan periode waktu (day/week/month/year): ")
-num_periods = int(input("Masukkan jumlah periode: "))
-end_date = input("Masukkan tanggal akhir pencarian (format: YYYY-MM-DD, default tanggal hari ini): ") or None
-
-data = scrape_detik(keyword, period, num_periods, end_date)
-valid_data = fetch_content_for_analysis(data)
-filename_json, filename_csv = save_data(valid_data)
-
-while True:
-    analyze_sentiment_option = input("Apakah Anda ingin melakukan analisis sentimen? (yes/no): ").strip().lower()
-    if analyze_sentiment_option in ['yes', 'no']:
-        break
-
-if analyze_sentiment_option == 'yes':
-    sentiment_counts, sentiment_articles = analyze_sentiment(valid_data)
-
-    print(f'Total berita yang berhasil diproses: {len(valid_data)}')
-    print(f'Saved data to {filename_json}')
-    print(f'Saved data to {filename_csv}')
-
-    print("\nLaporan Sentimen:")
-    for sentiment, count in sentiment_counts.items():
-        print(f"{sentiment.capitalize()}: {count} berita")
-        for headline in sentiment_articles[sentiment]:
-            print(f"- {headline}")
-else:
-    print(f'Total berita yang berhasil diproses: {len(valid_data)}')
-    print(f'Saved data to {filename_json}')
-    print(f'Saved data to {filename_csv}')
+if __name__ == "__main__":
+    main()
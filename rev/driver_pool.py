@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import get_metrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36"
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def _service():
+    # Selenium Manager (selenium >= 4.6) resolves and caches chromedriver
+    # itself; webdriver_manager is only a fallback and runs once per process
+    from selenium.webdriver.chrome.service import Service
+    global _driver_path
+    if _has_selenium_manager():
+        return Service()
+    with _driver_path_lock:
+        if _driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            _driver_path = ChromeDriverManager().install()
+    return Service(_driver_path)
+
+def _has_selenium_manager():
+    try:
+        from selenium.webdriver.common.selenium_manager import SeleniumManager  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def create_headless_driver():
+    options = Options()
+    # options.headless was removed from Selenium 4.13, the flag is what works
+    options.add_argument("--headless=new")
+    options.add_argument("window-size=1200x600")
+    options.add_argument("disable-gpu")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return webdriver.Chrome(service=_service(), options=options)
+
+def open_page(driver, url):
+    # Result pages differ only in the #gsc.page fragment, which would not
+    # reload a reused browser; going through about:blank forces a fresh render
+    # so the wait below cannot match the previous page's results
+    driver.get('about:blank')
+    start = time.perf_counter()
+    driver.get(url)
+    get_metrics().request(url, 'browser', time.perf_counter() - start)
+
+def wait_for_results(driver, result_selector, empty_selectors=(), empty_text=None, timeout=10):
+    # Returns the result elements, or [] once the page says there are none.
+    # Replaces the fixed sleep after driver.get.
+    def ready(d):
+        found = d.find_elements(By.CSS_SELECTOR, result_selector)
+        if found:
+            return found
+        for selector in empty_selectors:
+            if d.find_elements(By.CSS_SELECTOR, selector):
+                return 'empty'
+        if empty_text and empty_text in d.page_source:
+            return 'empty'
+        return False
+
+    try:
+        found = WebDriverWait(driver, timeout, poll_frequency=0.2).until(ready)
+    except TimeoutException:
+        return []
+    return [] if found == 'empty' else found
+
+class DriverPool:
+    # N browsers created once and handed out to one page render at a time
+    def __init__(self, size=3, factory=create_headless_driver):
+        self.size = size
+        self.factory = factory
+        self.idle = queue.Queue()
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.drivers) < self.size:
+                driver = self.factory()
+                self.drivers.append(driver)
+                return driver
+        return self.idle.get()
+
+    def release(self, driver):
+        self.idle.put(driver)
+
+    def run(self, func, *args):
+        driver = self.acquire()
+        try:
+            return func(driver, *args)
+        finally:
+            self.release(driver)
+
+    def close(self):
+        with self.lock:
+            for driver in self.drivers:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    print(f"Error closing a driver: {e}")
+            self.drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def render_pages(pool, render_page, max_pages=None, first_page=1):
+    # Yields (page, result) in page order while up to pool.size pages render
+    # in parallel. render_page(driver, page) returns None past the last page,
+    # which stops the crawl; pages already in flight beyond it are discarded.
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        in_flight = deque()
+        next_page = first_page
+
+        def fill():
+            nonlocal next_page
+            while len(in_flight) < pool.size and not (max_pages and next_page > max_pages):
+                in_flight.append((next_page, executor.submit(pool.run, render_page, next_page)))
+                next_page += 1
+
+        fill()
+        while in_flight:
+            page, future = in_flight.popleft()
+            result = future.result()
+            if result is None:
+                break
+            yield page, result
+            fill()
+
+        for _, future in in_flight:
+            future.cancel()
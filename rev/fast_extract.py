@@ -0,0 +1,110 @@
+import codecs
+import re
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# libxml2 parses the page in C and the selectors below are compiled once, so
+# no Python object is built for the parts of the page we never read.
+# Text is collected the way BeautifulSoup's get_text() does it: comments and
+# script/style/template contents are left out.
+PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+TEXT = etree.XPath(
+    ".//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]",
+    smart_strings=False
+)
+PARAGRAPHS = etree.XPath('.//p')
+
+TEMPO_TITLE = etree.XPath(f"(//h1[{has_class('title')}])[1]")
+TEMPO_DATE = etree.XPath("(//meta[@property='article:published_time'])[1]")
+TEMPO_BODY = etree.XPath("(//div[@itemprop='articleBody'])[1]")
+
+SINDO_ITEMS = etree.XPath(f"//div[{has_class('news-content')}]")
+SINDO_TITLE = etree.XPath(f"(.//div[{has_class('news-title')}]//a)[1]")
+SINDO_DATE = etree.XPath(f"(.//div[{has_class('news-date')}])[1]")
+SINDO_CATEGORY = etree.XPath(f"(.//div[{has_class('newsc')}])[1]")
+SINDO_CONTENT = etree.XPath(f"(//div[{has_class('read__content')}])[1]")
+
+def parse(html, content_type=None):
+    if isinstance(html, bytes):
+        html = decode(html, content_type)
+    try:
+        return lxml_html.document_fromstring(html.encode('utf-8'), parser=PARSER)
+    except etree.ParserError:
+        # Empty body; BeautifulSoup just finds nothing in it
+        return lxml_html.document_fromstring(b'<html></html>', parser=PARSER)
+
+HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+def declared_charset(content, content_type=None):
+    # The Content-Type header wins over a <meta> in the first 2 KB, as in a
+    # browser; unknown names are ignored
+    found = HEADER_CHARSET.search(content_type or '') or META_CHARSET.search(content[:2048])
+    if found is None:
+        return None
+    name = found.group(1)
+    name = name.decode('ascii') if isinstance(name, bytes) else name
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def decode(content, content_type=None):
+    charset = declared_charset(content, content_type)
+    if charset is not None:
+        return content.decode(charset, errors='replace')
+    # Same first guess BeautifulSoup makes for undeclared pages
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('cp1252', errors='replace')
+
+def text(element):
+    return ''.join(TEXT(element))
+
+def stripped_text(element):
+    # get_text(strip=True)
+    return ''.join(s.strip() for s in TEXT(element) if s.strip())
+
+def _first(xpath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+def tempo_fields(html):
+    # (title, published_time, paragraphs); None where the page lacks the node
+    doc = parse(html)
+    title_tag = _first(TEMPO_TITLE, doc)
+    date_tag = _first(TEMPO_DATE, doc)
+    body = _first(TEMPO_BODY, doc)
+    return (
+        stripped_text(title_tag) if title_tag is not None else None,
+        date_tag.get('content') if date_tag is not None else None,
+        [text(p) for p in PARAGRAPHS(body)] if body is not None else None
+    )
+
+def sindo_items(html):
+    return SINDO_ITEMS(parse(html))
+
+def sindo_item(item):
+    # Raises AttributeError on a missing field, like select_one(...).text does
+    return {
+        'title': text(_require(SINDO_TITLE, item)).strip(),
+        'link': _require(SINDO_TITLE, item).get('href'),
+        'category': text(_require(SINDO_CATEGORY, item)).capitalize().strip(),
+        'news_date': text(_require(SINDO_DATE, item)).strip()
+    }
+
+def _require(xpath, node):
+    found = _first(xpath, node)
+    if found is None:
+        raise AttributeError(f"'NoneType' object has no attribute 'text' ({xpath.path})")
+    return found
+
+def sindo_content(html):
+    node = _first(SINDO_CONTENT, parse(html))
+    return text(node).strip() if node is not None else ""
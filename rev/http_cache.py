@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+import time
+
+import http_pool
+import rate_limit
+from metrics import get_metrics, host_of
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'scapper', 'http_cache.sqlite')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Articles are rarely edited after publication; within this window a cached
+# copy is served without touching the network at all
+DEFAULT_FRESH_SECONDS = 24 * 3600
+
+class HttpCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES, fresh_seconds=DEFAULT_FRESH_SECONDS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'url TEXT PRIMARY KEY, body TEXT, etag TEXT, last_modified TEXT,'
+            'size INTEGER, stored_at REAL, last_access REAL)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)')
+        self.total_bytes = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.db.execute(
+                'SELECT body, etag, last_modified, size, stored_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'body': row[0], 'etag': row[1], 'last_modified': row[2], 'size': row[3], 'stored_at': row[4]}
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.fresh_seconds
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def hit(self, url, entry, revalidated=False):
+        with self.lock:
+            if revalidated:
+                self.revalidated += 1
+                self.db.execute('UPDATE responses SET last_access = ?, stored_at = ? WHERE url = ?',
+                                (time.time(), time.time(), url))
+            else:
+                self.hits += 1
+                self.db.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+            self.db.commit()
+            self.bytes_saved += entry['size']
+        get_metrics().count('http_cache_hits_total', host=host_of(url), revalidated=revalidated)
+        return entry['body']
+
+    def store(self, url, body, etag=None, last_modified=None):
+        size = len(body.encode('utf-8'))
+        with self.lock:
+            self.misses += 1
+            old = self.db.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            if size > self.max_bytes:
+                self.db.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self.db.commit()
+                return body
+            now = time.time()
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, body, etag, last_modified, size, now, now)
+            )
+            self.total_bytes += size
+            self._evict()
+            self.db.commit()
+        return body
+
+    def _evict(self):
+        # Drop least recently used entries until back under the size bound
+        while self.total_bytes > self.max_bytes:
+            row = self.db.execute('SELECT url, size FROM responses ORDER BY last_access LIMIT 1').fetchone()
+            if row is None:
+                break
+            self.db.execute('DELETE FROM responses WHERE url = ?', (row[0],))
+            self.total_bytes -= row[1]
+
+    def report(self):
+        print(f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), "
+              f"{self.misses} misses, {self.bytes_saved / 1024:.1f} KB saved")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+def fetch_text(url, headers=None, cache=None):
+    cache = cache or get_cache()
+    entry = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        return cache.hit(url, entry)
+    request_headers = dict(headers or {})
+    request_headers.update(cache.conditional_headers(entry))
+    response = http_pool.get(url, headers=request_headers)
+    if entry and response.status_code == 304:
+        return cache.hit(url, entry, revalidated=True)
+    response.raise_for_status()
+    return cache.store(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+async def fetch_text_async(session, url, headers=None, cache=None, limiter=None, **kwargs):
+    # Only requests that reach the network go through the limiter
+    cache = cache or get_cache()
+    entry = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        return cache.hit(url, entry)
+    request_headers = dict(headers or {})
+    request_headers.update(cache.conditional_headers(entry))
+    if limiter is not None:
+        request = rate_limit.limited_get(session, url, limiter, headers=request_headers, **kwargs)
+    else:
+        request = session.get(url, headers=request_headers, **kwargs)
+    async with request as response:
+        if entry and response.status == 304:
+            return cache.hit(url, entry, revalidated=True)
+        response.raise_for_status()
+        body = await response.text()
+        return cache.store(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
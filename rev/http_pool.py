@@ -0,0 +1,97 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import request_budget
+from metrics import get_metrics
+
+# urllib3 only decodes brotli bodies when one of these is importable, so
+# never advertise 'br' to the server unless we can actually read it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_POOL_SIZE = 10
+
+# Per-host pool sizes, keyed by netloc ('news.detik.com', 'localhost:8080');
+# hosts not listed get DEFAULT_POOL_SIZE
+pool_sizes = {}
+
+_session = None
+_mounted = {}  # netloc -> HTTPAdapter
+_lock = threading.Lock()
+
+def set_pool_size(host, size):
+    # A pool smaller than the number of threads using it makes urllib3 throw
+    # connections away; the host's adapter is rebuilt on its next request
+    with _lock:
+        if pool_sizes.get(host, DEFAULT_POOL_SIZE) == size:
+            return
+        pool_sizes[host] = size
+        adapter = _mounted.pop(host, None)
+    if adapter is not None:
+        adapter.close()
+
+def size_pools(urls, size):
+    # Sizes the pool of every host in urls for `size` concurrent requests
+    for host in {urlsplit(url).netloc for url in urls}:
+        if size > pool_sizes.get(host, DEFAULT_POOL_SIZE):
+            set_pool_size(host, size)
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            _session.headers['Connection'] = 'keep-alive'
+        return _session
+
+def _mount_host(session, url):
+    parts = urlsplit(url)
+    host = parts.netloc
+    if host in _mounted:
+        return
+    with _lock:
+        if host in _mounted:
+            return
+        size = pool_sizes.get(host, DEFAULT_POOL_SIZE)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=False)
+        # Mounted for both schemes, so http:// and https:// on one host
+        # share the sizing
+        for scheme in ('http', 'https'):
+            session.mount(f'{scheme}://{host}/', adapter)
+        _mounted[host] = adapter
+
+def get(url, headers=None, **kwargs):
+    session = get_session()
+    _mount_host(session, url)
+    if headers:
+        headers = dict(headers)
+        headers['Accept-Encoding'] = ACCEPT_ENCODING
+    with request_budget.slot():
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=headers, **kwargs)
+        except requests.RequestException:
+            get_metrics().request(url, None, time.perf_counter() - start)
+            raise
+    get_metrics().request(url, response.status_code, time.perf_counter() - start, len(response.content))
+    return response
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _mounted.clear()
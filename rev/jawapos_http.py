@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from lxml import etree
+
+import fast_extract
+import http_pool
+from metrics import get_metrics, timed
+
+# The search page is server-rendered, so titles, links and dates can be read
+# from plain HTML. Chrome is only needed when that markup is missing.
+SEARCH_URL = 'https://www.jawapos.com/search?q={}&sort=latest&page={}'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7'
+}
+
+ITEMS = etree.XPath(f"//*[{fast_extract.has_class('latest__item')}]")
+TITLE_LINK = etree.XPath(f"(.//h2[{fast_extract.has_class('latest__title')}]/a)[1]")
+DATE = etree.XPath(f"(.//*[{fast_extract.has_class('latest__date')}])[1]")
+
+def search_url(keyword, page):
+    return SEARCH_URL.format(keyword, page)
+
+def _visible_text(element):
+    # Selenium's .text collapses whitespace the way the browser renders it
+    return ' '.join(fast_extract.text(element).split())
+
+@timed('parse', 'jawapos')
+def parse_items(html, base_url, content_type=None):
+    items = []
+    for item in ITEMS(fast_extract.parse(html, content_type)):
+        try:
+            title_element = TITLE_LINK(item)[0]
+        except IndexError:
+            print("Error processing an item: no h2.latest__title > a")
+            get_metrics().drop('jawapos', 'no_title_link')
+            continue
+        date = DATE(item)
+        items.append({
+            'title': _visible_text(title_element),
+            'link': urljoin(base_url, title_element.get('href', '')),
+            'date': _visible_text(date[0]) if date else None,
+            'text_content': ''.join(item.itertext())
+        })
+    return items
+
+def fetch_items(keyword, page):
+    url = search_url(keyword, page)
+    response = http_pool.get(url, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    return parse_items(response.content, url, response.headers.get('Content-Type'))
+
+def render_page(driver, keyword, page):
+    # fetch_items in the browser, for when the static markup is missing;
+    # same fields, read from the rendered page
+    import driver_pool
+    from selenium.webdriver.common.by import By
+    driver_pool.open_page(driver, search_url(keyword, page))
+    items = []
+    for item in driver_pool.wait_for_results(driver, '.latest__item'):
+        try:
+            title_element = item.find_element(By.CSS_SELECTOR, 'h2.latest__title > a')
+            date_elements = item.find_elements(By.CSS_SELECTOR, '.latest__date')
+            items.append({
+                'title': title_element.text,
+                'link': title_element.get_attribute('href'),
+                'date': date_elements[0].text if date_elements else None,
+                'text_content': item.get_attribute('textContent')
+            })
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+            get_metrics().drop('jawapos', 'no_title_link')
+    return items
+
+def iter_pages(keyword, max_pages=None, fallback=None, workers=1):
+    # Yields (page, items) until an empty page or max_pages. fallback(page)
+    # renders a page in the browser; it takes over for the rest of the run
+    # when page 1 has no static items or a request fails. Up to `workers`
+    # static pages are fetched ahead; the ones past the last page are dropped.
+    use_fallback = False
+    page = 1
+    http_pool.size_pools([search_url(keyword, page)], workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        ahead = {}
+        while not (max_pages and page > max_pages):
+            items = None
+            if not use_fallback:
+                for next_page in range(page, page + workers):
+                    if next_page not in ahead and not (max_pages and next_page > max_pages):
+                        ahead[next_page] = executor.submit(fetch_items, keyword, next_page)
+                try:
+                    items = ahead.pop(page).result()
+                except Exception as e:
+                    print(f"HTTP fetch failed for page {page}: {e}")
+                if fallback is not None and (items is None or (page == 1 and not items)):
+                    print("Static markup not available, falling back to Selenium.")
+                    use_fallback = True
+            if use_fallback:
+                items = fallback(page)
+            if not items:
+                print("No more news items found or end of pages.")
+                break
+            yield page, items
+            page += 1
+        for future in ahead.values():
+            future.cancel()
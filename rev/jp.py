@@ -1,19 +1,21 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
-import pandas as pd
 import time
 import re
+import queue
+import threading
+import os
+import json
+import hashlib
+from collections import OrderedDict
 from tqdm import tqdm
-import torch
-from transformers import BertTokenizer, BertForSequenceClassification
+import jawapos_http
+from sinks import write_parquet
+from dates import parse_date as parse_site_date
+from metrics import get_metrics
 import string
-import nltk
-from nltk.corpus import stopwords
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+# torch, transformers, nltk and Sastrawi are imported on first use, see the
+# lazy loaders below; selenium only when the browser fallback starts and
+# pandas in main()
 
 # -katanya ga bakal random ketika skrip dijalankan kembali
 #import random
@@ -27,170 +29,316 @@ from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 #    torch.cuda.manual_seed_all(42)  
 # ---
 
-# Download stopwords
-nltk.download('stopwords')
-
-# Create stemmer
-factory = StemmerFactory()
-stemmer = factory.create_stemmer()
-
-# Get Indonesian stopwords
-stop_words = set(stopwords.words('indonesian'))
-
-def setup_driver():
-    options = Options()
-    options.headless = True
-    options.add_argument("window-size=1200x600")
-    options.add_argument("disable-gpu")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
-
-def translate_date_to_english(date_str):
-    days = {
-        'Senin': 'Monday',
-        'Selasa': 'Tuesday',
-        'Rabu': 'Wednesday',
-        'Kamis': 'Thursday',
-        'Jumat': 'Friday',
-        'Sabtu': 'Saturday',
-        'Minggu': 'Sunday'
-    }
-    
-    months = {
-        'Januari': 'January',
-        'Februari': 'February',
-        'Maret': 'March',
-        'April': 'April',
-        'Mei': 'May',
-        'Juni': 'June',
-        'Juli': 'July',
-        'Agustus': 'August',
-        'September': 'September',
-        'Oktober': 'October',
-        'November': 'November',
-        'Desember': 'December'
-    }
-    
-    for indo, eng in days.items():
-        date_str = date_str.replace(indo, eng)
-    
-    for indo, eng in months.items():
-        date_str = date_str.replace(indo, eng)
-    
-    return date_str
+# Mini-batch size and token limit for title classification
+BATCH_SIZE = 32
+MAX_LENGTH = 128
+
+MODEL_NAME = "indobenchmark/indobert-base-p2"
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'scapper')
+STOPWORDS_PATH = os.path.join(CACHE_DIR, 'stopwords_indonesian.txt')
+HEADS_PATH = os.path.join(CACHE_DIR, 'jp_heads.pt')
+
+# Sastrawi is slow per call and headline vocabulary repeats a lot, so stems
+# and whole preprocessed titles are memoised and kept on disk between runs
+PREPROCESS_CACHE_PATH = os.path.join(CACHE_DIR, 'jp_preprocess.json')
+STEM_CACHE_SIZE = 50000
+TITLE_CACHE_SIZE = 20000
+STRIP_PATTERN = re.compile(f'[{re.escape(string.punctuation)}\\d]+')
+stem_cache = OrderedDict()
+title_cache = OrderedDict()
+
+_resources = {}
+_resources_lock = threading.Lock()
+
+def _resource(name, load):
+    with _resources_lock:
+        if name not in _resources:
+            _resources[name] = load()
+        return _resources[name]
+
+def _load_stop_words():
+    # Local copy first; nltk (and the network) only on the very first run
+    try:
+        with open(STOPWORDS_PATH, encoding='utf-8') as f:
+            return set(f.read().split())
+    except OSError:
+        pass
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        words = stopwords.words('indonesian')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+        words = stopwords.words('indonesian')
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STOPWORDS_PATH, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(sorted(words)))
+    return set(words)
+
+def get_stop_words():
+    return _resource('stop_words', _load_stop_words)
+
+def get_stemmer():
+    # Sastrawi reads its bundled dictionary here; with a warm stem cache this
+    # is never reached at all
+    def load():
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        return StemmerFactory().create_stemmer()
+    return _resource('stemmer', load)
+
+def _from_pretrained(cls, name, **kwargs):
+    # Use the local Hugging Face cache without touching the hub; download only
+    # when the checkpoint has never been fetched on this machine
+    try:
+        return cls.from_pretrained(name, local_files_only=True, **kwargs)
+    except OSError:
+        return cls.from_pretrained(name, **kwargs)
+
+def get_classifier():
+    # Shared encoder with both heads: 3 labels (positif, negatif, netral) and
+    # 6 labels (Provokatif, Hiperbola, Sensasional, Glorifikasi, Emosional, Informatif)
+    def load():
+        import torch
+        from transformers import BertTokenizer
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        tokenizer = _from_pretrained(BertTokenizer, MODEL_NAME)
+        model = shared_title_classifier(MODEL_NAME, num_sentiment_labels=3, num_labels=6)
+        if os.path.exists(HEADS_PATH):
+            # Trained heads saved with save_heads(); untrained ones otherwise
+            model.heads.load_state_dict(torch.load(HEADS_PATH, map_location='cpu'))
+        model.to(device)
+        model.eval()
+        return model, tokenizer, device
+    return _resource('classifier', load)
 
 def parse_date(date_text):
-    try:
-        match = re.search(r'(\w+, \d+ \w+ \d+ \| \d+:\d+ WIB)', date_text)
-        if match:
-            date_str = match.group(1)
-            date_str = translate_date_to_english(date_str)
-            date_obj = datetime.strptime(date_str, '%A, %d %B %Y | %H:%M WIB')
-            return date_obj
-    except Exception as e:
-        print(f"Error parsing date: {e}")
-    return None
+    # "Senin, 10 Juni 2024 | 14:30 WIB" somewhere in the card text
+    return parse_site_date(date_text, 'jawapos')
+
+def _cached(cache, key, compute, max_size):
+    # Small LRU on an OrderedDict so the contents can be written to disk
+    value = cache.get(key)
+    if value is None:
+        value = compute(key)
+        cache[key] = value
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+def stem_word(word):
+    return _cached(stem_cache, word, lambda w: get_stemmer().stem(w), STEM_CACHE_SIZE)
+
+def _preprocess_title(title):
+    # Punctuation and numbers go in one regex pass, stopword filtering and
+    # stemming in one pass over the words
+    stop_words = get_stop_words()
+    words = STRIP_PATTERN.sub('', title.lower()).split()
+    return ' '.join(stem_word(word) for word in words if word not in stop_words)
 
 def preprocess_title(title):
-    # Remove punctuation
-    title = title.translate(str.maketrans('', '', string.punctuation))
-    # Convert to lowercase
-    title = title.lower()
-    # Remove numbers
-    title = re.sub(r'\d+', '', title)
-    # Remove extra spaces
-    title = ' '.join(title.split())
-    # Remove stopwords
-    title = ' '.join(word for word in title.split() if word not in stop_words)
-    # Stemming
-    title = ' '.join(stemmer.stem(word) for word in title.split())
-    return title
-
-def classify_title_bert(title, model, tokenizer, device):
-    inputs = tokenizer(title, return_tensors="pt", max_length=512, truncation=True, padding=True)
+    return _cached(title_cache, title, _preprocess_title, TITLE_CACHE_SIZE)
+
+def _cache_key():
+    # Cached results are only valid for the same stopword list
+    return hashlib.sha1('\n'.join(sorted(get_stop_words())).encode('utf-8')).hexdigest()
+
+def load_preprocess_cache(path=PREPROCESS_CACHE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    stem_cache.update(saved.get('stems', {}))
+    if saved.get('key') == _cache_key():
+        title_cache.update(saved.get('titles', {}))
+
+def save_preprocess_cache(path=PREPROCESS_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'key': _cache_key(), 'stems': stem_cache, 'titles': title_cache}, f, ensure_ascii=False)
+
+def _classifier_class():
+    # Defined on first use so importing jp does not import torch
+    def load():
+        import torch
+        from transformers import BertModel
+
+        class SharedTitleClassifier(torch.nn.Module):
+            # One IndoBERT encoder shared by the sentiment head (3 labels) and
+            # the specific label head (6 labels), both reading the pooled output.
+            # A regular module, so .to(), .eval(), parameters() and
+            # state_dict() cover the encoder and both heads.
+            def __init__(self, model_name, num_sentiment_labels=3, num_labels=6):
+                super().__init__()
+                self.encoder = _from_pretrained(BertModel, model_name)
+                config = self.encoder.config
+                self.dropout = torch.nn.Dropout(config.hidden_dropout_prob)
+                self.heads = torch.nn.ModuleDict({
+                    'sentiment': torch.nn.Linear(config.hidden_size, num_sentiment_labels),
+                    'label': torch.nn.Linear(config.hidden_size, num_labels),
+                })
+                for head in self.heads.values():
+                    # Same initialisation BertForSequenceClassification gives its classifier
+                    head.weight.data.normal_(mean=0.0, std=config.initializer_range)
+                    head.bias.data.zero_()
+
+            def forward(self, **inputs):
+                pooled = self.dropout(self.encoder(**inputs).pooler_output)
+                return self.heads['sentiment'](pooled), self.heads['label'](pooled)
+
+        return SharedTitleClassifier
+    return _resource('classifier_class', load)
+
+def shared_title_classifier(model_name, num_sentiment_labels=3, num_labels=6):
+    return _classifier_class()(model_name, num_sentiment_labels, num_labels)
+
+def save_heads(model, path=HEADS_PATH):
+    # Only the heads: the encoder is the published checkpoint
+    import torch
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(model.heads.state_dict(), path)
+
+def classify_titles_bert(titles, model, tokenizer, device, max_length=MAX_LENGTH):
+    # One tokenization and one padded forward pass for the whole mini-batch
+    import torch
+    inputs = tokenizer(titles, return_tensors="pt", max_length=max_length, truncation=True, padding=True)
     inputs = {key: value.to(device) for key, value in inputs.items()}
     with torch.no_grad():
-        outputs = model(**inputs)
-    logits = outputs.logits
-    probabilities = torch.softmax(logits, dim=-1)
-    return probabilities.argmax().item(), probabilities.max().item()
-
-def fetch_news(keyword, num_pages, sentiment_model, sentiment_tokenizer, label_model, label_tokenizer, device):
-    driver = setup_driver()
+        sentiment_logits, label_logits = model(**inputs)
+    sentiment_confidences, sentiment_labels = torch.softmax(sentiment_logits, dim=-1).max(dim=-1)
+    label_confidences, labels = torch.softmax(label_logits, dim=-1).max(dim=-1)
+    return sentiment_labels.tolist(), sentiment_confidences.tolist(), labels.tolist(), label_confidences.tolist()
+
+def classification_worker(title_queue, classified_titles, stats, batch_size, max_length):
+    # Runs beside the Selenium loop: models load while the browser starts, then
+    # titles are preprocessed and classified in mini-batches while the next
+    # result page is loading
+    start = time.perf_counter()
+    try:
+        load_preprocess_cache()
+        model, tokenizer, device = get_classifier()
+        print(f"Models ready after {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"Failed to load the classification models, titles will not be classified: {e}")
+        model = None
+
+    done = False
+    while not done:
+        batch = [title_queue.get()]
+        # Take whatever else is already waiting, up to batch_size
+        while len(batch) < batch_size:
+            try:
+                batch.append(title_queue.get(timeout=0.05))
+            except queue.Empty:
+                break
+        if batch[-1] is None:
+            batch.pop()
+            done = True
+        if not batch:
+            continue
+        if model is None:
+            for item in batch:
+                get_metrics().drop('jawapos', 'no_classifier', item['link'])
+            continue
+
+        start = time.perf_counter()
+        try:
+            results = classify_batch(batch, model, tokenizer, device, max_length)
+        except Exception as e:
+            # One bad title must not cost the whole batch
+            print(f"Error classifying a batch, retrying its titles one by one: {e}")
+            results = []
+            for item in batch:
+                try:
+                    results.extend(classify_batch([item], model, tokenizer, device, max_length))
+                except Exception as e:
+                    print(f"Error classifying title {item['title']!r}: {e}")
+                    get_metrics().drop('jawapos', 'classification_failed', item['link'])
+        elapsed = time.perf_counter() - start
+        get_metrics().observe('stage_seconds', elapsed, stage='enrich', site='jawapos')
+        stats['seconds'] += elapsed
+        stats['titles'] += len(results)
+        classified_titles.extend(results)
+
+def classify_batch(batch, model, tokenizer, device, max_length):
+    processed = [preprocess_title(item['title']) for item in batch]
+    sentiment_labels, sentiment_confidences, labels, label_confidences = classify_titles_bert(processed, model, tokenizer, device, max_length)
+    return [{
+        'original_title': item['title'],
+        'processed_title': processed[i],
+        'sentiment_label': sentiment_labels[i],
+        'sentiment_confidence': sentiment_confidences[i],
+        'label': labels[i],
+        'label_confidence': label_confidences[i],
+        'date': item['date'],
+        'link': item['link']
+    } for i, item in enumerate(batch)]
+
+def fetch_news(keyword, num_pages, batch_size=BATCH_SIZE, max_length=MAX_LENGTH):
     news_data = []
     classified_titles = []
+    stats = {'titles': 0, 'seconds': 0.0}
+
+    title_queue = queue.Queue()
+    worker = threading.Thread(
+        target=classification_worker,
+        args=(title_queue, classified_titles, stats, batch_size, max_length),
+        daemon=True
+    )
+    worker.start()
+
+    driver = None
+
+    def browser_items(page):
+        # Selenium fallback, only started when the static markup is missing
+        nonlocal driver
+        if driver is None:
+            import driver_pool
+            driver = driver_pool.create_headless_driver()
+        return jawapos_http.render_page(driver, keyword, page)
 
-    for page in tqdm(range(1, num_pages + 1), desc="Scraping pages"):
-        url = f'https://www.jawapos.com/search?q={keyword}&sort=latest&page={page}'
-        driver.get(url)
-        driver.implicitly_wait(10)
-        time.sleep(3)  # Allow some time for the page to fully load
-
-        # Collect news items on the current page
-        news_items = driver.find_elements(By.CSS_SELECTOR, '.latest__item')
-        if not news_items:
-            print("No more news items found or end of pages.")
-            break
-        
-        for item in news_items:
-            try:
-                title_element = item.find_element(By.CSS_SELECTOR, 'h2.latest__title > a')
-                text_content = item.get_attribute('textContent')
-                title = title_element.text
-                link = title_element.get_attribute('href')
-                
-                # Extract and parse date from text_content
-                date_obj = parse_date(text_content)
-                if not date_obj:
-                    continue
-
-                # Preprocess title
-                processed_title = preprocess_title(title)
-
-                # Analyze sentiment
-                sentiment_label, sentiment_confidence = classify_title_bert(processed_title, sentiment_model, sentiment_tokenizer, device)
-
-                # Classify title for specific label
-                label, label_confidence = classify_title_bert(processed_title, label_model, label_tokenizer, device)
-                
-                classified_titles.append({
-                    'original_title': title,
-                    'processed_title': processed_title,
-                    'sentiment_label': sentiment_label,
-                    'sentiment_confidence': sentiment_confidence,
-                    'label': label,
-                    'label_confidence': label_confidence,
-                    'date': date_obj.strftime('%A, %d %B %Y | %H:%M WIB'),
-                    'link': link
-                })
-
-                news_data.append({
-                    'title': title,
-                    'link': link,
-                    'date': date_obj.strftime('%A, %d %B %Y | %H:%M WIB')
-                })
-                
-            except Exception as e:
-                print(f"Error processing an item: {e}")
-        
-    driver.quit()
+    try:
+        pages = jawapos_http.iter_pages(keyword, num_pages, browser_items)
+        for page, items in tqdm(pages, total=num_pages, desc="Scraping pages"):
+            for item in items:
+                try:
+                    title = item['title']
+                    link = item['link']
+                    
+                    # Extract and parse date from text_content
+                    date_obj = parse_date(item['text_content'])
+                    if not date_obj:
+                        get_metrics().drop('jawapos', 'no_date', link)
+                        continue
+                    date = date_obj.strftime('%A, %d %B %Y | %H:%M WIB')
+
+                    # Preprocessing and classification happen on the worker thread
+                    title_queue.put({'title': title, 'link': link, 'date': date})
+                    get_metrics().gauge('queue_depth', title_queue.qsize(), queue='jawapos_titles')
+
+                    news_data.append({
+                        'title': title,
+                        'link': link,
+                        'date': date
+                    })
+                    
+                except Exception as e:
+                    print(f"Error processing an item: {e}")
+    finally:
+        if driver is not None:
+            driver.quit()
+        title_queue.put(None)
+        worker.join()
+
+    if stats['titles']:
+        save_preprocess_cache()
+    if stats['seconds'] > 0:
+        print(f"Classified {stats['titles']} titles in {stats['seconds']:.2f}s "
+              f"({stats['titles'] / stats['seconds']:.1f} titles/sec, batch size {batch_size})")
     return news_data, classified_titles
 
-# Load models and tokenizers
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-# Sentiment model and tokenizer
-sentiment_tokenizer = BertTokenizer.from_pretrained("indobenchmark/indobert-base-p2")
-sentiment_model = BertForSequenceClassification.from_pretrained("indobenchmark/indobert-base-p2", num_labels=3)  # 3 labels: positif, negatif, netral
-sentiment_model.to(device)
-
-# Label model and tokenizer
-label_tokenizer = BertTokenizer.from_pretrained("indobenchmark/indobert-base-p2")
-label_model = BertForSequenceClassification.from_pretrained("indobenchmark/indobert-base-p2", num_labels=6)  # 6 labels: Provokatif, Hiperbola, Sensasional, Glorifikasi, Emosional, Informatif
-label_model.to(device)
-
 sentiment_label_mapping = {
     0: 'Negatif',
     1: 'Netral',
@@ -206,73 +354,95 @@ label_mapping = {
     5: 'Informatif'
 }
 
-keyword = input("Masukkan kata kunci berita: ")
-num_pages = int(input("Masukkan jumlah halaman untuk diambil: "))
-
-news_data, classified_titles = fetch_news(keyword, num_pages, sentiment_model, sentiment_tokenizer, label_model, label_tokenizer, device)
-df_news = pd.DataFrame(news_data)
-now = datetime.now().strftime("%Y%m%d%H%M%S")
-output_path_csv = f'./jawapos_{now}.csv'
-df_news.to_csv(output_path_csv, index=False)
-
-# Ensure 'date' column exists before parsing
-if 'date' in df_news.columns:
-    # Parse 'date' column to datetime
-    df_news['date'] = pd.to_datetime(df_news['date'], format='%A, %d %B %Y | %H:%M WIB')
-
-    # Calculate number of articles per year and per month
-    yearly_count = df_news['date'].dt.year.value_counts().sort_index(ascending=False)
-    monthly_count = df_news.groupby([df_news['date'].dt.year.rename('year'), df_news['date'].dt.strftime('%B').rename('month')]).size().reset_index(name='count')
-    monthly_count = monthly_count[monthly_count['count'] > 0].sort_values(by=['year', 'month'], ascending=[False, False])
-
-    print(f'Scraping is finished. Total news processed: {len(news_data)}')
-    print(f'Data saved to {output_path_csv}')
-    print("\nJumlah berita per tahun:")
-    for year, count in yearly_count.items():
-        print(f"{year}: {count}")
-
-    print("\nJumlah berita per bulan:")
-    for index, row in monthly_count.iterrows():
-        print(f"{row['month']} {row['year']}: {row['count']}")
-else:
-    print("No date column found in the DataFrame.")
-
-# Display classified titles and their percentages
-if classified_titles:
-    sentiment_label_counts = {}
-    specific_label_counts = {}
-    
-    for entry in classified_titles:
-        sentiment_label = entry['sentiment_label']
-        if sentiment_label not in sentiment_label_counts:
-            sentiment_label_counts[sentiment_label] = 0
-        sentiment_label_counts[sentiment_label] += 1
-
-        specific_label = entry['label']
-        if specific_label not in specific_label_counts:
-            specific_label_counts[specific_label] = 0
-        specific_label_counts[specific_label] += 1
-
-    total_titles = len(classified_titles)
-    
-    print("\nSentiment classified titles and percentages:")
-    for label, count in sentiment_label_counts.items():
-        percentage = (count / total_titles) * 100
-        print(f"Label {sentiment_label_mapping[label]}: {count} titles ({percentage:.2f}%)")
-    
-    print("\nSpecific classified titles and percentages:")
-    for label, count in specific_label_counts.items():
-        percentage = (count / total_titles) * 100
-        print(f"Label {label_mapping[label]}: {count} titles ({percentage:.2f}%)")
-        
-    print("\nDetailed classified titles:")
-    for entry in classified_titles:
-        print(f"- {entry['original_title']} (Processed: {entry['processed_title']}, Sentiment: {sentiment_label_mapping[entry['sentiment_label']]}, Sentiment Confidence: {entry['sentiment_confidence']:.2f}, Label: {label_mapping[entry['label']]}, Label Confidence: {entry['label_confidence']:.2f})")
-
-    # Save classified titles to Excel
-    df_classified_titles = pd.DataFrame(classified_titles)
-    df_classified_titles['sentiment_label'] = df_classified_titles['sentiment_label'].map(sentiment_label_mapping)
-    df_classified_titles['label'] = df_classified_titles['label'].map(label_mapping)
-    output_path_excel = f'./jawapos_labeling_{now}.xlsx'
-    df_classified_titles.to_excel(output_path_excel, index=False)
-    print(f"Classified titles saved to {output_path_excel}")
+def main():
+    import pandas as pd
+    keyword = input("Masukkan kata kunci berita: ")
+    num_pages = int(input("Masukkan jumlah halaman untuk diambil: "))
+
+    news_data, classified_titles = fetch_news(keyword, num_pages)
+    df_news = pd.DataFrame(news_data)
+    now = datetime.now().strftime("%Y%m%d%H%M%S")
+    output_path_csv = f'./jawapos_{now}.csv'
+    df_news.to_csv(output_path_csv, index=False)
+
+    # Ensure 'date' column exists before parsing
+    if 'date' in df_news.columns:
+        # Parse 'date' column to datetime
+        df_news['date'] = pd.to_datetime(df_news['date'], format='%A, %d %B %Y | %H:%M WIB')
+
+        # Calculate number of articles per year and per month
+        yearly_count = df_news['date'].dt.year.value_counts().sort_index(ascending=False)
+        monthly_count = df_news.groupby([df_news['date'].dt.year.rename('year'), df_news['date'].dt.strftime('%B').rename('month')]).size().reset_index(name='count')
+        monthly_count = monthly_count[monthly_count['count'] > 0].sort_values(by=['year', 'month'], ascending=[False, False])
+
+        print(f'Scraping is finished. Total news processed: {len(news_data)}')
+        print(f'Data saved to {output_path_csv}')
+        print("\nJumlah berita per tahun:")
+        for year, count in yearly_count.items():
+            print(f"{year}: {count}")
+
+        print("\nJumlah berita per bulan:")
+        for index, row in monthly_count.iterrows():
+            print(f"{row['month']} {row['year']}: {row['count']}")
+    else:
+        print("No date column found in the DataFrame.")
+
+    # Display classified titles and their percentages
+    if classified_titles:
+        sentiment_label_counts = {}
+        specific_label_counts = {}
+
+        for entry in classified_titles:
+            sentiment_label = entry['sentiment_label']
+            if sentiment_label not in sentiment_label_counts:
+                sentiment_label_counts[sentiment_label] = 0
+            sentiment_label_counts[sentiment_label] += 1
+
+            specific_label = entry['label']
+            if specific_label not in specific_label_counts:
+                specific_label_counts[specific_label] = 0
+            specific_label_counts[specific_label] += 1
+
+        total_titles = len(classified_titles)
+
+        print("\nSentiment classified titles and percentages:")
+        for label, count in sentiment_label_counts.items():
+            percentage = (count / total_titles) * 100
+            print(f"Label {sentiment_label_mapping[label]}: {count} titles ({percentage:.2f}%)")
+
+        print("\nSpecific classified titles and percentages:")
+        for label, count in specific_label_counts.items():
+            percentage = (count / total_titles) * 100
+            print(f"Label {label_mapping[label]}: {count} titles ({percentage:.2f}%)")
+
+        print("\nDetailed classified titles:")
+        for entry in classified_titles:
+            print(f"- {entry['original_title']} (Processed: {entry['processed_title']}, Sentiment: {sentiment_label_mapping[entry['sentiment_label']]}, Sentiment Confidence: {entry['sentiment_confidence']:.2f}, Label: {label_mapping[entry['label']]}, Label Confidence: {entry['label_confidence']:.2f})")
+
+        # Save classified titles to Excel
+        df_classified_titles = pd.DataFrame(classified_titles)
+        df_classified_titles['sentiment_label'] = df_classified_titles['sentiment_label'].map(sentiment_label_mapping)
+        df_classified_titles['label'] = df_classified_titles['label'].map(label_mapping)
+        output_path_excel = f'./jawapos_labeling_{now}.xlsx'
+        df_classified_titles.to_excel(output_path_excel, index=False)
+        print(f"Classified titles saved to {output_path_excel}")
+
+        written = write_parquet('jawapos', (
+            {
+                'title': entry['original_title'],
+                'processed_title': entry['processed_title'],
+                'link': entry['link'],
+                'published': parse_date(entry['date']),
+                'sentiment_label': sentiment_label_mapping[entry['sentiment_label']],
+                'sentiment_confidence': float(entry['sentiment_confidence']),
+                'label': label_mapping[entry['label']],
+                'label_confidence': float(entry['label_confidence'])
+            }
+            for entry in classified_titles
+        ))
+        print(f"Saved {written} classified titles to the Parquet dataset")
+    get_metrics().report()
+    get_metrics().close()
+
+if __name__ == "__main__":
+    main()
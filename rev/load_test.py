@@ -0,0 +1,159 @@
+import asyncio
+import contextlib
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+import http_cache
+import http_pool
+import rate_limit
+import retry
+from mock_sites import MockSite, rebase
+
+# Drives the scrapers end to end against mock_sites stand-ins:
+#   python load_test.py [profile] [results] [scenario,...]
+# and reports articles/sec plus the tail of the request latencies the
+# stand-in measured (time from request to last body byte, so injected
+# latency and slow bodies are included; client-side queueing is not).
+PROFILES = {
+    'clean': {'latency': 0.02},
+    'faulty': {'latency': 0.02, 'error_rate': 0.05},
+    'slow': {'latency': 0.05, 'slow_body': 0.2},
+    'empty': {'latency': 0.02, 'results': 0},
+}
+DEFAULT_RESULTS = 100
+KEYWORD = 'banjir'
+
+@contextlib.contextmanager
+def pointed_at(module, name, base):
+    # Temporarily sends one of the module's URL templates to the stand-in
+    original = getattr(module, name)
+    setattr(module, name, rebase(original, base))
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+def window_days(mock):
+    # Days back from the anchor that hold every result
+    return mock.handler.spacing * mock.handler.results // (24 * 60) + 2
+
+def run_cnbc(mock):
+    import cnbc
+    with pointed_at(cnbc, 'SEARCH_URL', mock.base):
+        cnbc.scrape_cnbc(cnbc.HEADERS_LIST, KEYWORD, mock.anchor + timedelta(minutes=1), window_days(mock),
+                         False, locate=False, pretty_json=False)
+    # The CSV has a header row
+    filename = max(glob.glob('cnbcindonesia_*.csv'), key=os.path.getmtime)
+    with open(filename, encoding='utf-8') as f:
+        return sum(1 for _ in f) - 1
+
+def run_detik(mock):
+    import detik
+    with pointed_at(detik, 'SEARCH_URL', mock.base):
+        end_date = (mock.anchor + timedelta(days=1)).strftime('%Y-%m-%d')
+        data = detik.scrape_detik(KEYWORD, 'day', window_days(mock), end_date)
+        return len(detik.fetch_content_for_analysis(data))
+
+def run_sindo(mock):
+    import sindo
+    with pointed_at(sindo, 'BASE_URL', mock.base):
+        return len(sindo.scrape_sindonews(KEYWORD))
+
+def run_sindo_parallel(mock):
+    import sindo
+    with pointed_at(sindo, 'BASE_URL', mock.base):
+        return len(sindo.scrape_sindonews_parallel(KEYWORD))
+
+def run_tempo(mock):
+    import tempo
+    with pointed_at(tempo, 'SEARCH_URL', mock.base):
+        news_data = asyncio.run(tempo.get_news_data(KEYWORD, max(mock.handler.results, 1)))
+    return sum(item['Title'] != "Failed to retrieve" for item in news_data)
+
+# (site served, scrape function)
+SCENARIOS = {
+    'cnbc': ('cnbc', run_cnbc),
+    'detik': ('detik', run_detik),
+    'sindo': ('sindo', run_sindo),
+    'sindo-parallel': ('sindo', run_sindo_parallel),
+    'tempo': ('tempo', run_tempo),
+}
+
+def fresh_state(directory):
+    # Each run starts cold: its own response cache, rate limits, breakers
+    # and connection pool
+    http_cache._cache = http_cache.HttpCache(os.path.join(directory, 'http_cache.sqlite'))
+    rate_limit._limiter = None
+    retry._policy = None
+    http_pool.close()
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_scenario(name, options):
+    site, scrape = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as directory, MockSite(site, **options) as mock:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        fresh_state(directory)
+        error = None
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                articles = scrape(mock)
+        except Exception as e:
+            articles, error = 0, f'{type(e).__name__}: {e}'
+        finally:
+            elapsed = time.perf_counter() - start
+            http_cache.get_cache().close()
+            os.chdir(cwd)
+        mock.wait_idle()
+        latencies = [seconds for _, _, seconds in mock.log]
+        return {
+            'articles': articles,
+            'expected': mock.handler.results,
+            'seconds': elapsed,
+            'requests': Counter(kind for kind, _, _ in mock.log),
+            'statuses': Counter(status for _, status, _ in mock.log),
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies, default=0.0),
+            'error': error,
+        }
+
+def report(name, r):
+    rate = r['articles'] / r['seconds'] if r['seconds'] else 0.0
+    failures = sum(count for status, count in r['statuses'].items() if status != 200)
+    print(f"{name:15} {r['articles']:4d}/{r['expected']:<4d} {r['seconds']:6.2f}s {rate:7.1f}/s "
+          f"{r['requests']['search']:4d} {r['requests']['article']:5d} {failures:4d} "
+          f"{r['p50'] * 1000:6.1f} {r['p95'] * 1000:6.1f} {r['p99'] * 1000:6.1f} {r['max'] * 1000:7.1f}")
+    if r['error']:
+        print(f"{'':15} stopped by {r['error']}")
+
+def main():
+    profile = sys.argv[1] if len(sys.argv) > 1 else 'clean'
+    if profile not in PROFILES:
+        print(f"Unknown profile {profile}; choose from {', '.join(PROFILES)}")
+        sys.exit(2)
+    # A profile's own result count (e.g. 'empty') wins over the argument
+    options = dict({'results': int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RESULTS}, **PROFILES[profile])
+    names = sys.argv[3].split(',') if len(sys.argv) > 3 else list(SCENARIOS)
+    print(f"Profile {profile}: {options}")
+    print(f"{'scenario':15} {'articles':>9} {'time':>7} {'rate':>9} {'srch':>4} {'artcl':>5} {'errs':>4} "
+          f"{'p50 ms':>6} {'p95 ms':>6} {'p99 ms':>6} {'max ms':>7}")
+    for name in names:
+        report(name, run_scenario(name, options))
+
+if __name__ == "__main__":
+    main()
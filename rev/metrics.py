@@ -0,0 +1,238 @@
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# Run telemetry shared by every scraper in the process: counters, histograms
+# and gauges keyed by name and labels.
+#   http_requests_total{host,status}      http_request_seconds{host}
+#   http_response_bytes_total{host}       http_cache_hits_total{host,revalidated}
+#   http_retries_total{host,event}        rate_limit_wait_seconds{host}
+#   stage_seconds{stage,site}             fetch/parse/filter/enrich/write
+#   dropped_total{site,reason}            records_written_total{sink,site}
+#   queue_depth{queue}                    (last value and the highest seen)
+# report() prints where the time went. With SCAPPER_METRICS=<file> it also
+# saves Prometheus text (or a JSON summary when the name ends in .json);
+# SCAPPER_TRACE=<file> appends one JSON line per request, parse, drop and
+# written record as they happen.
+METRICS_ENV = 'SCAPPER_METRICS'
+TRACE_ENV = 'SCAPPER_TRACE'
+PREFIX = 'scapper_'
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def host_of(url):
+    return urlsplit(url).netloc or url
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Histogram:
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+class Metrics:
+    def __init__(self, trace_path=None):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.time()
+        self.trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+
+    def count(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[_key(name, labels)] += value
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    def gauge(self, name, value, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            highest = self.gauges.get(key, (0, value))[1]
+            self.gauges[key] = (value, max(highest, value))
+
+    def trace(self, event, **fields):
+        if self.trace_file is None:
+            return
+        line = json.dumps(dict(ts=round(time.time(), 6), event=event, **fields), ensure_ascii=False, default=str)
+        with self.lock:
+            # close() may have run since the check above
+            if self.trace_file is not None:
+                self.trace_file.write(line + '\n')
+
+    @contextlib.contextmanager
+    def stage(self, stage, site, **fields):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('stage_seconds', elapsed, stage=stage, site=site)
+            self.trace(stage, site=site, seconds=round(elapsed, 6), **fields)
+
+    def request(self, url, status, seconds, size=None):
+        # status is None for a network error or timeout
+        host = host_of(url)
+        self.count('http_requests_total', host=host, status=status if status is not None else 'error')
+        self.observe('http_request_seconds', seconds, host=host)
+        if size:
+            self.count('http_response_bytes_total', size, host=host)
+        self.trace('request', url=url, status=status, seconds=round(seconds, 6), bytes=size)
+
+    def drop(self, site, reason, link=None):
+        self.count('dropped_total', site=site, reason=reason)
+        self.trace('drop', site=site, reason=reason, link=link)
+
+    def written(self, sink, site, records):
+        self.count('records_written_total', len(records), sink=sink, site=site)
+        for record in records:
+            self.trace('written', sink=sink, site=site, link=record.get('link'))
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+            gauges = sorted(self.gauges.items())
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {PREFIX}{name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f'{PREFIX}{name}{_labels(labels)} {value:g}')
+        for (name, labels), histogram in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{PREFIX}{name}_bucket{_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{PREFIX}{name}_sum{_labels(labels)} {histogram.sum:.6f}')
+            lines.append(f'{PREFIX}{name}_count{_labels(labels)} {histogram.count}')
+        # Each gauge is exported twice, as its last value and as name_max
+        for suffix, index in (('', 0), ('_max', 1)):
+            for (name, labels), values in gauges:
+                header(name + suffix, 'gauge')
+                lines.append(f'{PREFIX}{name}{suffix}{_labels(labels)} {values[index]:g}')
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self):
+        with self.lock:
+            return {
+                'started': self.started,
+                'elapsed': round(time.time() - self.started, 3),
+                'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                'histograms': [{'name': name, 'labels': dict(labels), 'count': h.count,
+                                'sum': round(h.sum, 6), 'max': round(h.max, 6),
+                                'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'p99': h.quantile(0.99)}
+                               for (name, labels), h in sorted(self.histograms.items())],
+                'gauges': [{'name': name, 'labels': dict(labels), 'value': value, 'max': highest}
+                           for (name, labels), (value, highest) in sorted(self.gauges.items())],
+            }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, indent=1)
+            else:
+                f.write(self.to_prometheus())
+
+    def report(self):
+        summary = self.to_json()
+        stages = [h for h in summary['histograms'] if h['name'] == 'stage_seconds']
+        if stages:
+            print("Stages (site, stage: calls, total, p95):")
+            for h in sorted(stages, key=lambda h: -h['sum']):
+                labels = h['labels']
+                print(f"  {labels['site']:10} {labels['stage']:7} {h['count']:6d} {h['sum']:8.2f}s  p95 <= {h['p95'] * 1000:g}ms")
+        hosts = defaultdict(lambda: [0, 0.0, None])
+        for c in summary['counters']:
+            if c['name'] == 'http_requests_total':
+                hosts[c['labels']['host']][0] += c['value']
+            elif c['name'] == 'http_response_bytes_total':
+                hosts[c['labels']['host']][1] += c['value']
+        for h in summary['histograms']:
+            if h['name'] == 'http_request_seconds':
+                hosts[h['labels']['host']][2] = h['p95']
+        for host, (requests, size, p95) in sorted(hosts.items()):
+            print(f"Requests {host}: {requests:g}, {size / 1e6:.1f} MB, p95 <= {(p95 or 0) * 1000:g}ms")
+        drops = [c for c in summary['counters'] if c['name'] == 'dropped_total']
+        if drops:
+            print("Dropped: " + ', '.join(f"{c['labels']['site']}/{c['labels']['reason']} {c['value']:g}" for c in drops))
+        path = os.environ.get(METRICS_ENV)
+        if path:
+            self.save(path)
+            print(f"Metrics saved to {path}")
+        if self.trace_file is not None:
+            with self.lock:
+                self.trace_file.flush()
+
+    def close(self):
+        # Closes the trace file; events after this are no longer traced
+        with self.lock:
+            trace_file, self.trace_file = self.trace_file, None
+        if trace_file is not None:
+            trace_file.close()
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(os.environ.get(TRACE_ENV))
+        return _metrics
+
+def timed(stage, site):
+    # Decorator: every call of the function is one `stage` sample for `site`
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().stage(stage, site):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
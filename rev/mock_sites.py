@@ -0,0 +1,296 @@
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+# Local stand-ins for the news sites: search and article pages in each site's
+# own markup, generated from the keyword and the article number, so a load
+# test never touches the real outlets. One server per site, each on its own
+# port, so limiters, breakers and connection pools see separate hosts.
+#
+# Per server: `results` articles match any keyword, newest first, one every
+# `spacing` minutes back from `anchor`; every request waits `latency` seconds
+# (+-50%), `error_rate` of them are answered with one of `error_statuses`
+# (429 carries Retry-After), and `slow_body` spreads each body over that
+# many seconds.
+SITES = ('cnbc', 'detik', 'jawapos', 'sindo', 'tempo')
+PER_PAGE = {'cnbc': 10, 'detik': 9, 'jawapos': 10, 'sindo': 20, 'tempo': 10}
+# (path, keyword parameter, page parameter) of each site's search page;
+# sindo pages by result offset
+SEARCH = {
+    'cnbc': ('/search', 'query', 'p'),
+    'detik': ('/search/searchnews', 'query', 'page'),
+    'jawapos': ('/search', 'q', 'page'),
+    'sindo': ('/go', 'q', 't'),
+    'tempo': ('/search', 'q', 'page'),
+}
+DAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+MONTHS = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+          'Agustus', 'September', 'Oktober', 'November', 'Desember']
+SHORT_MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'Mei', 'Jun', 'Jul', 'Agu', 'Sep', 'Okt', 'Nov', 'Des']
+WORDS = ("pemerintah jakarta presiden menteri ekonomi harga warga polisi kota rupiah pasar "
+         "saham bank pembangunan jalan tol kereta bandara pemilu partai dpr kpk korupsi sekolah "
+         "guru siswa kesehatan rumah sakit vaksin cuaca gempa petani beras nelayan pelabuhan "
+         "listrik air bersih sungai hutan tambang pajak anggaran daerah desa").split()
+
+def _sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+@lru_cache(maxsize=4096)
+def _story(site, number, keyword):
+    # (title, paragraphs) of one article, the same on every request
+    rng = random.Random(f'{site}:{number}')
+    title = f"{keyword.title()} {_sentence(rng, 7).capitalize()}"
+    paragraphs = tuple(_sentence(rng, rng.randint(25, 60)).capitalize() + '.' for _ in range(8))
+    return title, paragraphs
+
+def _page(title, body):
+    nav = ''.join(f'<li><a href="/kanal/{w}">{w.title()}</a></li>' for w in WORDS[:20])
+    return (f'<!DOCTYPE html>\n<html lang="id"><head><meta charset="utf-8"><title>{title}</title>'
+            f'<script>window.dataLayer=[];</script></head>\n<body><header><nav><ul>{nav}</ul></nav></header>\n'
+            f'{body}\n<footer><p>&copy; 2024 Media</p></footer></body></html>\n')
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    site = 'cnbc'
+    results = 100
+    spacing = 30
+    anchor = None
+    latency = 0.0
+    error_rate = 0.0
+    error_statuses = (429, 503)
+    retry_after = '1'
+    slow_body = 0.0
+    seed = 24
+    # Set per server by MockSite: [(kind, status, seconds)], a lock and the
+    # requests still being answered
+    log = None
+    lock = None
+    rng = None
+    in_flight = 0
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        kind = 'search' if url.path == SEARCH[self.site][0] else 'article'
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            delay = self.latency * cls.rng.uniform(0.5, 1.5)
+            failed = cls.rng.random() < self.error_rate
+            status = cls.rng.choice(self.error_statuses) if failed else 200
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self._send(status, b'busy', {'Retry-After': self.retry_after} if status == 429 else None)
+        elif kind == 'search':
+            self._send(200, self.search_page(query).encode('utf-8'))
+        else:
+            body = self.article_page(url.path)
+            if body is None:
+                status = 404
+                self._send(404, b'not found')
+            else:
+                self._send(200, body.encode('utf-8'))
+        with cls.lock:
+            cls.log.append((kind, status, time.perf_counter() - start))
+            cls.in_flight -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.slow_body and status == 200:
+            # Dribble the body out in pieces, like a congested origin
+            chunks = 8
+            size = -(-len(body) // chunks)
+            for i in range(0, len(body), size):
+                self.wfile.write(body[i:i + size])
+                self.wfile.flush()
+                time.sleep(self.slow_body / chunks)
+        else:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+    def base(self):
+        return f'http://{self.headers.get("Host")}'
+
+    def published(self, number):
+        return self.anchor - timedelta(minutes=self.spacing * number)
+
+    def page_numbers(self, query):
+        # Article numbers on the requested search page; past the last page
+        # the page is a normal one with no results in it
+        page_param = SEARCH[self.site][2]
+        per_page = PER_PAGE[self.site]
+        value = query.get(page_param) or ('0' if self.site == 'sindo' else '1')
+        try:
+            first = int(value) if self.site == 'sindo' else (int(value) - 1) * per_page
+        except ValueError:
+            first = 0
+        return range(max(first, 0), min(max(first, 0) + per_page, self.results))
+
+    def article_url(self, number, keyword):
+        return f'{self.base()}/read/{number}/{quote(keyword)}'
+
+    def article_page(self, path):
+        parts = path.strip('/').split('/')
+        if len(parts) < 3 or parts[0] != 'read' or not parts[1].isdigit():
+            return None
+        number, keyword = int(parts[1]), unquote(parts[2])
+        if number >= self.results:
+            return None
+        title, paragraphs = _story(self.site, number, keyword)
+        return getattr(self, f'{self.site}_article')(title, paragraphs, self.published(number))
+
+    def search_page(self, query):
+        keyword = query.get(SEARCH[self.site][1], '')
+        rows = []
+        for number in self.page_numbers(query):
+            title, paragraphs = _story(self.site, number, keyword)
+            rows.append((self.article_url(number, keyword), title, paragraphs[0], self.published(number)))
+        return getattr(self, f'{self.site}_search')(keyword, rows)
+
+    # Markup of each site, reduced to what its scraper reads plus some noise
+
+    def cnbc_search(self, keyword, rows):
+        items = ''.join(
+            f'<li><article><a href="{link}" class="gtm_indeks_feed"><span class="box_text"><h2>{title}</h2>'
+            f'<span class="subjudul">{summary}</span></span></a></article></li>\n'
+            for link, title, summary, _ in rows)
+        return _page(f'Hasil Pencarian {keyword} - CNBC Indonesia',
+                     f'<div class="lm_content mt10"><ul class="list media_rows middle thumb terbaru gtm_indeks_feed">\n'
+                     f'{items}</ul></div>')
+
+    def cnbc_article(self, title, paragraphs, date):
+        body = ''.join(f'<p>{p}</p>\n' for p in paragraphs)
+        return _page(f'{title} - CNBC Indonesia',
+                     f'<div class="lm_content mt10"><article><h1>{title}</h1>'
+                     f'<div class="date">{date.day:02d} {MONTHS[date.month - 1]} {date.year} {date:%H:%M}</div>'
+                     f'<div class="detail_text">\n{body}</div></article></div>')
+
+    def detik_search(self, keyword, rows):
+        if not rows:
+            return _page('Hasil Pencarian - detikcom', '<div class="search-result-empty">Tidak ditemukan</div>')
+        items = ''.join(
+            f'<article><a href="{link}"><span class="box_text"><h2 class="title">{title}</h2>'
+            f'<span class="date"><span class="category">detikNews</span>{DAYS[date.weekday()]}, '
+            f'{date.day:02d} {SHORT_MONTHS[date.month - 1]} {date.year} {date:%H:%M} WIB</span>'
+            f'<p>{summary}</p></span></a></article>\n'
+            for link, title, summary, date in rows)
+        return _page('Hasil Pencarian - detikcom', f'<div class="list media_rows list-berita">\n{items}</div>')
+
+    def detik_article(self, title, paragraphs, date):
+        body = ''.join(f'<p>{p}</p>\n' for p in paragraphs)
+        return _page(f'{title} - detikNews',
+                     f'<article class="detail"><h1 class="detail__title">{title}</h1>'
+                     f'<div class="detail__body-text itp_bodycontent">\n{body}</div></article>')
+
+    def jawapos_search(self, keyword, rows):
+        items = ''.join(
+            f'<div class="latest__item"><h2 class="latest__title"><a href="{urlsplit(link).path}" class="latest__link">'
+            f'{title}</a></h2><date class="latest__date">{DAYS[date.weekday()]}, {date.day:02d} '
+            f'{MONTHS[date.month - 1]} {date.year} | {date:%H:%M} WIB</date></div>\n'
+            for link, title, _, date in rows)
+        return _page('Hasil pencarian - JawaPos', f'<section class="latest">\n{items}</section>')
+
+    def jawapos_article(self, title, paragraphs, date):
+        body = ''.join(f'<p>{p}</p>\n' for p in paragraphs)
+        return _page(title, f'<article><h1 class="read__title">{title}</h1><div class="read__content">\n{body}</div></article>')
+
+    def sindo_search(self, keyword, rows):
+        items = ''.join(
+            f'<div class="news-list"><div class="news-content"><div class="newsc">NASIONAL</div>'
+            f'<div class="news-title"><a href="{link}">{title}</a></div>'
+            f'<div class="news-date">{DAYS[date.weekday()]}, {date.day} {MONTHS[date.month - 1]} {date.year} - '
+            f'{date:%H:%M} WIB</div><div class="news-summary">{summary}</div></div></div>\n'
+            for link, title, summary, date in rows)
+        return _page('Hasil pencarian - SINDOnews', f'<section class="search-result">\n{items}</section>')
+
+    def sindo_article(self, title, paragraphs, date):
+        body = ''.join(f'{p}<br><br>\n' for p in paragraphs)
+        return _page(f'{title} - SINDOnews',
+                     f'<section class="article"><h1 class="detail-title">{title}</h1>'
+                     f'<div class="read__content">\n{body}</div></section>')
+
+    def tempo_search(self, keyword, rows):
+        items = ''.join(
+            f'<div class="card-box ft240"><div class="wrap"><h2 class="title"><a href="{link}">{title}</a></h2>'
+            f'<p>{summary}</p></div></div>\n'
+            for link, title, summary, _ in rows)
+        return _page('Hasil pencarian - Tempo.co', f'<section class="list">\n{items}</section>')
+
+    def tempo_article(self, title, paragraphs, date):
+        body = ''.join(f'<p>{"TEMPO.CO, Jakarta - " if i == 0 else ""}{p}</p>\n' for i, p in enumerate(paragraphs))
+        return _page(f'{title} | tempo.co',
+                     f'<meta property="article:published_time" content="{date:%Y-%m-%dT%H:%M:%S}+07:00">'
+                     f'<article><h1 class="title">{title}</h1><div itemprop="articleBody">\n{body}</div></article>')
+
+class MockSite:
+    # A running stand-in for one site; `base` replaces the site's scheme and
+    # host, `log` collects (kind, status, seconds) for every request served
+    def __init__(self, site, port=0, **options):
+        options.setdefault('anchor', datetime.now().replace(second=0, microsecond=0))
+        self.site = site
+        self.log = []
+        self.handler = type(f'{site.title()}Handler', (MockSiteHandler,), dict(
+            options, site=site, log=self.log, lock=threading.Lock(),
+            rng=random.Random(options.get('seed', MockSiteHandler.seed))))
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self.handler)
+        self.server.daemon_threads = True
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def anchor(self):
+        return self.handler.anchor
+
+    def wait_idle(self, timeout=5.0):
+        # The client can have the last body before its handler has logged it
+        deadline = time.monotonic() + timeout
+        while self.handler.in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def rebase(url, base):
+    # The site's URL template with its scheme and host swapped for the stand-in's
+    parts, new = urlsplit(url), urlsplit(base)
+    return parts._replace(scheme=new.scheme, netloc=new.netloc).geturl()
+
+# Standalone: python mock_sites.py [first_port] [results]
+# Serves every site on consecutive ports until interrupted.
+
+if __name__ == "__main__":
+    first_port = int(sys.argv[1]) if len(sys.argv) > 1 else 8801
+    results = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    sites = [MockSite(site, first_port + i, results=results) for i, site in enumerate(SITES)]
+    for mock in sites:
+        path, keyword_param, _ = SEARCH[mock.site]
+        print(f"{mock.site:8} {mock.base}{path}?{keyword_param}=banjir")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for mock in sites:
+            mock.close()
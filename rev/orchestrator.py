@@ -0,0 +1,252 @@
+import abc
+import asyncio
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from dates import parse_date
+from dedup import NearDuplicateIndex
+import request_budget
+from metrics import get_metrics
+from sinks import JsonLinesWriter, ParquetSink
+
+# Fans one query out to every site scraper at once. Each source adapter wraps
+# the site's existing scrape function and turns its records into
+#   {'source', 'title', 'link', 'date' (YYYY-MM-DD or None), 'content'}
+# so a multi-outlet crawl takes about as long as its slowest site.
+
+# Requests in flight across all sources together; a source draws slots as it
+# needs them, so one that finishes early leaves its share to the rest
+DEFAULT_BUDGET = 30
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Query:
+    def __init__(self, keyword, days=7, max_pages=5, full=False, end_date=None):
+        self.keyword = keyword
+        self.days = days
+        self.max_pages = max_pages
+        self.full = full
+        self.end_date = end_date or datetime.now()
+
+def normalise_date(value, site=None):
+    parsed = parse_date(value, site)
+    return parsed.strftime('%Y-%m-%d') if parsed else None
+
+def record(source, title, link, date, content=None):
+    return {'source': source, 'title': title, 'link': link, 'date': date, 'content': content}
+
+def _root_module(name):
+    # kompas.py and jawapos.py live next to the rev/ directory; appended so
+    # the root cnbc.py/detik.py never shadow the ones in rev/
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+    return importlib.import_module(name)
+
+class Source(abc.ABC):
+    # collect(query, concurrency, emit) passes each normalised record to emit
+    # as soon as the scraper has it. Blocking scrapers run on a worker
+    # thread; is_async ones run on the event loop.
+    name = None
+    is_async = False
+
+    def __init__(self, dedup=None):
+        # Shared NearDuplicateIndex, so a wire story is kept from one outlet only
+        self.dedup = dedup
+
+    @abc.abstractmethod
+    def collect(self, query, concurrency, emit):
+        ...
+
+class CnbcSource(Source):
+    name = 'cnbc'
+    is_async = True
+
+    async def collect(self, query, concurrency, emit):
+        import cnbc
+
+        def on_article(parsed, link):
+            emit(record(self.name, parsed['headline'], link, normalise_date(parsed['date']), parsed['content']))
+
+        end_date = query.end_date
+        start_date = end_date - timedelta(days=query.days)
+        locate = end_date.date() < datetime.now().date()
+        await cnbc.scrape_cnbc_async(cnbc.HEADERS_LIST, query.keyword, start_date, end_date, query.full,
+                                     on_article, concurrency, locate, self.dedup)
+
+class DetikSource(Source):
+    name = 'detik'
+
+    def collect(self, query, concurrency, emit):
+        import detik
+
+        def on_article(entry):
+            emit(record(self.name, entry['headline'], entry['link'],
+                        normalise_date(detik.parse_listing_date(entry['date'])), entry['content']))
+
+        # Without content the listing entries are the records; with it they
+        # are passed on once their article is fetched
+        data = detik.scrape_detik(query.keyword, 'day', query.days, query.end_date.strftime('%Y-%m-%d'),
+                                  dedup=self.dedup, on_article=None if query.full else on_article)
+        if query.full:
+            detik.fetch_content_for_analysis(data, self.dedup, workers=concurrency, on_article=on_article)
+
+class SindoSource(Source):
+    name = 'sindo'
+
+    def collect(self, query, concurrency, emit):
+        import sindo
+        sindo.scrape_sindonews_parallel(query.keyword, query.max_pages, workers=concurrency, dedup=self.dedup,
+                                        on_article=lambda item: emit(record(
+                                            self.name, item['title'], item['link'],
+                                            normalise_date(item['news_date'], 'sindo'),
+                                            item['content'] if query.full else None)))
+
+class TempoSource(Source):
+    name = 'tempo'
+    is_async = True
+    per_page = 10
+
+    async def collect(self, query, concurrency, emit):
+        import tempo
+
+        def on_article(item):
+            if item['Title'] != "Failed to retrieve":
+                emit(record(self.name, item['Title'], item['URL'], normalise_date(item['Date'], 'tempo'),
+                            item['Content'] if query.full else None))
+
+        await tempo.get_news_data(query.keyword, (query.max_pages or 1) * self.per_page, self.dedup, concurrency, on_article)
+
+class TribunSource(Source):
+    name = 'tribun'
+
+    def collect(self, query, concurrency, emit):
+        import tribun
+        tribun.fetch_news(query.keyword, query.max_pages, pool_size=min(concurrency, tribun.POOL_SIZE),
+                          on_article=lambda item: emit(record(self.name, item['title'], item['link'],
+                                                              normalise_date(item['date'], 'tribun'))))
+
+class KompasSource(Source):
+    name = 'kompas'
+
+    def collect(self, query, concurrency, emit):
+        kompas = _root_module('kompas')
+        kompas.fetch_news(query.keyword, query.max_pages, pool_size=min(concurrency, kompas.POOL_SIZE),
+                          on_article=lambda item: emit(record(self.name, item['title'], item['link'],
+                                                              normalise_date(item['article_date'], 'kompas'))))
+
+class JawaposSource(Source):
+    name = 'jawapos'
+
+    def collect(self, query, concurrency, emit):
+        jawapos = _root_module('jawapos')
+        jawapos.fetch_news(query.keyword, query.max_pages, workers=concurrency,
+                           on_article=lambda item: emit(record(self.name, item['title'], item['link'],
+                                                               normalise_date(item['date'], 'jawapos'))))
+
+SOURCES = {source.name: source for source in (
+    CnbcSource, DetikSource, JawaposSource, KompasSource, SindoSource, TempoSource, TribunSource
+)}
+
+async def crawl(query, sources, on_record, budget=DEFAULT_BUDGET):
+    # Runs every source at once and hands each record to on_record as soon
+    # as its source has it; on_record is called under a lock, from the
+    # source's worker thread or the event loop. All sources draw on one
+    # budget of requests in flight. A failing source is reported and does
+    # not stop the rest; what it emitted before failing is kept.
+    # Returns {name: (record count, seconds, error or None)}.
+    loop = asyncio.get_running_loop()
+    lock = threading.Lock()
+    seen_links = set()
+    counts = Counter()
+    summary = {}
+
+    def emit(source, item):
+        with lock:
+            if item['link'] and item['link'] not in seen_links:
+                seen_links.add(item['link'])
+                on_record(item)
+                counts[source.name] += 1
+                return
+        get_metrics().drop(source.name, 'seen_link', item['link'])
+
+    async def run(source):
+        start = time.perf_counter()
+        # Each source may use the whole budget; the shared count keeps the total
+        collect = functools.partial(source.collect, query, budget, functools.partial(emit, source))
+        try:
+            if source.is_async:
+                await collect()
+            else:
+                await loop.run_in_executor(threads, collect)
+            error = None
+        except Exception as e:
+            error = e
+        return source, time.perf_counter() - start, error
+
+    with request_budget.shared(budget), ThreadPoolExecutor(max_workers=len(sources)) as threads:
+        for finished in asyncio.as_completed([run(source) for source in sources]):
+            source, elapsed, error = await finished
+            summary[source.name] = (counts[source.name], elapsed, error)
+            status = f"failed: {error}" if error else f"{counts[source.name]} articles"
+            print(f"[{source.name}] {status} in {elapsed:.1f}s")
+    return summary
+
+def run(query, names=None, budget=DEFAULT_BUDGET, filename=None):
+    dedup = NearDuplicateIndex()
+    sources = [SOURCES[name](dedup) for name in (names or SOURCES)]
+    filename = filename or f'news_{query.keyword.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'
+    columns = {}
+
+    def on_record(item):
+        sink.write(item)
+        if item['source'] not in columns:
+            columns[item['source']] = ParquetSink(item['source'])
+        row = {name: value for name, value in item.items() if name != 'date'}
+        columns[item['source']].write(dict(row, published=item['date']))
+
+    start = time.perf_counter()
+    with JsonLinesWriter(filename) as sink:
+        try:
+            summary = asyncio.run(crawl(query, sources, on_record, budget))
+        finally:
+            for parquet in columns.values():
+                parquet.close()
+    report(summary, time.perf_counter() - start)
+    dedup.report()
+    get_metrics().report()
+    print(f"Saved {sink.count} articles to {filename}")
+    return filename, summary
+
+def report(summary, wall):
+    sequential = sum(elapsed for _, elapsed, _ in summary.values())
+    print(f"\n{'source':10} {'articles':>8} {'seconds':>8}")
+    for name, (count, elapsed, error) in sorted(summary.items()):
+        print(f"{name:10} {count:8d} {elapsed:8.1f}{'  (failed)' if error else ''}")
+    print(f"Wall clock {wall:.1f}s; one after another would take about {sequential:.1f}s")
+
+def main():
+    keyword = input("Masukkan kata kunci berita: ")
+    days = input("Jumlah hari ke belakang (default 7): ").strip()
+    max_pages = input("Maksimal halaman per situs (default 5, 0 untuk unlimited): ").strip()
+    full = input("Ambil isi artikel lengkap? (yes/no): ").strip().lower() == 'yes'
+    names = input(f"Situs ({', '.join(SOURCES)}), pisahkan dengan koma atau Enter untuk semua: ").strip()
+    budget = input(f"Jumlah request bersamaan untuk semua situs (default {DEFAULT_BUDGET}): ").strip()
+
+    names = [name.strip() for name in names.split(',') if name.strip()] or None
+    unknown = [name for name in names or [] if name not in SOURCES]
+    if unknown:
+        print(f"Situs tidak dikenal: {', '.join(unknown)}")
+        return
+    query = Query(keyword, int(days) if days.isdigit() else 7,
+                  (int(max_pages) or None) if max_pages.isdigit() else 5, full)
+    run(query, names, int(budget) if budget.isdigit() and int(budget) > 0 else DEFAULT_BUDGET)
+    get_metrics().close()
+
+if __name__ == "__main__":
+    main()
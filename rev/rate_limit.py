@@ -0,0 +1,169 @@
+import asyncio
+import contextlib
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import request_budget
+from metrics import get_metrics
+
+# Per-host token buckets whose rate follows AIMD, like TCP congestion control.
+# Every clean, fast response adds about `increase` requests/sec per second;
+# a 429/503, a network error or latency well above the host's best level
+# multiplies the rate by `decrease`. A Retry-After header pauses the host
+# for as long as the server asks.
+DEFAULT_RATE = 4.0
+MIN_RATE = 0.2
+MAX_RATE = 50.0
+THROTTLE_STATUSES = (429, 503)
+
+def retry_after_seconds(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostLimiter:
+    def __init__(self, rate=DEFAULT_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE, burst=None,
+                 increase=1.0, decrease=0.5, slow_factor=2.0, cooldown=1.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.latency = None
+        self.best_latency = None
+        self.samples = 0
+        self.requests = 0
+        self.throttled = 0
+        self.slowdowns = 0
+
+    def _capacity(self):
+        return self.burst or max(1.0, self.rate)
+
+    def reserve(self):
+        # Takes a token and returns how long the caller must wait before
+        # sending. Tokens may go negative, which queues callers in order.
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self._capacity(), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            self.requests += 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.blocked_until - now)
+
+    def observe(self, status, latency, retry_after=None):
+        # status is None for a network error or timeout
+        with self.lock:
+            now = time.monotonic()
+            pause = retry_after_seconds(retry_after)
+            if pause:
+                self.blocked_until = max(self.blocked_until, now + pause)
+                self.tokens = min(self.tokens, 0.0)
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self._decrease(now)
+                return
+            self.samples += 1
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.samples >= 5:
+                self.best_latency = min(self.best_latency or self.latency, self.latency)
+            if self.best_latency and self.latency > self.slow_factor * self.best_latency:
+                self.slowdowns += 1
+                self._decrease(now)
+            elif status < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def _decrease(self, now):
+        # At most once per cooldown: the responses to requests already in
+        # flight all report the same congestion
+        if now - self.last_decrease >= self.cooldown:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.last_decrease = now
+
+class RateLimiter:
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def host(self, url):
+        name = urlsplit(url).netloc
+        with self.lock:
+            if name not in self.hosts:
+                self.hosts[name] = HostLimiter(**self.defaults)
+            return self.hosts[name]
+
+    async def wait(self, url):
+        delay = self.host(url).reserve()
+        get_metrics().observe('rate_limit_wait_seconds', delay, host=urlsplit(url).netloc)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_blocking(self, url):
+        delay = self.host(url).reserve()
+        get_metrics().observe('rate_limit_wait_seconds', delay, host=urlsplit(url).netloc)
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, url, status, latency, retry_after=None):
+        self.host(url).observe(status, latency, retry_after)
+
+    def report(self):
+        for name, host in sorted(self.hosts.items()):
+            print(f"Rate limit {name}: {host.requests} requests, now {host.rate:.1f} req/s, "
+                  f"{host.throttled} throttled/failed, {host.slowdowns} latency back-offs")
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+@contextlib.asynccontextmanager
+async def limited_get(session, url, limiter=None, **kwargs):
+    # session.get(url, **kwargs) paced by the host's bucket, with the outcome
+    # fed back into it. The request metric is taken once the caller is done
+    # with the body, so it covers the download; the crawl's request budget
+    # slot is held for as long.
+    limiter = limiter or get_limiter()
+    await limiter.wait(url)
+    async with request_budget.slot_async():
+        # Timed from here, so waiting for a slot is not taken for host latency
+        start = time.monotonic()
+        status = None
+        try:
+            async with session.get(url, **kwargs) as response:
+                status = response.status
+                limiter.observe(url, status, time.monotonic() - start, response.headers.get('Retry-After'))
+                try:
+                    yield response
+                finally:
+                    get_metrics().request(url, status, time.monotonic() - start, response.content.total_bytes)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if status is None:
+                limiter.observe(url, None, time.monotonic() - start)
+                get_metrics().request(url, None, time.monotonic() - start)
+            raise
@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import threading
+from collections import deque
+
+# One cap on requests in flight for every scraper of a crawl. Blocking
+# callers (thread pools) and coroutines draw slots from the same count, and a
+# freed slot goes to whoever has waited longest, so a site that is busy can
+# use the slots an idle or finished one leaves. Outside a crawl no budget is
+# installed and slot() costs nothing.
+
+class RequestBudget:
+    def __init__(self, size):
+        self.size = size
+        self.free = size
+        self.lock = threading.Lock()
+        # threading.Event for blocked threads, asyncio.Future for coroutines
+        self.waiters = deque()
+        self.peak = 0
+
+    def _take(self):
+        self.free -= 1
+        self.peak = max(self.peak, self.size - self.free)
+
+    def acquire(self):
+        with self.lock:
+            if self.free and not self.waiters:
+                self._take()
+                return
+            event = threading.Event()
+            self.waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self):
+        with self.lock:
+            if self.free and not self.waiters:
+                self._take()
+                return
+            future = asyncio.get_running_loop().create_future()
+            self.waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                if future in self.waiters:
+                    self.waiters.remove(future)
+                    raise
+            # The slot was already handed to us; pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self.lock:
+            while self.waiters:
+                waiter = self.waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter)
+                    return
+                except RuntimeError:
+                    # Its event loop is closed
+                    continue
+            self.free += 1
+
+    def _hand_over(self, future):
+        # The slot stays taken and moves to the waiting coroutine
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+_budget = None
+
+@contextlib.contextmanager
+def shared(size):
+    # Installs a budget of `size` requests for the duration of a crawl
+    global _budget
+    previous, _budget = _budget, RequestBudget(size)
+    try:
+        yield _budget
+    finally:
+        _budget = previous
+
+@contextlib.contextmanager
+def slot():
+    budget = _budget
+    if budget is None:
+        yield
+        return
+    budget.acquire()
+    try:
+        yield
+    finally:
+        budget.release()
+
+@contextlib.asynccontextmanager
+async def slot_async():
+    budget = _budget
+    if budget is None:
+        yield
+        return
+    await budget.acquire_async()
+    try:
+        yield
+    finally:
+        budget.release()
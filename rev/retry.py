@@ -0,0 +1,164 @@
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from metrics import get_metrics
+
+# Exponential backoff with full jitter, plus a circuit breaker per host. After
+# `failure_threshold` consecutive failures a host's breaker opens and calls
+# to it fail at once; after `reset_timeout` one trial call is let through
+# (half-open) and its outcome closes or re-opens the breaker.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class CircuitOpenError(Exception):
+    pass
+
+def is_retryable(error):
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRY_STATUSES
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError,
+                              requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial call still running
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        # Returns True when this failure opened the breaker
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+class RetryPolicy:
+    def __init__(self, attempts=4, base_delay=0.5, max_delay=8.0, failure_threshold=5, reset_timeout=30.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.metrics = Counter()
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def _count(self, url, event):
+        # Counter += is a read and a write; thread-pool callers share the policy
+        with self.lock:
+            self.metrics[event] += 1
+        get_metrics().count('http_retries_total', host=urlsplit(url).netloc, event=event)
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _start(self, url, breaker, attempt, last_error):
+        if not breaker.allow():
+            if attempt:
+                # Our own failures opened it; report the real error
+                self._count(url, 'gave_up')
+                raise last_error
+            self._count(url, 'rejected')
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+        self._count(url, 'attempts')
+
+    def _failed(self, url, breaker, attempt, error):
+        # Raises the error unless another attempt is worth making
+        if not is_retryable(error):
+            breaker.record_success()
+            raise error
+        if breaker.record_failure():
+            self._count(url, 'trips')
+        if attempt == self.attempts - 1:
+            self._count(url, 'gave_up')
+            raise error
+        self._count(url, 'retries')
+
+    async def run(self, url, request):
+        # request() makes one attempt and returns a coroutine. Errors that are
+        # not worth retrying (e.g. 404) are raised at once and do not count
+        # against the host.
+        breaker = self.breaker(url)
+        last_error = None
+        for attempt in range(self.attempts):
+            self._start(url, breaker, attempt, last_error)
+            try:
+                result = await request()
+            except Exception as e:
+                self._failed(url, breaker, attempt, e)
+                last_error = e
+                await asyncio.sleep(self.backoff(attempt))
+            else:
+                breaker.record_success()
+                return result
+
+    def call(self, url, request):
+        # Same as run() for the thread-pool scrapers; request() returns the result
+        breaker = self.breaker(url)
+        last_error = None
+        for attempt in range(self.attempts):
+            self._start(url, breaker, attempt, last_error)
+            try:
+                result = request()
+            except Exception as e:
+                self._failed(url, breaker, attempt, e)
+                last_error = e
+                time.sleep(self.backoff(attempt))
+            else:
+                breaker.record_success()
+                return result
+
+    def report(self):
+        m = self.metrics
+        open_hosts = [host for host, b in sorted(self.breakers.items()) if b.state != CircuitBreaker.CLOSED]
+        print(f"Retries: {m['attempts']} attempts, {m['retries']} retries, {m['gave_up']} gave up, "
+              f"{m['trips']} breaker trips, {m['rejected']} rejected while open"
+              + (f" (open: {', '.join(open_hosts)})" if open_hosts else ""))
+
+_policy = None
+_policy_lock = threading.Lock()
+
+def get_policy():
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = RetryPolicy()
+        return _policy
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'scapper')
+
+class SeenStore:
+    # One SQLite file per source; URLs are scoped by query because a URL seen
+    # under one keyword says nothing about what an older crawl of another covered
+    def __init__(self, source, scope='', directory=DEFAULT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.source = source
+        self.scope = scope
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, f'seen_{source}.sqlite'), check_same_thread=False)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS seen ('
+            'scope TEXT, url TEXT, published_at TEXT, scraped_at TEXT,'
+            'PRIMARY KEY (scope, url))'
+        )
+        # Date windows that finished runs crawled completely
+        self.db.execute('CREATE TABLE IF NOT EXISTS covered (scope TEXT, start TEXT, end TEXT)')
+
+    def __contains__(self, url):
+        with self.lock:
+            row = self.db.execute('SELECT 1 FROM seen WHERE scope = ? AND url = ?', (self.scope, url)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM seen WHERE scope = ?', (self.scope,)).fetchone()[0]
+
+    def add_many(self, items):
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [
+            (self.scope, url, published_at.isoformat() if published_at else None, now)
+            for url, published_at in items
+        ]
+        with self.lock:
+            self.db.executemany('INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?)', rows)
+            self.db.commit()
+
+    def add(self, url, published_at=None):
+        self.add_many([(url, published_at)])
+
+    def add_range(self, start, end):
+        with self.lock:
+            self.db.execute('INSERT INTO covered VALUES (?, ?, ?)', (self.scope, start.isoformat(), end.isoformat()))
+            self.db.commit()
+
+    def covers(self, start, end):
+        # True when one earlier run crawled all of [start, end]
+        with self.lock:
+            row = self.db.execute(
+                'SELECT 1 FROM covered WHERE scope = ? AND start <= ? AND end >= ?',
+                (self.scope, start.isoformat(), end.isoformat())
+            ).fetchone()
+        return row is not None
+
+    def latest(self):
+        with self.lock:
+            row = self.db.execute('SELECT MAX(published_at) FROM seen WHERE scope = ?', (self.scope,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def close(self):
+        with self.lock:
+            self.db.close()
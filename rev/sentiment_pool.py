@@ -0,0 +1,47 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Articles are handed to the pool in windows of this many so that a long
+# stream (e.g. a JSON Lines file) is never fully loaded into memory
+WINDOW = 2000
+
+_analyzer = None
+
+def _init_worker():
+    # Each process builds its analyzer (and loads the lexicon) exactly once
+    global _analyzer
+    _analyzer = SentimentIntensityAnalyzer()
+
+def _compound(text):
+    return _analyzer.polarity_scores(text)["compound"]
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def compound_scores(texts, workers=None):
+    # Yields the VADER compound score of every text, in input order
+    workers = workers or default_workers()
+    texts = iter(texts)
+    if workers == 1:
+        _init_worker()
+        for text in texts:
+            yield _compound(text)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        while True:
+            window = list(itertools.islice(texts, WINDOW))
+            if not window:
+                break
+            chunksize = max(1, len(window) // (workers * 4))
+            yield from executor.map(_compound, window, chunksize=chunksize)
+
+def category(compound, labels=("Positive", "Negative", "Neutral")):
+    positive, negative, neutral = labels
+    if compound >= 0.05:
+        return positive
+    if compound <= -0.05:
+        return negative
+    return neutral
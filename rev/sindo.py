@@ -1,9 +1,16 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import datetime
 import random
 import csv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import http_pool
+import fast_extract
+from sinks import write_parquet
+from dedup import NearDuplicateIndex
+from dates import parse_date
+from metrics import get_metrics, timed
 
 # Daftar user-agent untuk menghindari pemblokiran
 user_agents = [
@@ -14,51 +21,93 @@ user_agents = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36'
 ]
 
-def get_soup(url):
+def get_html(url):
+    # Bytes, decoded by fast_extract from the page's own <meta charset>
     headers = {'User-Agent': random.choice(user_agents)}
-    response = requests.get(url, headers=headers)
+    response = http_pool.get(url, headers=headers)
     response.raise_for_status()
-    soup = BeautifulSoup(response.content, 'html.parser')
-    return soup
+    return response.content
 
-def scrape_sindonews(keyword, max_pages=None):
-    base_url = 'https://search.sindonews.com/go?type=artikel&q={}&t={}'
+BASE_URL = 'https://search.sindonews.com/go?type=artikel&q={}&t={}'
+
+def page_url(keyword, page):
+    return BASE_URL.format(keyword, 20 * (page - 1)) if page > 1 else BASE_URL.format(keyword, '')
+
+@timed('parse', 'sindo')
+def parse_listing(html):
+    # None when the page has no results at all
+    nodes = fast_extract.sindo_items(html)
+    if not nodes:
+        return None
+    items = []
+    for node in nodes:
+        try:
+            items.append(fast_extract.sindo_item(node))
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+            get_metrics().drop('sindo', 'bad_item')
+    return items
+
+@timed('parse', 'sindo')
+def extract_content(html):
+    return fast_extract.sindo_content(html)
+
+# BeautifulSoup versions, kept as the reference the lxml path is tested against
+def parse_listing_soup(html, parser='html.parser'):
+    news_items = BeautifulSoup(html, parser).select('div.news-content')
+    if not news_items:
+        return None
+    items = []
+    for item in news_items:
+        try:
+            items.append({
+                'title': item.select_one('div.news-title a').text.strip(),
+                'link': item.select_one('div.news-title a').get('href'),
+                'category': item.select_one('div.newsc').text.capitalize().strip(),
+                'news_date': item.select_one('div.news-date').text.strip()
+            })
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+    return items
+
+def extract_content_soup(html, parser='html.parser'):
+    content_element = BeautifulSoup(html, parser).select_one('div.read__content')
+    return content_element.text.strip() if content_element else ""
+
+def fetch_content(link):
+    return extract_content(get_html(link))
+
+def scrape_sindonews(keyword, max_pages=None, dedup=None):
     articles = []
     visited_links = set()
+    metrics = get_metrics()
     page = 1
 
     while True:
-        url = base_url.format(keyword, 20 * (page - 1)) if page > 1 else base_url.format(keyword, '')
-        soup = get_soup(url)
-        news_items = soup.select('div.news-content')
+        items = parse_listing(get_html(page_url(keyword, page)))
 
-        if not news_items:
+        if items is None:
             print("No more news items found or end of pages.")
             break
 
-        for item in news_items:
+        for item in items:
+            if item['link'] in visited_links:
+                metrics.drop('sindo', 'seen_link', item['link'])
+                continue
+            visited_links.add(item['link'])
+            if dedup is not None and dedup.seen_title(item['link'], item['title']):
+                metrics.drop('sindo', 'duplicate', item['link'])
+                continue
             try:
-                link = item.select_one('div.news-title a').get('href')
-                if link not in visited_links:
-                    visited_links.add(link)
-                    title = item.select_one('div.news-title a').text.strip()
-                    date_text = item.select_one('div.news-date').text.strip()
-                    category = item.select_one('div.newsc').text.capitalize().strip()
-
-                    # Fetch the full article content
-                    article_soup = get_soup(link)
-                    content_element = article_soup.select_one('div.read__content')
-                    content = content_element.text.strip() if content_element else ""
-
-                    articles.append({
-                        'title': title,
-                        'link': link,
-                        'category': category,
-                        'news_date': date_text,
-                        'content': content
-                    })
+                # Fetch the full article content
+                item['content'] = fetch_content(item['link'])
+                if dedup is not None and dedup.seen_content(item['link'], item['content']):
+                    metrics.drop('sindo', 'duplicate', item['link'])
+                    continue
+                articles.append(item)
             except Exception as e:
                 print(f"Error processing an item: {e}")
+                metrics.drop('sindo', 'fetch_failed', item['link'])
 
         page += 1
         if max_pages and page > max_pages:
@@ -66,6 +115,66 @@ def scrape_sindonews(keyword, max_pages=None):
 
     return articles
 
+def scrape_sindonews_parallel(keyword, max_pages=None, window=4, workers=10, dedup=None, on_article=None):
+    # Offset halaman sudah diketahui, jadi beberapa halaman listing diambil
+    # lebih dulu (spekulatif) sementara artikelnya diproses oleh worker pool
+    articles = []
+    visited_links = set()
+    metrics = get_metrics()
+    pending = []
+
+    with ThreadPoolExecutor(max_workers=window) as listing_pool, \
+            ThreadPoolExecutor(max_workers=workers) as article_pool:
+        listing = deque()
+        next_page = 1
+
+        def fill_window():
+            nonlocal next_page
+            while len(listing) < window and not (max_pages and next_page > max_pages):
+                listing.append(listing_pool.submit(get_html, page_url(keyword, next_page)))
+                next_page += 1
+
+        fill_window()
+        while listing:
+            items = parse_listing(listing.popleft().result())
+            if items is None:
+                print("No more news items found or end of pages.")
+                break
+            for item in items:
+                if item['link'] in visited_links:
+                    metrics.drop('sindo', 'seen_link', item['link'])
+                    continue
+                visited_links.add(item['link'])
+                # Judul yang hampir sama dengan berita lain tidak diambil isinya
+                if dedup is not None and dedup.seen_title(item['link'], item['title']):
+                    metrics.drop('sindo', 'duplicate', item['link'])
+                    continue
+                http_pool.size_pools([item['link']], workers)
+                pending.append((item, article_pool.submit(fetch_content, item['link'])))
+            fill_window()
+            metrics.gauge('queue_depth', len(listing), queue='sindo_listing')
+            metrics.gauge('queue_depth', sum(not future.done() for _, future in pending), queue='sindo_articles')
+
+        # Halaman spekulatif setelah halaman kosong tidak dipakai lagi
+        for future in listing:
+            future.cancel()
+
+        for item, future in pending:
+            try:
+                item['content'] = future.result()
+                if dedup is not None and dedup.seen_content(item['link'], item['content']):
+                    metrics.drop('sindo', 'duplicate', item['link'])
+                    continue
+                articles.append(item)
+            except Exception as e:
+                print(f"Error processing an item: {e}")
+                metrics.drop('sindo', 'fetch_failed', item['link'])
+                continue
+            if on_article is not None:
+                on_article(item)
+
+    return articles
+
 def save_to_json(data, filename):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=4)
@@ -77,6 +186,17 @@ def save_to_csv(data, filename):
         for item in data:
             writer.writerow([item['title'], item['link'], item['category'], item['news_date']])
 
+def parse_news_date(news_date):
+    # "Senin, 5 Mei 2024 - 07:46 WIB"
+    return parse_date(news_date, 'sindo')
+
+def save_to_parquet(data):
+    return write_parquet('sindo', (
+        {'title': item['title'], 'link': item['link'], 'category': item['category'],
+         'published': parse_news_date(item['news_date']), 'content': item.get('content')}
+        for item in data
+    ))
+
 def display_articles(articles):
     for i, article in enumerate(articles, 1):
         print(f"No. {i} | Date: {article['news_date']} | Title: {article['title']}")
@@ -86,11 +206,21 @@ if __name__ == "__main__":
     max_pages_input = input("Masukkan jumlah maksimal halaman untuk di-scrape atau biarkan kosong untuk unlimited: ")
     max_pages = int(max_pages_input) if max_pages_input.isdigit() else None
 
-    articles = scrape_sindonews(keyword, max_pages)
+    parallel = input("Ambil halaman secara paralel? (yes/no): ").strip().lower() == 'yes'
+
+    dedup = NearDuplicateIndex()
+    if parallel:
+        articles = scrape_sindonews_parallel(keyword, max_pages, dedup=dedup)
+    else:
+        articles = scrape_sindonews(keyword, max_pages, dedup=dedup)
     timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S')
     json_filename = f'sindonews_articles_{keyword}_{timestamp}.json'
     csv_filename = f'sindonews_articles_{keyword}_{timestamp}.csv'
     save_to_json(articles, json_filename)
     save_to_csv(articles, csv_filename)
+    save_to_parquet(articles)
     display_articles(articles)
-    print(f'Saved {len(articles)} articles to {json_filename} and {csv_filename}')
+    print(f'Saved {len(articles)} articles to {json_filename}, {csv_filename} and the Parquet dataset')
+    dedup.report()
+    get_metrics().report()
+    get_metrics().close()
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+from metrics import get_metrics
+
+class JsonLinesWriter:
+    # One JSON record per line, flushed every batch_size records so a crash
+    # loses at most one batch and memory does not grow with the crawl
+    def __init__(self, filename, batch_size=50):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.pending = 0
+        self.count = 0
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n')
+        self.pending += 1
+        self.count += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def iter_jsonl(filename):
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def jsonl_to_json(src, dst):
+    # Streams into the same layout as json.dump(records, f, ensure_ascii=False, indent=4)
+    count = 0
+    with open(dst, 'w', encoding='utf-8') as out:
+        for record in iter_jsonl(src):
+            out.write(',\n' if count else '[\n')
+            body = json.dumps(record, ensure_ascii=False, indent=4)
+            out.write('\n'.join('    ' + line for line in body.split('\n')))
+            count += 1
+        out.write('\n]' if count else '[]')
+    return count
+
+# Columnar output. Records are appended to a Hive-partitioned Parquet dataset
+#   <root>/source=<source>/month=<YYYY-MM>/part-<run>-<n>.parquet
+# that every scraper shares. Source and publish month live in the directory
+# names, so a load can skip whole partitions (days would leave a few rows per
+# file, which Parquet handles badly); the low-cardinality text columns below
+# are dictionary-encoded and `published` is stored as a timestamp.
+DEFAULT_PARQUET_ROOT = 'news_parquet'
+DICTIONARY_COLUMNS = ('category', 'label', 'sentiment', 'sentiment_label')
+
+class ParquetSink:
+    def __init__(self, source, root=DEFAULT_PARQUET_ROOT, batch_size=1000):
+        import pyarrow  # noqa: F401  (fail at construction, not at the first flush)
+        self.source = source
+        self.root = root
+        self.batch_size = batch_size
+        self.run = datetime.now().strftime('%Y%m%d%H%M%S') + f'-{os.getpid()}'
+        self.parts = 0
+        self.pending = []
+        self.count = 0
+
+    def write(self, record):
+        # record: flat dict; 'published' may be a datetime, an ISO string or None
+        record = dict(record)
+        record.pop('source', None)  # already in the partition path
+        record['published'] = _timestamp(record.get('published'))
+        self.pending.append(record)
+        self.count += 1
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        import pyarrow.parquet as pq
+        metrics = get_metrics()
+        partitions = {}
+        for record in self.pending:
+            month = record['published'].strftime('%Y-%m') if record['published'] else 'unknown'
+            partitions.setdefault(month, []).append(record)
+        with metrics.stage('write', self.source, records=len(self.pending)):
+            for month, records in partitions.items():
+                directory = os.path.join(self.root, f'source={self.source}', f'month={month}')
+                os.makedirs(directory, exist_ok=True)
+                table = _table(records)
+                dictionary = [name for name in table.column_names if name in DICTIONARY_COLUMNS]
+                pq.write_table(table, os.path.join(directory, f'part-{self.run}-{self.parts}.parquet'),
+                               compression='zstd', use_dictionary=dictionary or False)
+                self.parts += 1
+        metrics.written('parquet', self.source, self.pending)
+        self.pending = []
+
+    def close(self):
+        if self.pending:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _timestamp(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def _table(records):
+    import pyarrow as pa
+    names = []
+    for record in records:
+        names.extend(name for name in record if name not in names)
+    arrays, fields = [], []
+    for name in names:
+        values = [record.get(name) for record in records]
+        if name == 'published':
+            array = pa.array(values, type=pa.timestamp('s'))
+        elif name in DICTIONARY_COLUMNS:
+            array = pa.array([None if v is None else str(v) for v in values], type=pa.string()).dictionary_encode()
+        else:
+            array = pa.array(values)
+            if pa.types.is_null(array.type):
+                array = array.cast(pa.string())
+        arrays.append(array)
+        fields.append(pa.field(name, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def write_parquet(source, records, root=DEFAULT_PARQUET_ROOT):
+    with ParquetSink(source, root) as sink:
+        for record in records:
+            sink.write(record)
+    return sink.count
+
+def read_parquet(root=DEFAULT_PARQUET_ROOT, columns=None, filter=None):
+    # Whole dataset (or the partitions `filter` selects) as a pandas DataFrame;
+    # part files written by different scrapers may have different columns
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    dataset = ds.dataset(root, format='parquet', partitioning=partitioning)
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if schemas:
+        schema = pa.unify_schemas(schemas + [dataset.partitioning.schema])
+        dataset = ds.dataset(root, format='parquet', partitioning=partitioning, schema=schema)
+    # Arrow-backed strings skip building a Python object per cell
+    import pandas as pd
+    strings = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+    return dataset.to_table(columns=columns, filter=filter).to_pandas(types_mapper=strings.get)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python sinks.py input.jsonl output.json")
+        sys.exit(1)
+    print(f"Converted {jsonl_to_json(sys.argv[1], sys.argv[2])} records to {sys.argv[2]}")
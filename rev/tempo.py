@@ -6,6 +6,16 @@ import pandas as pd
 import time
 import json
 import random
+import http_cache
+import rate_limit
+import retry
+from dedup import NearDuplicateIndex
+from dates import parse_date
+from metrics import get_metrics, timed
+from sinks import write_parquet
+import fast_extract
+
+SEARCH_URL = "https://www.tempo.co/search"
 
 def convert_date(date_string):
     try:
@@ -13,29 +23,53 @@ def convert_date(date_string):
     except ValueError:
         return datetime.now().strftime('%Y-%m-%d %H:%M WIB')
 
-async def fetch(session, url):
-    retries = 3
-    for _ in range(retries):
-        try:
-            async with session.get(url, timeout=10) as response:
-                response.raise_for_status()
-                return await response.text()
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            print(f"Network error for URL: {url}, retrying... ({e})")
-            await asyncio.sleep(5)
-    print(f"Failed to retrieve content from URL: {url} after {retries} retries.")
-    return None
-
-async def get_article_content(session, url):
-    html = await fetch(session, url)
-    if html is None:
-        return {
-            'Title': "Failed to retrieve",
-            'Date': "N/A",
-            'Content': "N/A",
-            'URL': url
-        }
-    soup = BeautifulSoup(html, 'html.parser')
+async def fetch(session, url, cache=None):
+    # Retries back off exponentially (with jitter) and stop at once while the
+    # host's circuit breaker is open; the limiter paces every attempt
+    limiter = rate_limit.get_limiter()
+
+    async def attempt():
+        if cache is not None:
+            return await http_cache.fetch_text_async(session, url, cache=cache, limiter=limiter, timeout=10)
+        async with rate_limit.limited_get(session, url, limiter, timeout=10) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    try:
+        return await retry.get_policy().run(url, attempt)
+    except (aiohttp.ClientError, asyncio.TimeoutError, retry.CircuitOpenError) as e:
+        print(f"Failed to retrieve content from URL: {url} ({e})")
+        return None
+
+async def fetch_search_page(session, base_url, params):
+    async with rate_limit.limited_get(session, base_url, params=params) as response:
+        response.raise_for_status()
+        return await response.text()
+
+def clean_content(content):
+    # Remove 'TEMPO.CO, Jakarta - ' from content
+    if content.startswith('TEMPO.CO, Jakarta - '):
+        content = content.replace('TEMPO.CO, Jakarta - ', '', 1)
+    
+    # Remove content from "Pilihan editor: " to the end
+    editor_choice_index = content.find('Pilihan editor: ')
+    if editor_choice_index != -1:
+        content = content[:editor_choice_index]
+    return content
+
+@timed('parse', 'tempo')
+def extract_article(html, url):
+    title, published_time, paragraphs = fast_extract.tempo_fields(html)
+    return {
+        'Title': title if title is not None else "No title found",
+        'Date': convert_date(published_time) if published_time is not None else "No date found",
+        'URL': url,
+        'Content': clean_content(' '.join(paragraphs) if paragraphs is not None else "No content found")
+    }
+
+# BeautifulSoup version, kept as the reference the lxml path is tested against
+def extract_article_soup(html, url, parser='html.parser'):
+    soup = BeautifulSoup(html, parser)
     
     # Extract title
     title_tag = soup.find('h1', class_='title')
@@ -48,25 +82,42 @@ async def get_article_content(session, url):
     # Extract article content
     article_body = soup.find('div', itemprop='articleBody')
     content = ' '.join([para.get_text() for para in article_body.find_all('p')]) if article_body else "No content found"
-    
-    # Remove 'TEMPO.CO, Jakarta - ' from content
-    if content.startswith('TEMPO.CO, Jakarta - '):
-        content = content.replace('TEMPO.CO, Jakarta - ', '', 1)
-    
-    # Remove content from "Pilihan editor: " to the end
-    editor_choice_index = content.find('Pilihan editor: ')
-    if editor_choice_index != -1:
-        content = content[:editor_choice_index]
 
     return {
         'Title': title,
         'Date': date,
         'URL': url,
-        'Content': content
+        'Content': clean_content(content)
     }
 
-async def get_news_data(query, max_results=10):
-    base_url = "https://www.tempo.co/search"
+@timed('parse', 'tempo')
+def search_links(html):
+    # [(url, title)] of the result cards; None when the page has no cards
+    articles = BeautifulSoup(html, 'html.parser').find_all('div', {'class': 'card-box'})
+    if not articles:
+        return None
+    links = []
+    for article in articles:
+        title_tag = article.find('h2', class_='title')
+        if title_tag:
+            links.append((title_tag.find('a')['href'], title_tag.get_text(strip=True)))
+    return links
+
+async def get_article_content(session, semaphore, url):
+    async with semaphore:
+        html = await fetch(session, url, cache=http_cache.get_cache())
+    if html is None:
+        get_metrics().drop('tempo', 'fetch_failed', url)
+        return {
+            'Title': "Failed to retrieve",
+            'Date': "N/A",
+            'Content': "N/A",
+            'URL': url
+        }
+    return extract_article(html, url)
+
+async def get_news_data(query, max_results=10, dedup=None, concurrency=10, on_article=None):
+    base_url = SEARCH_URL
     user_agents = [
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_2) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/79.0.3945.88 Safari/537.36',
@@ -81,6 +132,8 @@ async def get_news_data(query, max_results=10):
     
     news_data = []
     seen_urls = set()
+    metrics = get_metrics()
+    semaphore = asyncio.Semaphore(concurrency)
     async with aiohttp.ClientSession(headers=headers) as session:
         page = 1
         while len(news_data) < max_results:
@@ -88,35 +141,47 @@ async def get_news_data(query, max_results=10):
                 'q': query,
                 'page': page
             }
-            async with session.get(base_url, params=params) as response:
-                response.raise_for_status()
-                soup = BeautifulSoup(await response.text(), 'html.parser')
-
-            articles = soup.find_all('div', {'class': 'card-box'})
-            if not articles:
+            try:
+                html = await retry.get_policy().run(base_url, lambda: fetch_search_page(session, base_url, params))
+            except (aiohttp.ClientError, asyncio.TimeoutError, retry.CircuitOpenError) as e:
+                print(f"Failed to retrieve search page {page}: {e}")
+                break
+            links = search_links(html)
+            if links is None:
                 break
             
             tasks = []
             new_articles_count = 0
-            for article in articles:
-                title_tag = article.find('h2', class_='title')
-                if title_tag:
-                    url = title_tag.find('a')['href']
-                    if url not in seen_urls:
-                        seen_urls.add(url)
-                        tasks.append(get_article_content(session, url))
-                        new_articles_count += 1
+            for url, title in links:
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    new_articles_count += 1
+                    # A near-identical headline is already known; skip the fetch
+                    if dedup is not None and dedup.seen_title(url, title):
+                        metrics.drop('tempo', 'duplicate', url)
+                        continue
+                    tasks.append(get_article_content(session, semaphore, url))
+                else:
+                    metrics.drop('tempo', 'seen_link', url)
                     
             results = await asyncio.gather(*tasks)
+            if dedup is not None:
+                kept = []
+                for result in results:
+                    if result['Title'] != "Failed to retrieve" and dedup.seen_content(result['URL'], result['Content']):
+                        metrics.drop('tempo', 'duplicate', result['URL'])
+                    else:
+                        kept.append(result)
+                results = kept
             news_data.extend(results)
+            if on_article is not None:
+                for result in results:
+                    on_article(result)
             
             if len(news_data) >= max_results or new_articles_count == 0:
                 break
             
             page += 1
-            if len(news_data) < max_results:
-                print("Pausing for 5 seconds...")
-                await asyncio.sleep(5)
     
     return news_data
 
@@ -128,6 +193,12 @@ def save_to_excel(news_data, filename='news_data.xlsx'):
     df = pd.DataFrame(news_data, columns=['Title', 'Date', 'URL'])
     df.to_excel(filename, index=False)
 
+def save_to_parquet(news_data):
+    return write_parquet('tempo', (
+        {'title': item['Title'], 'link': item['URL'], 'published': parse_date(item['Date'], 'tempo'), 'content': item['Content']}
+        for item in news_data if item['Title'] != "Failed to retrieve"
+    ))
+
 def save_to_json(news_data, filename='news_data.json'):
     if not news_data:
         print("No news data found for the given query.")
@@ -140,8 +211,9 @@ def main():
     query = input("Enter the query: ")
     max_results = int(input("Enter the maximum number of results: "))
     
+    dedup = NearDuplicateIndex()
     loop = asyncio.get_event_loop()
-    news_data = loop.run_until_complete(get_news_data(query, max_results))
+    news_data = loop.run_until_complete(get_news_data(query, max_results, dedup))
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     excel_filename = f'temponnewsdata_{timestamp}.xlsx'
@@ -151,9 +223,16 @@ def main():
     save_to_json(news_data, json_filename)
     
     if news_data:
-        print(f"Data saved to {excel_filename} and {json_filename}")
+        save_to_parquet(news_data)
+        print(f"Data saved to {excel_filename}, {json_filename} and the Parquet dataset")
     else:
         print("No data found to save.")
+    http_cache.get_cache().report()
+    rate_limit.get_limiter().report()
+    retry.get_policy().report()
+    dedup.report()
+    get_metrics().report()
+    get_metrics().close()
 
 if __name__ == "__main__":
     main()
@@ -1,24 +1,16 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime
 import pandas as pd
 import re
-import time
 from tqdm import tqdm  # For progress visualization
+from driver_pool import DriverPool, open_page, render_pages, wait_for_results
+from sinks import write_parquet
+from dates import parse_date
+from metrics import get_metrics, timed
+import google_cse
 
-def setup_driver():
-    options = Options()
-    options.headless = False  # Disabled headless mode for debugging
-    options.add_argument("window-size=1200x600")
-    options.add_argument("disable-gpu")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    print("Driver set up successfully.")
-    return driver
+POOL_SIZE = 3  # Headless browsers rendering result pages in parallel
+CSE_CX = 'partner-pub-7486139053367666:4965051114'  # Search engine behind the tribunnews.com search page
+SEARCH_REFERER = 'https://www.tribunnews.com/search'
 
 def extract_date_from_url(url):
     # Regular expression to find date patterns in the URL
@@ -27,68 +19,98 @@ def extract_date_from_url(url):
         return datetime.strptime(f"{match.group(1)}-{match.group(2)}-{match.group(3)}", "%Y-%m-%d").strftime("%d-%m-%Y")
     return None
 
-def fetch_news(keyword, max_pages):
-    driver = setup_driver()
-    news_data = []
-    page = 1
-    seen = set()  # Set to track seen (title, link) tuples
-
-    try:
-        while True:
-            if max_pages and page > max_pages:
-                print("Reached maximum page limit.")
-                break
-            url = f'https://www.tribunnews.com/search?q={keyword}&cx=partner-pub-7486139053367666%3A4965051114&cof=FORID%3A10&ie=UTF-8&siteurl=www.tribunnews.com#gsc.tab=0&gsc.q={keyword}&gsc.page={page}'
-            print(f"Fetching URL: {url}")
-            driver.get(url)
-            driver.implicitly_wait(10)
-            time.sleep(3)  # Allow some time for the page to fully load
+@timed('filter', 'tribun')
+def page_news(items, seen):
+    # Dated articles among one page's (link, title) pairs, skipping tag and
+    # topic pages and pairs already in `seen`
+    metrics = get_metrics()
+    news = []
+    for link, title in items:
+        if not (link and title):
+            metrics.drop('tribun', 'no_title', link)
+            continue
+        if '/tag/' in link or '/topic/' in link:
+            metrics.drop('tribun', 'tag_page', link)
+            continue
+        if (title, link) in seen:
+            metrics.drop('tribun', 'duplicate', link)
+            continue
+        date = extract_date_from_url(link)
+        if not date:  # Only add entries with a valid date
+            metrics.drop('tribun', 'no_date', link)
+            continue
+        news.append({
+            'title': title,
+            'link': link,
+            'date': date
+        })
+        seen.add((title, link))
+    return news
 
-            # Attempt to find news items on the current page
-            news_items = driver.find_elements(By.CSS_SELECTOR, 'a.gs-title')
-            if not news_items:
-                print("No more news items found or end of pages.")
-                break
+def render_page(driver, keyword, page):
+    url = f'https://www.tribunnews.com/search?q={keyword}&cx=partner-pub-7486139053367666%3A4965051114&cof=FORID%3A10&ie=UTF-8&siteurl=www.tribunnews.com#gsc.tab=0&gsc.q={keyword}&gsc.page={page}'
+    print(f"Fetching URL: {url}")
+    open_page(driver, url)
+    # Wait until the results (or the no-results notice) are rendered
+    news_items = wait_for_results(driver, 'a.gs-title', ['.gs-no-results-result'])
+    if not news_items:
+        return None
+    items = []
+    for item in news_items:
+        try:
+            items.append((item.get_attribute('href'), item.get_attribute('textContent').strip()))
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+    return items
 
-            for item in tqdm(news_items, desc=f'Processing Page {page}'):
-                try:
-                    link = item.get_attribute('href')
-                    title = item.get_attribute('textContent').strip()
-                    if link and title and (title, link) not in seen and '/tag/' not in link and '/topic/' not in link:
-                        date = extract_date_from_url(link)
-                        if date:  # Only add entries with a valid date
-                            news_data.append({
-                                'title': title,
-                                'link': link,
-                                'date': date
-                            })
-                            seen.add((title, link))
-                except Exception as e:
-                    print(f"Error processing an item: {e}")
+def browser_pages(keyword, max_pages, pool_size, first_page=1):
+    with DriverPool(pool_size) as pool:
+        yield from render_pages(pool, lambda driver, page: render_page(driver, keyword, page), max_pages, first_page)
 
-            page += 1  # Increment page number to fetch next page
+def fetch_news(keyword, max_pages, pool_size=POOL_SIZE, on_article=None):
+    news_data = []
+    seen = set()  # Set to track seen (title, link) tuples
 
+    # JSON results of the search widget first; the browser only takes over
+    # from the first page the search API fails on
+    fallback = lambda first_page: browser_pages(keyword, max_pages, pool_size, first_page)
+    try:
+        for page, items in google_cse.iter_pages(CSE_CX, keyword, max_pages, referer=SEARCH_REFERER, fallback=fallback):
+            news = page_news(tqdm(items, desc=f'Processing Page {page}'), seen)
+            news_data.extend(news)
+            if on_article is not None:
+                for item in news:
+                    on_article(item)
+        print("No more news items found or end of pages.")
     except Exception as e:
         print(f"An error occurred during fetching news: {e}")
-    finally:
-        driver.quit()
 
     return news_data
 
-# Get user input for keyword and pages
-keyword = input("Masukkan kata kunci berita: ")
-max_pages_input = input("Masukkan maksimal jumlah halaman yang di-scrape atau tekan Enter untuk unlimited: ")
-max_pages = None if max_pages_input.strip() == "" else int(max_pages_input)
+def main():
+    # Get user input for keyword and pages
+    keyword = input("Masukkan kata kunci berita: ")
+    max_pages_input = input("Masukkan maksimal jumlah halaman yang di-scrape atau tekan Enter untuk unlimited: ")
+    max_pages = None if max_pages_input.strip() == "" else int(max_pages_input)
+
+    # Fetch and save the news data
+    news_data = fetch_news(keyword, max_pages)
+    df_news = pd.DataFrame(news_data)
+    df_news['date'] = pd.to_datetime(df_news['date'], format='%d-%m-%Y')
+    df_news = df_news.drop_duplicates().sort_values(by='date', ascending=False)  # Sort by date and remove duplicates
 
-# Fetch and save the news data
-news_data = fetch_news(keyword, max_pages)
-df_news = pd.DataFrame(news_data)
-df_news['date'] = pd.to_datetime(df_news['date'], format='%d-%m-%Y')
-df_news = df_news.drop_duplicates().sort_values(by='date', ascending=False)  # Sort by date and remove duplicates
+    # Save to CSV
+    now = datetime.now().strftime("%Y%m%d%H%M%S")
+    output_path = f'./tribunnews_{now}.csv'
+    df_news.to_csv(output_path, index=False)
+    write_parquet('tribun', (
+        {'title': item['title'], 'link': item['link'], 'published': parse_date(item['date'], 'tribun')}
+        for item in news_data
+    ))
+    print(f"Scraping is finished. Total news processed: {len(news_data)}")
+    print(f"Data saved to {output_path}")
+    get_metrics().report()
+    get_metrics().close()
 
-# Save to CSV
-now = datetime.now().strftime("%Y%m%d%H%M%S")
-output_path = f'./tribunnews_{now}.csv'
-df_news.to_csv(output_path, index=False)
-print(f"Scraping is finished. Total news processed: {len(news_data)}")
-print(f"Data saved to {output_path}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# The scrapers import each other by module name from rev/
+REV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rev')
+if REV not in sys.path:
+    sys.path.insert(0, REV)
+
+@pytest.fixture
+def serve():
+    # serve(handler_class) -> base URL of a local server, shut down after the test
+    servers = []
+
+    def start(handler, host='127.0.0.1'):
+        server = ThreadingHTTPServer((host, 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://{host}:{server.server_address[1]}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def fresh(tmp_path):
+    # Cold cache, limiter, breakers and pool for each scrape against a stand-in
+    import http_cache
+    import load_test
+    load_test.fresh_state(str(tmp_path))
+    yield
+    http_cache.get_cache().close()
+    load_test.fresh_state(str(tmp_path))
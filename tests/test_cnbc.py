@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+import pytest
+
+import cnbc
+import load_test
+from mock_sites import MONTHS
+
+def hourly(count, newest=datetime(2024, 5, 20, 12)):
+    return [newest - timedelta(hours=i) for i in range(count)]
+
+def paged(dates, per_page=10):
+    return [dates[i:i + per_page] for i in range(0, len(dates), per_page)]
+
+class ListingHandler(BaseHTTPRequestHandler):
+    # pages[p - 1] holds the article dates of search page p, newest first;
+    # None stands for an item whose page has no date. Past the last page the
+    # listing is empty.
+    protocol_version = 'HTTP/1.1'
+    pages = []
+    listings = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/search':
+            page = int(parse_qs(url.query)['p'][0])
+            type(self).listings.append(page)
+            dates = self.pages[page - 1] if page <= len(self.pages) else []
+            items = ''.join(
+                f'<li><article><a href="http://{self.headers["Host"]}/read/{page}/{i}"><h2>Banjir {page}-{i}</h2></a></article></li>'
+                for i in range(len(dates)))
+            return self._send(f'<div class="lm_content mt10"><ul class="{cnbc.LISTING_CLASS}">{items}</ul></div>')
+        page, i = (int(part) for part in url.path.split('/')[2:4])
+        date = self.pages[page - 1][i]
+        stamp = f'<div class="date">{date.day:02d} {MONTHS[date.month - 1]} {date.year} {date:%H:%M}</div>' if date else ''
+        self._send(f'<div class="lm_content mt10"><article><h1>Banjir {page}-{i}</h1>{stamp}</article></div>')
+
+    def _send(self, body):
+        body = f'<html><body>{body}</body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def listing(serve, fresh, monkeypatch):
+    # listing(pages, end_date) -> (start page, listing pages requested)
+    def locate(pages, end_date):
+        handler = type('Handler', (ListingHandler,), {'pages': pages, 'listings': []})
+        base = serve(handler)
+        monkeypatch.setattr(cnbc, 'SEARCH_URL', f'{base}/search?query={{}}&p={{}}')
+
+        async def run():
+            async with aiohttp.ClientSession() as session:
+                return await cnbc.locate_start_page(session, asyncio.Semaphore(4), cnbc.HEADERS_LIST, 'banjir', end_date)
+        return asyncio.run(run()), handler.listings
+    return locate
+
+def test_window_on_the_first_page(listing):
+    start, probed = listing(paged(hourly(50)), datetime(2024, 5, 21))
+    assert start == 1 and probed == [1]
+
+def test_window_between_pages(listing):
+    dates = hourly(200)
+    # The oldest item of page 7 is the first one not newer than the window end
+    start, probed = listing(paged(dates), dates[65])
+    assert start == 7
+    assert len(probed) < 7
+
+def test_window_on_a_page_boundary(listing):
+    dates = hourly(200)
+    start, _ = listing(paged(dates), dates[59])
+    assert start == 6
+
+def test_window_past_the_last_page(listing):
+    start, probed = listing(paged(hourly(50)), datetime(2024, 1, 1))
+    assert start is None
+    # Page 6 is the first empty one and bounds the search
+    assert 6 in probed and max(probed) == 8
+
+def test_no_results_at_all(listing):
+    start, probed = listing([], datetime(2024, 5, 21))
+    assert start is None and probed == [1]
+
+def test_undated_page_counts_as_reached(listing):
+    dates = paged(hourly(40))
+    dates[1] = [None] * 10
+    start, _ = listing(dates, dates[2][0] - timedelta(minutes=30))
+    # Starting early on page 2 rather than risking a skipped part of the window
+    assert start == 2
+
+def test_undated_item_falls_back_to_the_next_oldest(listing):
+    dates = paged(hourly(40))
+    dates[1][-1] = None
+    start, _ = listing(dates, dates[1][-2] + timedelta(minutes=30))
+    assert start == 2
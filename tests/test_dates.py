@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from dates import SITE_PATTERNS, parse_date
+
+MOMENT = datetime(2024, 6, 10, 14, 30)
+DAY = datetime(2024, 6, 10)
+
+# One string per site layout, as the listing or article pages print it
+SITE_SAMPLES = {
+    'cnbc': ('10 Juni 2024 14:30', MOMENT),
+    'detik': ('10 Jun 2024 14:30', MOMENT),
+    'jawapos': ('Senin, 10 Juni 2024 | 14:30 WIB', MOMENT),
+    'sindo': ('Senin, 10 Juni 2024 - 14:30 WIB', MOMENT),
+    'tempo': ('2024-06-10T14:30:00+07:00', MOMENT),
+    'kompas': ('10-06-2024', DAY),
+    'tribun': ('10-06-2024', DAY),
+}
+
+def test_every_site_layout_has_a_sample():
+    assert set(SITE_SAMPLES) == set(SITE_PATTERNS)
+
+@pytest.mark.parametrize('site', sorted(SITE_SAMPLES))
+def test_site_layouts(site):
+    text, expected = SITE_SAMPLES[site]
+    assert parse_date(text, site) == expected
+    # Without a site every layout is tried
+    assert parse_date(text) == expected
+
+def test_site_pattern_rejects_other_layouts():
+    assert parse_date('10 Juni 2024', 'cnbc') is None
+    assert parse_date('2024-06-10T14:30:00+07:00', 'kompas') is None
+
+@pytest.mark.parametrize('text,expected', [
+    ('5 Mei 2024 08:15', datetime(2024, 5, 5, 8, 15)),
+    ('5 May 2024 08:15', datetime(2024, 5, 5, 8, 15)),
+    ('17 Agustus 2024 10:00', datetime(2024, 8, 17, 10)),
+    ('17 August 2024 10:00', datetime(2024, 8, 17, 10)),
+    ('17 Agu 2024 10:00', datetime(2024, 8, 17, 10)),
+    ('17 Aug 2024 10:00', datetime(2024, 8, 17, 10)),
+    ('1 Okt 2024 07:05', datetime(2024, 10, 1, 7, 5)),
+    ('1 Oct 2024 07:05', datetime(2024, 10, 1, 7, 5)),
+    ('25 Desember 2023 23:59', datetime(2023, 12, 25, 23, 59)),
+    ('25 DECEMBER 2023 23:59', datetime(2023, 12, 25, 23, 59)),
+    ('3 Pebruari 2024 09:00', datetime(2024, 2, 3, 9)),
+    ('30 Nopember 2024 09:00', datetime(2024, 11, 30, 9)),
+])
+def test_indonesian_and_english_month_names(text, expected):
+    assert parse_date(text, 'cnbc') == expected
+
+@pytest.mark.parametrize('text,delta', [
+    ('5 menit yang lalu', timedelta(minutes=5)),
+    ('2 jam yang lalu', timedelta(hours=2)),
+    ('3 hari yang lalu', timedelta(days=3)),
+    ('1 minggu yang lalu', timedelta(weeks=1)),
+    ('40 detik yang lalu', timedelta(seconds=40)),
+    ('10 minutes ago', timedelta(minutes=10)),
+])
+def test_detik_relative_dates(text, delta):
+    before = datetime.now().replace(microsecond=0)
+    parsed = parse_date(text, 'detik')
+    after = datetime.now()
+    assert before - delta <= parsed <= after - delta
+
+def test_relative_dates_are_detik_only():
+    assert parse_date('5 menit yang lalu', 'cnbc') is None
+    assert parse_date('5 menit yang lalu') is not None
+
+@pytest.mark.parametrize('text', [
+    None, '', 'kemarin sore', '31 Februari 2024 10:00', '10 Juno 2024 14:30',
+    '2024-13-01', '5 tahun yang lalu', 'Senin, pukul 14:30 WIB',
+])
+def test_unparseable_input_gives_none(text):
+    assert parse_date(text) is None
+    assert parse_date(text, 'detik') is None
+
+def test_datetimes_pass_through():
+    assert parse_date(MOMENT, 'cnbc') is MOMENT
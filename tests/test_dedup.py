@@ -0,0 +1,65 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from dedup import NearDuplicateIndex
+
+BODY = ' '.join(f'kata{i}' for i in range(200))
+
+def test_copies_are_caught():
+    index = NearDuplicateIndex()
+    assert index.seen_title('a', 'Banjir Rendam Ratusan Rumah di Jakarta Timur') is None
+    assert index.seen_title('b', 'banjir rendam ratusan rumah di Jakarta Timur!') == 'a'
+    assert index.seen_content('a', BODY) is None
+    assert index.seen_content('b', BODY + ' Baca juga berita lainnya') == 'a'
+    assert index.seen_title('c', 'Harga Cabai Naik Jelang Lebaran') is None
+    assert (index.title_duplicates, index.content_duplicates) == (1, 1)
+
+def test_counts_are_exact_across_threads():
+    index = NearDuplicateIndex()
+    copies = 400
+
+    def one(i):
+        index.seen_title(f'title/{i}', 'Gempa Magnitudo 5 Guncang Garut Warga Berhamburan')
+        index.seen_content(f'body/{i}', BODY)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(one, range(copies)))
+    assert index.title_duplicates == copies - 1
+    assert index.content_duplicates == copies - 1
+
+def syndicated(n_stories, seed=20):
+    # One story in four is re-published by two other outlets with a site
+    # suffix on the title and ten words of the body swapped for a "read more"
+    # line; returns (key, title, body, key of the original or None) shuffled
+    rng = random.Random(seed)
+    vocab = [''.join(rng.choice('abcdefghijklmnoprstuwy') for _ in range(rng.randint(3, 9))) for _ in range(5000)]
+    outlets = ['CNBC Indonesia', 'detikNews', 'SINDOnews', 'Tempo.co']
+    articles = []
+    for i in range(n_stories):
+        title = ' '.join(rng.choice(vocab) for _ in range(9)).capitalize()
+        words = [rng.choice(vocab) for _ in range(300)]
+        articles.append((f'orig/{i}', title, ' '.join(words), None))
+        if i % 4 == 0:
+            for outlet in rng.sample(outlets, 2):
+                cut = rng.randrange(len(words) - 20)
+                variant = words[:cut] + words[cut + 10:] + ['Baca', 'juga', 'berita', 'lainnya', 'di', outlet]
+                articles.append((f'{outlet}/{i}', f"{title} - {outlet}", ' '.join(variant), f'orig/{i}'))
+    rng.shuffle(articles)
+    return articles
+
+def test_syndicated_copies_are_caught_without_false_positives():
+    index = NearDuplicateIndex()
+    articles = syndicated(600)
+    first_seen = set()
+    false_positive = missed = 0
+    for key, title, body, origin in articles:
+        story = origin or key
+        duplicate = index.seen_title(key, title) or index.seen_content(key, body)
+        if duplicate and story not in first_seen:
+            false_positive += 1
+        elif story in first_seen and not duplicate:
+            missed += 1
+        first_seen.add(story)
+    copies = len(articles) - 600
+    assert missed <= copies * 0.02
+    assert false_positive == 0
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import detik
+import load_test
+from mock_sites import MockSite
+from seen_store import SeenStore
+
+def test_seen_store_records_links_and_windows(tmp_path):
+    store = SeenStore('detik', 'banjir', directory=str(tmp_path))
+    assert store.latest() is None and len(store) == 0
+    store.add_many([('https://a.example/1', datetime(2024, 5, 1, 8)), ('https://a.example/2', datetime(2024, 5, 3, 9))])
+    store.add('https://a.example/3')
+    assert 'https://a.example/1' in store and 'https://a.example/4' not in store
+    assert len(store) == 3
+    # Undated links do not count for the newest date
+    assert store.latest() == datetime(2024, 5, 3, 9)
+
+    store.add_range(datetime(2024, 5, 1), datetime(2024, 5, 10))
+    assert store.covers(datetime(2024, 5, 2), datetime(2024, 5, 9))
+    assert store.covers(datetime(2024, 5, 1), datetime(2024, 5, 10))
+    assert not store.covers(datetime(2024, 4, 30), datetime(2024, 5, 9))
+    assert not store.covers(datetime(2024, 5, 2), datetime(2024, 5, 11))
+    store.close()
+
+    # Same file, other keyword: nothing carries over
+    other = SeenStore('detik', 'gempa', directory=str(tmp_path))
+    assert 'https://a.example/1' not in other and other.latest() is None
+    assert not other.covers(datetime(2024, 5, 2), datetime(2024, 5, 9))
+    other.close()
+
+def scrape(mock, seen):
+    end_date = (mock.anchor + timedelta(days=1)).strftime('%Y-%m-%d')
+    with load_test.pointed_at(detik, 'SEARCH_URL', mock.base):
+        return detik.scrape_detik('banjir', 'day', load_test.window_days(mock), end_date, seen)
+
+def test_incremental_run_stops_at_the_covered_part(fresh, tmp_path):
+    with MockSite('detik', results=30) as mock:
+        first = scrape(mock, None)
+        assert len(first) == 30
+        start_date, _ = detik.get_date_range('day', load_test.window_days(mock), (mock.anchor + timedelta(days=1)).strftime('%Y-%m-%d'))
+
+        # An earlier run stored articles 5 and older and crawled the window
+        # up to article 5 completely
+        seen = SeenStore('detik', 'banjir', directory=str(tmp_path))
+        older = first[5:]
+        seen.add_many((entry['link'], detik.parse_listing_date(entry['date'])) for entry in older)
+        seen.add_range(start_date, detik.parse_listing_date(older[0]['date']))
+        searches = sum(kind == 'search' for kind, _, _ in mock.log)
+        again = scrape(mock, seen)
+        assert [entry['link'] for entry in again] == [entry['link'] for entry in first[:5]]
+        # Stopped on the first listing page
+        assert sum(kind == 'search' for kind, _, _ in mock.log) - searches == 1
+
+        # Without the covered window the older pages are still read, but the
+        # known links are skipped
+        uncovered = SeenStore('detik', 'banjir-uncovered', directory=str(tmp_path))
+        uncovered.add_many((entry['link'], None) for entry in older)
+        searches = sum(kind == 'search' for kind, _, _ in mock.log)
+        again = scrape(mock, uncovered)
+        assert [entry['link'] for entry in again] == [entry['link'] for entry in first[:5]]
+        assert sum(kind == 'search' for kind, _, _ in mock.log) - searches > 1
+        seen.close()
+        uncovered.close()
+
+def test_failed_fetches_are_reported(fresh):
+    with MockSite('detik', results=3) as mock:
+        data = [{'headline': f'Banjir {i}', 'date': '', 'link': f'{mock.base}/read/{i}/banjir', 'content': None}
+                for i in range(4)]
+        failed = []
+        valid = detik.fetch_content_for_analysis(data, failed=failed)
+    # Article 3 is past the stand-in's results and answers 404
+    assert len(valid) == 3 and all(entry['content'] for entry in valid)
+    assert [entry['link'] for entry in failed] == [f'{mock.base}/read/3/banjir']
@@ -0,0 +1,80 @@
+import time
+
+from driver_pool import DriverPool, open_page, render_pages, wait_for_results
+
+DELAY = 0.1
+
+class FakeElement:
+    def __init__(self, href, text):
+        self.href = href
+        self.text = text
+
+    def get_attribute(self, name):
+        return self.href if name == 'href' else self.text
+
+class FakeDriver:
+    # Renders `pages` result pages after `delay` seconds; later pages are empty
+    def __init__(self, pages=7, per_page=10, delay=DELAY):
+        self.pages = pages
+        self.per_page = per_page
+        self.delay = delay
+        self.url = None
+        self.ready_at = 0
+        self.quit_called = False
+
+    def get(self, url):
+        self.url = url
+        self.ready_at = time.monotonic() + self.delay
+
+    def find_elements(self, by, selector):
+        if time.monotonic() < self.ready_at:
+            return []
+        page = int(self.url.rsplit('=', 1)[1])
+        if selector == '.gs-no-results-result':
+            return [FakeElement(None, '')] if page > self.pages else []
+        if page > self.pages:
+            return []
+        return [FakeElement(f'https://example.com/{page}/{i}', f'Title {page}-{i}') for i in range(self.per_page)]
+
+    @property
+    def page_source(self):
+        return ''
+
+    def quit(self):
+        self.quit_called = True
+
+def fake_render(driver, page):
+    open_page(driver, f'https://example.com/search?page={page}')
+    items = wait_for_results(driver, 'a.gs-title', ['.gs-no-results-result'], timeout=5)
+    return [item.get_attribute('href') for item in items] or None
+
+def crawl(size, pages=7):
+    pool = DriverPool(size, factory=lambda: FakeDriver(pages=pages))
+    start = time.perf_counter()
+    with pool:
+        results = list(render_pages(pool, fake_render))
+        drivers = list(pool.drivers)
+    return results, drivers, time.perf_counter() - start
+
+def test_pages_come_back_in_order_and_drivers_are_closed():
+    results, drivers, _ = crawl(3)
+    assert [page for page, _ in results] == list(range(1, 8))
+    assert results[0][1][0] == 'https://example.com/1/0'
+    assert len(drivers) <= 3 and all(driver.quit_called for driver in drivers)
+
+def test_pool_renders_pages_in_parallel():
+    _, _, sequential = crawl(1)
+    _, _, parallel = crawl(3)
+    assert parallel < sequential * 0.6
+
+def test_max_pages_and_first_page():
+    with DriverPool(2, factory=lambda: FakeDriver(pages=20)) as pool:
+        results = list(render_pages(pool, fake_render, max_pages=5, first_page=3))
+    assert [page for page, _ in results] == [3, 4, 5]
+
+def test_empty_notice_ends_the_wait_early():
+    driver = FakeDriver(pages=1, delay=0)
+    open_page(driver, 'https://example.com/search?page=2')
+    start = time.perf_counter()
+    assert wait_for_results(driver, 'a.gs-title', ['.gs-no-results-result'], timeout=5) == []
+    assert time.perf_counter() - start < 1
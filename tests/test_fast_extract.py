@@ -0,0 +1,94 @@
+import contextlib
+import glob
+import io
+import os
+
+import pytest
+
+import fast_extract
+import sindo
+import tempo
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(fast_extract.__file__)), 'fixtures')
+
+# (fixture prefix, pages as text, BeautifulSoup reference(page, parser), lxml path(page))
+CASES = {
+    'tempo_article': (True, lambda page, parser: tempo.extract_article_soup(page, 'fixture', parser),
+                      lambda page: tempo.extract_article(page, 'fixture')),
+    'sindo_listing': (False, sindo.parse_listing_soup, sindo.parse_listing),
+    'sindo_article': (False, sindo.extract_content_soup, sindo.extract_content),
+}
+# Pages where html.parser builds a different tree than libxml2 (and the
+# browsers); the difference is asserted in its own test below
+PARSER_DIFFERENCES = {'tempo_article_messy.html'}
+
+def pages(exclude=()):
+    # Every fixture named like a case, including saved real pages
+    params = []
+    for prefix, (as_text, _, _) in CASES.items():
+        for path in sorted(glob.glob(os.path.join(FIXTURES, prefix + '*.html'))):
+            if os.path.basename(path) in exclude:
+                continue
+            with open(path, 'rb') as f:
+                page = f.read()
+            params.append(pytest.param(prefix, page.decode('utf-8') if as_text else page, id=os.path.basename(path)))
+    return params
+
+def quiet(func, *args):
+    # The messy pages make the extractors print skipped items
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+@pytest.mark.parametrize('prefix,page', pages())
+def test_lxml_path_matches_beautifulsoup_on_the_same_tree(prefix, page):
+    _, soup, fast = CASES[prefix]
+    assert quiet(fast, page) == quiet(soup, page, 'lxml')
+
+@pytest.mark.parametrize('prefix,page', pages(exclude=PARSER_DIFFERENCES))
+def test_lxml_path_matches_html_parser(prefix, page):
+    _, soup, fast = CASES[prefix]
+    assert quiet(fast, page) == quiet(soup, page, 'html.parser')
+
+def test_accepted_html_parser_difference():
+    # tempo_article_messy.html leaves its <p>s open. html.parser nests each
+    # in the one before, so the reference repeats paragraph text; libxml2
+    # closes a <p> where the next one starts, as browsers do, and the text
+    # appears once. html.parser also drops the ';' of an unknown entity.
+    # Title, date and URL are the same either way.
+    with open(os.path.join(FIXTURES, 'tempo_article_messy.html'), encoding='utf-8') as f:
+        page = f.read()
+    reference = tempo.extract_article_soup(page, 'fixture', 'html.parser')
+    fast = tempo.extract_article(page, 'fixture')
+    sentence = 'Cuaca sakit sekolah cuaca saham guru harga'
+    assert reference['Content'].count(sentence) == 2
+    assert fast['Content'].count(sentence) == 1
+    assert '&unknownentity;' in fast['Content'] and '&unknownentity;' not in reference['Content']
+    # The first paragraph, before any nesting, is the same
+    assert reference['Content'].split(sentence)[0].strip() == fast['Content'].split(sentence)[0].strip()
+    assert {key: value for key, value in reference.items() if key != 'Content'} == \
+           {key: value for key, value in fast.items() if key != 'Content'}
+
+CP1252_BODY = b'<body><div class="read__content">Caf\xe9 \x93kopi\x94 \xa9 2024</div></body></html>'
+
+@pytest.mark.parametrize('head,content_type', [
+    (b'<meta charset="windows-1252">', None),
+    (b'<meta http-equiv="Content-Type" content="text/html; charset=cp1252">', None),
+    # The header wins over the page
+    (b'<meta charset="utf-8">', 'text/html; charset=windows-1252'),
+    (b'', 'text/html; charset="cp1252"'),
+])
+def test_declared_charset_is_honoured(head, content_type):
+    page = b'<html><head>' + head + b'</head>' + CP1252_BODY
+    assert fast_extract.decode(page, content_type) == page.decode('cp1252')
+    assert fast_extract.text(fast_extract.parse(page, content_type)).endswith('Café “kopi” © 2024')
+
+def test_declared_latin1_is_not_read_as_utf8():
+    # Valid UTF-8 bytes, but the page says Latin-1
+    page = '<meta charset="iso-8859-1"><div class="read__content">Ã©</div>'.encode('utf-8')
+    assert fast_extract.sindo_content(page) == 'Ã\x83Â©'
+
+def test_undeclared_pages_fall_back_to_utf8_then_cp1252():
+    assert fast_extract.decode('Café “kopi”'.encode('utf-8')) == 'Café “kopi”'
+    assert fast_extract.decode('Café “kopi”'.encode('cp1252')) == 'Café “kopi”'
+    # An unknown charset name is ignored
+    assert fast_extract.decode('<meta charset="x-nonsense">Café'.encode('utf-8')) == '<meta charset="x-nonsense">Café'
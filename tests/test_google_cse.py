@@ -0,0 +1,82 @@
+import json
+import os
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import google_cse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(google_cse.__file__)), 'fixtures')
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    # Answers cse.js and /cse/element/v1 from a payload file; the fixtures
+    # are synthetic, built in the element API's layout, not captured
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    payload_file = None
+    token = 'replay-token'
+    requests_seen = 0
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == '/cse.js':
+            body = f'(function(){{var cfg = {{"cse_token": "{self.token}", "cselibVersion": "replay"}};}})();'
+            return self._send(200, body, 'text/javascript')
+        if url.path != '/cse/element/v1':
+            return self._send(404, 'not found', 'text/plain')
+        type(self).requests_seen += 1
+        if query.get('cse_tok') != self.token or query.get('cx') != self.payload_file['cx']:
+            return self._send(403, 'forbidden', 'text/plain')
+        payloads = self.payload_file['payloads']
+        index = int(query.get('start', 0)) // google_cse.RESULTS_PER_PAGE
+        payload = payloads[index] if index < len(payloads) else {'cursor': payloads[-1].get('cursor', {})}
+        body = f"/*O_o*/\n{query.get('callback', 'cb')}({json.dumps(payload, ensure_ascii=False)});"
+        self._send(200, body, 'application/javascript; charset=utf-8')
+
+    def _send(self, status, body, content_type):
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture(params=['cse_tribun.json', 'cse_kompas.json'])
+def replay(request, serve):
+    with open(os.path.join(FIXTURES, request.param), encoding='utf-8') as f:
+        payload_file = json.load(f)
+    handler = type('Handler', (ReplayHandler,), {'payload_file': payload_file, 'requests_seen': 0})
+    return payload_file, serve(handler)
+
+def test_pages_match_the_payload_file(replay):
+    payload_file, base = replay
+    expected = [google_cse.result_items(payload) for payload in payload_file['payloads']]
+    pages = list(google_cse.iter_pages(payload_file['cx'], payload_file['keyword'], base=base))
+    assert [items for _, items in pages] == expected
+    assert [page for page, _ in pages] == list(range(1, len(expected) + 1))
+
+def test_max_pages(replay):
+    payload_file, base = replay
+    assert len(list(google_cse.iter_pages(payload_file['cx'], payload_file['keyword'], max_pages=1, base=base))) == 1
+
+def test_stale_token_is_refreshed_once(replay):
+    payload_file, base = replay
+    expected = google_cse.result_items(payload_file['payloads'][0])
+    google_cse._tokens[(payload_file['cx'], base)] = ('expired', '')
+    pages = list(google_cse.iter_pages(payload_file['cx'], payload_file['keyword'], max_pages=1, base=base))
+    assert pages[0][1] == expected
+
+def test_dead_api_hands_pages_to_the_fallback(replay):
+    payload_file, base = replay
+    fallback = lambda first: iter([(first, [('fallback', 'page')])])
+    pages = list(google_cse.iter_pages('unknown-cx', payload_file['keyword'], fallback=fallback, base=base))
+    assert pages == [(1, [('fallback', 'page')])]
+
+def test_parse_payload_strips_the_jsonp_wrapper():
+    payload = google_cse.parse_payload('/*O_o*/\ngoogle.search.cse.api1234({"results": []});')
+    assert payload == {'results': []}
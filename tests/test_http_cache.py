@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import aiohttp
+
+from http_cache import HttpCache, fetch_text, fetch_text_async
+
+class ValidatingHandler(BaseHTTPRequestHandler):
+    # Every page carries an ETag and a Last-Modified; a request sending the
+    # ETag back gets 304. `requests` keeps (path, If-None-Match,
+    # If-Modified-Since, status) per request.
+    protocol_version = 'HTTP/1.1'
+    etag = '"v1"'
+    last_modified = 'Mon, 20 May 2024 05:00:00 GMT'
+    requests = None
+    lock = None
+
+    def do_GET(self):
+        not_modified = self.headers.get('If-None-Match') == self.etag
+        with self.lock:
+            self.requests.append((self.path, self.headers.get('If-None-Match'),
+                                  self.headers.get('If-Modified-Since'), 304 if not_modified else 200))
+        body = b'' if not_modified else f'<html><body>{self.path} Jakarta – banjir</body></html>'.encode('utf-8')
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Last-Modified', self.last_modified)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start(serve):
+    handler = type('Handler', (ValidatingHandler,), {'requests': [], 'lock': threading.Lock()})
+    return serve(handler), handler.requests
+
+def test_stale_entry_is_revalidated(serve, tmp_path):
+    base, requests = start(serve)
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), fresh_seconds=0)
+    first = fetch_text(f'{base}/read/1', cache=cache)
+    second = fetch_text(f'{base}/read/1', cache=cache)
+    assert second == first and 'Jakarta – banjir' in first
+    # The second request sends both validators and the 304 serves the cached body
+    assert requests == [
+        ('/read/1', None, None, 200),
+        ('/read/1', '"v1"', 'Mon, 20 May 2024 05:00:00 GMT', 304),
+    ]
+    assert (cache.misses, cache.revalidated, cache.hits) == (1, 1, 0)
+    cache.close()
+
+def test_fresh_entry_skips_the_network(serve, tmp_path):
+    base, requests = start(serve)
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    first = fetch_text(f'{base}/read/1', cache=cache)
+    assert fetch_text(f'{base}/read/1', cache=cache) == first
+    assert len(requests) == 1
+    assert (cache.misses, cache.revalidated, cache.hits) == (1, 0, 1)
+    assert cache.bytes_saved == len(first.encode('utf-8'))
+    cache.close()
+
+def test_async_fetch_revalidates_too(serve, tmp_path):
+    base, requests = start(serve)
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), fresh_seconds=0)
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return [await fetch_text_async(session, f'{base}/read/2', cache=cache) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert [status for *_, status in requests] == [200, 304]
+    assert requests[1][1] == '"v1"'
+    cache.close()
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    body = 'x' * 100
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), max_bytes=350)
+    for name in 'abc':
+        cache.store(name, body)
+        time.sleep(0.01)
+    # Reading a makes b the least recently used
+    cache.hit('a', cache.lookup('a'))
+    time.sleep(0.01)
+    cache.store('d', body)
+    assert [cache.lookup(name) is not None for name in 'abcd'] == [True, False, True, True]
+    assert cache.total_bytes == 300
+
+    # A body over the bound is not kept, and replaces no one
+    cache.store('e', 'y' * 400)
+    assert cache.lookup('e') is None and cache.total_bytes == 300
+    cache.close()
+
+    # The size bound survives a restart
+    reopened = HttpCache(str(tmp_path / 'cache.sqlite'), max_bytes=350)
+    assert reopened.total_bytes == 300
+    reopened.close()
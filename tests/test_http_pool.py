@@ -0,0 +1,118 @@
+import os
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import http_pool
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = b'<html><body><div class="read__content"><p>' + b'lorem ipsum ' * 400 + b'</p></div></body></html>'
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            type(self).connections += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    http_pool.close()
+    sizes = dict(http_pool.pool_sizes)
+    yield
+    http_pool.close()
+    http_pool.pool_sizes.clear()
+    http_pool.pool_sizes.update(sizes)
+
+@pytest.fixture
+def articles(serve):
+    handler = type('Handler', (ArticleHandler,), {'connections': 0, 'lock': threading.Lock()})
+    return handler, serve(handler)
+
+def test_requests_share_one_connection(articles):
+    handler, base = articles
+    for i in range(20):
+        http_pool.get(f'{base}/read/{i}').raise_for_status()
+    assert handler.connections == 1
+
+def test_http_and_https_share_the_host_adapter(articles):
+    _, base = articles
+    http_pool.get(f'{base}/read/1')
+    session = http_pool.get_session()
+    host = base.split('//')[1]
+    adapter = http_pool._mounted[host]
+    assert session.get_adapter(f'http://{host}/x') is adapter
+    assert session.get_adapter(f'https://{host}/x') is adapter
+    assert adapter._pool_maxsize == http_pool.DEFAULT_POOL_SIZE
+
+def test_resizing_replaces_the_adapter(articles):
+    _, base = articles
+    http_pool.get(f'{base}/read/1')
+    host = base.split('//')[1]
+    old = http_pool._mounted[host]
+
+    http_pool.size_pools([f'{base}/read/2'], http_pool.DEFAULT_POOL_SIZE)
+    assert http_pool._mounted[host] is old
+
+    http_pool.size_pools([f'{base}/read/2', f'{base}/read/3'], 32)
+    assert host not in http_pool._mounted
+    assert not old.poolmanager.pools
+    http_pool.get(f'{base}/read/2')
+    assert http_pool._mounted[host]._pool_maxsize == 32
+
+def self_signed_cert(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-keyout', key, '-out', cert, '-subj', '/CN=localhost',
+        '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+    ], check=True, capture_output=True)
+    return cert, key
+
+@pytest.mark.skipif(shutil.which('openssl') is None, reason='needs openssl for a test certificate')
+def test_pooled_session_saves_handshakes(tmp_path):
+    cert, key = self_signed_cert(str(tmp_path))
+    handler = type('Handler', (ArticleHandler,), {'connections': 0, 'lock': threading.Lock()})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'https://localhost:{server.server_address[1]}/read/'
+    n_articles = 20
+    try:
+        start = time.perf_counter()
+        for i in range(n_articles):
+            requests.get(f'{base}{i}', verify=cert).raise_for_status()
+        unpooled = time.perf_counter() - start
+        handler.connections = 0
+
+        start = time.perf_counter()
+        for i in range(n_articles):
+            http_pool.get(f'{base}{i}', verify=cert).raise_for_status()
+        pooled = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert handler.connections == 1
+    assert pooled < unpooled
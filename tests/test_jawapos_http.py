@@ -0,0 +1,73 @@
+from http.server import BaseHTTPRequestHandler
+
+import jawapos_http
+import load_test
+
+class ScriptOnlyHandler(BaseHTTPRequestHandler):
+    # Search page whose results are only put in by JavaScript
+    def do_GET(self):
+        body = b'<html><body><div id="app"></div><script src="/app.js"></script></body></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_browser_takes_over_when_the_static_markup_is_missing(fresh, serve):
+    rendered = []
+
+    def fallback(page):
+        rendered.append(page)
+        if page > 2:
+            return []
+        return [{'title': f'Banjir {page}', 'link': f'https://www.jawapos.com/{page}', 'date': None}]
+
+    base = serve(ScriptOnlyHandler)
+    with load_test.pointed_at(jawapos_http, 'SEARCH_URL', base):
+        pages = list(jawapos_http.iter_pages('banjir', fallback=fallback, workers=3))
+    assert [page for page, _ in pages] == [1, 2]
+    assert pages[1][1][0]['title'] == 'Banjir 2'
+    # Once the browser has taken over, later pages are not fetched statically first
+    assert rendered == [1, 2, 3]
+
+class FakeElement:
+    def __init__(self, text, href=None, children=None):
+        self.text = text
+        self.href = href
+        self.children = children or {}
+
+    def find_element(self, by, selector):
+        return self.children[selector][0]
+
+    def find_elements(self, by, selector):
+        return self.children.get(selector, [])
+
+    def get_attribute(self, name):
+        return self.href if name == 'href' else self.text
+
+class FakeDriver:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def find_elements(self, by, selector):
+        if selector != '.latest__item':
+            return []
+        link = FakeElement('Banjir Rendam Jakarta', 'https://www.jawapos.com/1')
+        date = FakeElement('Senin, 10 Juni 2024 | 14:30 WIB')
+        broken = FakeElement('Iklan', children={'h2.latest__title > a': []})
+        return [FakeElement('Banjir Rendam Jakarta Senin, 10 Juni 2024 | 14:30 WIB',
+                            children={'h2.latest__title > a': [link], '.latest__date': [date]}), broken]
+
+def test_render_page_reads_the_same_fields():
+    driver = FakeDriver()
+    items = jawapos_http.render_page(driver, 'banjir', 2)
+    assert driver.urls[-1] == jawapos_http.search_url('banjir', 2)
+    assert items == [{'title': 'Banjir Rendam Jakarta', 'link': 'https://www.jawapos.com/1',
+                      'date': 'Senin, 10 Juni 2024 | 14:30 WIB',
+                      'text_content': 'Banjir Rendam Jakarta Senin, 10 Juni 2024 | 14:30 WIB'}]
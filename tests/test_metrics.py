@@ -0,0 +1,56 @@
+import json
+
+from metrics import Metrics, timed
+
+def test_trace_is_flushed_and_closed(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    metrics = Metrics(str(path))
+    metrics.request('https://news.detik.com/berita/1', 200, 0.05, 1000)
+    metrics.drop('detik', 'no_content', 'https://news.detik.com/berita/2')
+    trace_file = metrics.trace_file
+    metrics.close()
+
+    assert trace_file.closed and metrics.trace_file is None
+    events = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [event['event'] for event in events] == ['request', 'drop']
+    # Later events are dropped rather than written to a closed file
+    metrics.drop('detik', 'no_content')
+    metrics.close()
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 2
+
+def test_timed_counts_each_call(monkeypatch):
+    import metrics as module
+    monkeypatch.setattr(module, '_metrics', Metrics())
+
+    @timed('parse', 'cnbc')
+    def parse(html):
+        return html.upper()
+
+    assert parse('a') == 'A' and parse('b') == 'B'
+    stages = [h for h in module.get_metrics().to_json()['histograms'] if h['name'] == 'stage_seconds']
+    assert stages[0]['labels'] == {'site': 'cnbc', 'stage': 'parse'} and stages[0]['count'] == 2
+
+def test_prometheus_exposition():
+    metrics = Metrics()
+    for i in range(20):
+        metrics.request('https://www.cnbcindonesia.com/news/1', 200 if i % 10 else 429, 0.02 * (i % 7 + 1), 40000)
+        with metrics.stage('parse', 'cnbc'):
+            pass
+    metrics.drop('cnbc', 'no_date_div')
+    metrics.gauge('queue_depth', 3, queue='jawapos_titles')
+    lines = metrics.to_prometheus().splitlines()
+    metrics.close()
+
+    host = 'host="www.cnbcindonesia.com"'
+    assert '# TYPE scapper_http_requests_total counter' in lines
+    assert f'scapper_http_requests_total{{{host},status="200"}} 18' in lines
+    assert f'scapper_http_requests_total{{{host},status="429"}} 2' in lines
+    assert f'scapper_http_response_bytes_total{{{host}}} 800000' in lines
+    assert 'scapper_dropped_total{reason="no_date_div",site="cnbc"} 1' in lines
+    assert 'scapper_queue_depth{queue="jawapos_titles"} 3' in lines
+    # Buckets are cumulative and end in +Inf with the count
+    buckets = [int(line.rsplit(' ', 1)[1]) for line in lines if line.startswith('scapper_http_request_seconds_bucket')]
+    assert buckets == sorted(buckets) and buckets[-1] == 20
+    assert f'scapper_http_request_seconds_bucket{{{host},le="0.05"}} 6' in lines
+    assert f'scapper_http_request_seconds_count{{{host}}} 20' in lines
+    assert 'scapper_stage_seconds_count{site="cnbc",stage="parse"} 20' in lines
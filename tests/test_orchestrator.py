@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import load_test
+import request_budget
+from mock_sites import MockSite
+from orchestrator import DetikSource, JawaposSource, Query, Source, TempoSource, crawl, record
+
+class SleepySource(Source):
+    def __init__(self, name, seconds, is_async, fail=False):
+        self.name = name
+        self.seconds = seconds
+        self.is_async = is_async
+        self.fail = fail
+        self.concurrency = None
+
+    def collect(self, query, concurrency, emit):
+        # Emits one record, then the rest after `seconds`
+        self.concurrency = concurrency
+        if self.is_async:
+            return self._collect_async(emit)
+        emit(self._first())
+        time.sleep(self.seconds)
+        self._rest(emit)
+
+    async def _collect_async(self, emit):
+        emit(self._first())
+        await asyncio.sleep(self.seconds)
+        self._rest(emit)
+
+    def _first(self):
+        return record(self.name, f'{self.name} 0', f'https://{self.name}.example/0', '2024-01-01')
+
+    def _rest(self, emit):
+        if self.fail:
+            raise RuntimeError("site unreachable")
+        for i in range(1, 3):
+            emit(record(self.name, f'{self.name} {i}', f'https://{self.name}.example/{i}', '2024-01-01'))
+        emit(record(self.name, 'shared', 'https://shared.example/1', None))
+
+class BusySource(Source):
+    # Makes `requests` blocking requests through the shared budget,
+    # `concurrency` at a time
+    def __init__(self, name, requests):
+        self.name = name
+        self.requests = requests
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def collect(self, query, concurrency, emit):
+        def one(i):
+            with request_budget.slot():
+                with self.lock:
+                    self.running += 1
+                    self.peak = max(self.peak, self.running)
+                time.sleep(0.02)
+                with self.lock:
+                    self.running -= 1
+            emit(record(self.name, str(i), f'https://{self.name}.example/{i}', None))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(self.requests)))
+
+def test_sources_run_at_once_and_failures_are_isolated():
+    sources = [SleepySource('slow', 0.6, False), SleepySource('medium', 0.4, True),
+               SleepySource('fast', 0.2, False), SleepySource('broken', 0.1, True, fail=True)]
+    records = []
+    start = time.perf_counter()
+    summary = asyncio.run(crawl(Query('banjir'), sources, records.append, budget=8))
+    wall = time.perf_counter() - start
+
+    # One after another would take 1.3s
+    assert wall < 0.9
+    # The shared link is kept once; the failed source keeps what it emitted first
+    assert len(records) == 11 and len({r['link'] for r in records}) == 11
+    assert summary['broken'][0] == 1 and summary['broken'][2] is not None and summary['slow'][0] == 3
+    assert all(source.concurrency == 8 for source in sources)
+
+def test_records_arrive_before_their_source_finishes():
+    source = SleepySource('slow', 0.5, False)
+    arrived = []
+    start = time.perf_counter()
+    asyncio.run(crawl(Query('banjir'), [source], lambda item: arrived.append(time.perf_counter() - start)))
+    assert arrived[0] < 0.3 and arrived[-1] >= 0.5
+
+def test_sources_share_one_budget(monkeypatch):
+    budgets = []
+    shared = request_budget.shared
+
+    @contextlib.contextmanager
+    def recording(size):
+        with shared(size) as budget:
+            budgets.append(budget)
+            yield budget
+
+    monkeypatch.setattr(request_budget, 'shared', recording)
+    busy, light = BusySource('busy', 40), BusySource('light', 4)
+    sources = [busy, light, SleepySource('idle', 0.2, True), SleepySource('idle2', 0.2, False)]
+    asyncio.run(crawl(Query('banjir'), sources, lambda item: None, budget=8))
+    # An equal split would have held the busy source to 2 requests at a time
+    assert busy.peak > 2
+    assert budgets[0].peak == 8
+    assert request_budget._budget is None
+
+def peak_calls(monkeypatch, module, name):
+    # Wraps module.name and records the most calls running at once
+    original = getattr(module, name)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def enter():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+
+    def leave():
+        with lock:
+            state['running'] -= 1
+
+    if asyncio.iscoroutinefunction(original):
+        async def wrapper(*args, **kwargs):
+            enter()
+            try:
+                await asyncio.sleep(0.01)
+                return await original(*args, **kwargs)
+            finally:
+                leave()
+    else:
+        def wrapper(*args, **kwargs):
+            enter()
+            try:
+                time.sleep(0.01)
+                return original(*args, **kwargs)
+            finally:
+                leave()
+    monkeypatch.setattr(module, name, wrapper)
+    return state
+
+def test_tempo_stays_within_its_share(fresh, monkeypatch):
+    import tempo
+    calls = peak_calls(monkeypatch, tempo, 'fetch')
+    with MockSite('tempo', results=30) as mock, load_test.pointed_at(tempo, 'SEARCH_URL', mock.base):
+        records = []
+        asyncio.run(TempoSource().collect(Query('banjir', max_pages=3), 2, records.append))
+    assert len(records) == 30
+    assert calls['peak'] == 2
+
+def test_detik_stays_within_its_share(fresh, monkeypatch):
+    import detik
+    calls = peak_calls(monkeypatch, detik, 'fetch_article_content')
+    with MockSite('detik', results=20) as mock, load_test.pointed_at(detik, 'SEARCH_URL', mock.base):
+        query = Query('banjir', days=load_test.window_days(mock), full=True, end_date=mock.anchor + timedelta(days=1))
+        records = []
+        DetikSource().collect(query, 3, records.append)
+    assert len(records) == 20 and all(item['content'] for item in records)
+    assert calls['peak'] == 3
+
+def test_jawapos_records_are_dated_and_within_share(fresh, monkeypatch):
+    import jawapos_http
+    calls = peak_calls(monkeypatch, jawapos_http, 'fetch_items')
+    with MockSite('jawapos', results=45) as mock, load_test.pointed_at(jawapos_http, 'SEARCH_URL', mock.base):
+        records = []
+        JawaposSource().collect(Query('banjir', max_pages=None), 2, records.append)
+        expected = [(mock.anchor - timedelta(minutes=mock.handler.spacing * i)).strftime('%Y-%m-%d') for i in range(45)]
+    assert [item['date'] for item in records] == expected
+    assert calls['peak'] <= 2
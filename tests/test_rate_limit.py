@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+
+import aiohttp
+import pytest
+
+from rate_limit import HostLimiter, RateLimiter, limited_get, retry_after_seconds
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    # Admits `allowed` requests per second, answers the rest with 429 +
+    # Retry-After and slows down as requests pile up
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    allowed = 10.0
+    lock = threading.Lock()
+    tokens = 0.0
+    updated = 0.0
+    in_flight = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            now = time.monotonic()
+            cls.tokens = min(cls.allowed, cls.tokens + (now - cls.updated) * cls.allowed)
+            cls.updated = now
+            admitted = cls.tokens >= 1
+            if admitted:
+                cls.tokens -= 1
+            cls.in_flight += 1
+            load = cls.in_flight
+        try:
+            time.sleep(0.01 * load)
+            if admitted:
+                self._send(200, b'ok')
+            else:
+                self._send(429, b'slow down', {'Retry-After': '1'})
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+async def drive(base, n_requests, limiter, concurrency=8):
+    counts = {'ok': 0, 'throttled': 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            url = f'{base}/article/{i}'
+            if limiter is None:
+                async with session.get(url) as response:
+                    status = response.status
+            else:
+                async with limited_get(session, url, limiter) as response:
+                    status = response.status
+            counts['ok' if status == 200 else 'throttled'] += 1
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*[one(i) for i in range(n_requests)])
+    return counts
+
+@pytest.mark.parametrize('value, expected', [(None, None), ('', None), ('2', 2.0), ('-3', 0.0), ('soon', None)])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+def test_retry_after_http_date():
+    assert 3 < retry_after_seconds(formatdate(time.time() + 5, usegmt=True)) <= 5
+
+def test_throttling_halves_the_rate_once_per_cooldown():
+    host = HostLimiter(rate=8.0, cooldown=60)
+    host.observe(429, 0.1)
+    host.observe(429, 0.1)
+    assert host.rate == 4.0 and host.throttled == 2
+
+def test_clean_responses_raise_the_rate():
+    host = HostLimiter(rate=4.0)
+    for _ in range(10):
+        host.observe(200, 0.1)
+    assert host.rate > 4.0
+
+def test_retry_after_blocks_the_host():
+    host = HostLimiter(rate=100.0)
+    host.observe(429, 0.1, retry_after='2')
+    assert 1.5 < host.reserve() <= 2
+
+def test_hosts_are_paced_separately():
+    limiter = RateLimiter(rate=1.0)
+    assert limiter.host('http://a.example/1') is limiter.host('http://a.example/2')
+    assert limiter.host('http://a.example/1') is not limiter.host('http://b.example/1')
+
+def test_limiter_avoids_most_throttling(serve):
+    allowed, n_requests = 40.0, 80
+    handler = type('Handler', (ThrottlingHandler,), {'allowed': allowed, 'lock': threading.Lock()})
+    base = serve(handler)
+
+    handler.tokens, handler.updated = 0.0, time.monotonic()
+    unpaced = asyncio.run(drive(base, n_requests, None))
+    time.sleep(1)
+    handler.tokens, handler.updated = 0.0, time.monotonic()
+    limiter = RateLimiter(rate=10.0)
+    paced = asyncio.run(drive(base, n_requests, limiter))
+
+    assert unpaced['ok'] + unpaced['throttled'] == paced['ok'] + paced['throttled'] == n_requests
+    assert paced['throttled'] < unpaced['throttled']
+    assert limiter.hosts[base.split('//')[1]].throttled == paced['throttled']
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import request_budget
+from request_budget import RequestBudget
+
+def test_threads_and_coroutines_share_the_cap():
+    budget = RequestBudget(3)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def enter():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+
+    def leave():
+        with lock:
+            state['running'] -= 1
+
+    def blocking():
+        budget.acquire()
+        try:
+            enter()
+            time.sleep(0.01)
+            leave()
+        finally:
+            budget.release()
+
+    async def coroutine():
+        await budget.acquire_async()
+        try:
+            enter()
+            await asyncio.sleep(0.01)
+            leave()
+        finally:
+            budget.release()
+
+    async def both():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            await asyncio.gather(*[loop.run_in_executor(executor, blocking) for _ in range(20)],
+                                 *[coroutine() for _ in range(20)])
+
+    asyncio.run(both())
+    assert state['peak'] == budget.peak == 3
+    assert budget.free == 3 and not budget.waiters
+
+def test_cancelled_waiter_gives_its_slot_back():
+    budget = RequestBudget(1)
+
+    async def main():
+        budget.acquire()
+        waiter = asyncio.ensure_future(budget.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        budget.release()
+
+    asyncio.run(main())
+    assert budget.free == 1 and not budget.waiters
+
+def test_slot_is_free_outside_a_crawl():
+    assert request_budget._budget is None
+    with request_budget.slot():
+        pass
+    with request_budget.shared(2) as budget:
+        with request_budget.slot():
+            assert budget.free == 1
+    assert request_budget._budget is None
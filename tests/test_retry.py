@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+import aiohttp
+import pytest
+
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    # /flaky/<id> fails twice with 503 and then succeeds; /down/<id> always
+    # answers 503
+    protocol_version = 'HTTP/1.1'
+    seen = None
+    lock = None
+
+    def do_GET(self):
+        key = self.path
+        with self.lock:
+            self.seen[key] += 1
+            count = self.seen[key]
+        ok = self.path.startswith('/flaky/') and count > 2
+        body = b'ok' if ok else b'unavailable'
+        self.send_response(200 if ok else 503)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+async def get(session, url):
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.text()
+
+async def exercise(flaky_base, down_base, policy):
+    async with aiohttp.ClientSession() as session:
+        async def fetch(url):
+            try:
+                return await policy.run(url, lambda: get(session, url))
+            except Exception as e:
+                return type(e).__name__
+
+        # One at a time: two failures in a row stay under the threshold
+        flaky = [await fetch(f'{flaky_base}/flaky/{i}') for i in range(5)]
+        first_down = await fetch(f'{down_base}/down/0')
+        later_down = await asyncio.gather(*[fetch(f'{down_base}/down/{i}') for i in range(1, 6)])
+        await asyncio.sleep(policy.reset_timeout)
+        trial = await fetch(f'{down_base}/down/6')
+    return flaky, first_down, later_down, trial
+
+def test_retries_recover_and_breaker_trips(serve):
+    handler = type('Handler', (FlakyHandler,), {'seen': Counter(), 'lock': threading.Lock()})
+    base = serve(handler)
+    port = base.rsplit(':', 1)[1]
+    # Two host names for one server, so each gets its own breaker
+    policy = RetryPolicy(base_delay=0.05, max_delay=0.2, failure_threshold=3, reset_timeout=0.5)
+    flaky, first_down, later_down, trial = asyncio.run(
+        exercise(f'http://127.0.0.1:{port}', f'http://localhost:{port}', policy))
+
+    assert flaky == ['ok'] * 5
+    assert first_down == 'ClientResponseError'
+    assert later_down == ['CircuitOpenError'] * 5
+    # The half-open trial fails and re-opens the breaker
+    assert trial == 'ClientResponseError'
+    assert policy.breaker(f'http://localhost:{port}/').state == CircuitBreaker.OPEN
+    assert policy.metrics['rejected'] == 5
+
+def test_client_errors_are_not_retried():
+    policy = RetryPolicy(base_delay=0)
+    calls = []
+
+    async def not_found():
+        calls.append(1)
+        raise aiohttp.ClientResponseError(None, (), status=404)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(policy.run('http://example.com/a', not_found))
+    assert len(calls) == 1
+    assert policy.breaker('http://example.com/').state == CircuitBreaker.CLOSED
+
+def test_is_retryable():
+    assert is_retryable(aiohttp.ClientResponseError(None, (), status=503))
+    assert not is_retryable(aiohttp.ClientResponseError(None, (), status=404))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(CircuitOpenError())
+
+def test_thread_callers_retry_with_requests(serve):
+    import requests
+    handler = type('Handler', (FlakyHandler,), {'seen': Counter(), 'lock': threading.Lock()})
+    base = serve(handler)
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.05, failure_threshold=10)
+
+    def get_text(url):
+        response = requests.get(url)
+        response.raise_for_status()
+        return response.text
+
+    assert policy.call(f'{base}/flaky/0', lambda: get_text(f'{base}/flaky/0')) == 'ok'
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(f'{base}/down/0', lambda: get_text(f'{base}/down/0'))
+    assert policy.metrics['retries'] == 2 + 3 and policy.metrics['gave_up'] == 1
+    assert is_retryable(requests.exceptions.ConnectionError())
+
+def test_counts_are_exact_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    policy = RetryPolicy(base_delay=0)
+
+    def ok():
+        return 'ok'
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda i: policy.call(f'http://example.com/{i}', ok), range(2000)))
+    assert results == ['ok'] * 2000
+    assert policy.metrics['attempts'] == 2000
@@ -0,0 +1,29 @@
+import random
+
+import sentiment_pool
+
+VOCAB = ("good bad great terrible happy sad growth loss strong weak win fail "
+         "the a of and to in on for with market price people government said").split()
+
+def articles(n, seed=0):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(VOCAB) for _ in range(rng.randint(5, 60))) + '.' for _ in range(n)]
+
+def test_scores_keep_input_order_across_windows(monkeypatch):
+    texts = articles(50)
+    # Windows of 7 split the stream unevenly, with a short last window
+    monkeypatch.setattr(sentiment_pool, 'WINDOW', 7)
+    reference = list(sentiment_pool.compound_scores(texts, 1))
+    assert len(set(reference)) > 10
+    assert list(sentiment_pool.compound_scores(iter(texts), 3)) == reference
+
+def test_worker_count_does_not_change_scores():
+    texts = articles(40, seed=1)
+    reference = list(sentiment_pool.compound_scores(texts, 1))
+    for workers in (2, 4):
+        assert list(sentiment_pool.compound_scores(texts, workers)) == reference
+
+def test_category_thresholds():
+    labels = ('pos', 'neg', 'neu')
+    assert [sentiment_pool.category(score, labels) for score in (0.05, 0.049, -0.049, -0.05)] == ['pos', 'neu', 'neu', 'neg']
+    assert sentiment_pool.category(0.9) == 'Positive'
@@ -0,0 +1,36 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import load_test
+import sindo
+from mock_sites import MockSite
+
+def test_speculative_pages_after_the_last_are_cancelled(fresh, monkeypatch):
+    # One listing worker, so pages queued ahead in the window are still
+    # waiting when the empty page comes back
+    pools = []
+
+    def executor(max_workers):
+        pools.append(ThreadPoolExecutor(max_workers=1 if not pools else max_workers))
+        return pools[-1]
+
+    lock = threading.Lock()
+    offsets = []
+    get_html = sindo.get_html
+
+    def recording(url):
+        parts = urlsplit(url)
+        if parts.path == '/go':
+            with lock:
+                offsets.append(int(parse_qs(parts.query).get('t', ['0'])[0]))
+        return get_html(url)
+
+    monkeypatch.setattr(sindo, 'ThreadPoolExecutor', executor)
+    monkeypatch.setattr(sindo, 'get_html', recording)
+    # 40 results fill pages 1 and 2; page 3 is the first empty one
+    with MockSite('sindo', results=40) as mock, load_test.pointed_at(sindo, 'BASE_URL', mock.base):
+        articles = sindo.scrape_sindonews_parallel('banjir', window=4, workers=4)
+    assert len(articles) == 40
+    # Pages 5 and 6 entered the window after pages 1 and 2 and were never fetched
+    assert {0, 20, 40} <= set(offsets) <= {0, 20, 40, 60}
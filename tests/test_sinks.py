@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from sinks import JsonLinesWriter, jsonl_to_json
+
+RECORDS = [
+    {'title': 'Banjir rendam Jakarta – warga mengungsi', 'link': 'https://news.example/1', 'score': 0.5,
+     'tags': ['banjir', 'cuaca'], 'meta': {'kanal': 'Metro', 'views': None}},
+    {'title': 'Café « Ümlaut » 東京 😀', 'link': 'https://news.example/2', 'score': -1, 'tags': [], 'meta': {}},
+    {'title': 'Tanda kutip "ganda" dan \\ garis miring\nbaris baru', 'link': 'https://news.example/3',
+     'score': 1e-07, 'tags': [{'nested': [1, 2]}], 'meta': {'a': {'b': {}}}},
+]
+
+@pytest.mark.parametrize('records', [RECORDS, RECORDS[:1], []], ids=['several', 'one', 'empty'])
+def test_conversion_matches_json_dump(tmp_path, records):
+    src, dst = tmp_path / 'in.jsonl', tmp_path / 'out.json'
+    with JsonLinesWriter(str(src), batch_size=2) as writer:
+        for record in records:
+            writer.write(record)
+    assert writer.count == len(records)
+
+    assert jsonl_to_json(str(src), str(dst)) == len(records)
+    expected = tmp_path / 'expected.json'
+    with open(expected, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
+    assert dst.read_bytes() == expected.read_bytes()